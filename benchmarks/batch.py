@@ -0,0 +1,41 @@
+"""
+Batch suite: borrow_items/return_items against calling borrow_item/return_item
+once per pair (--batch-size pairs each), on fresh patrons and available items.
+"""
+import sqlite3
+import time
+
+from database import services
+from benchmarks.common import copy_db, fresh_patrons
+
+
+def run_batch(source, workdir, args, log):
+    db = copy_db(source, workdir, "batch.db")
+    n = args.batch_size
+    conn = sqlite3.connect(db)
+    items = [row[0] for row in conn.execute(
+        "SELECT item_id FROM Items WHERE status = 'available' LIMIT ?", (2 * n,))]
+    conn.close()
+    patrons = fresh_patrons(db, 2 * n, "batch")
+    loop_pairs = list(zip(patrons[:n], items[:n]))
+    batch_pairs = list(zip(patrons[n:], items[n:]))
+
+    def timed(fn):
+        start = time.perf_counter()
+        fn()
+        return round((time.perf_counter() - start) * 1000, 3)
+
+    results = {
+        "borrow_item_loop": {"items": n, "total_ms": timed(
+            lambda: [services.borrow_item(p, i, db_name=db) for p, i in loop_pairs])},
+        "borrow_items": {"items": n, "total_ms": timed(
+            lambda: services.borrow_items(batch_pairs, db_name=db))},
+        "return_item_loop": {"items": n, "total_ms": timed(
+            lambda: [services.return_item(p, i, db_name=db) for p, i in loop_pairs])},
+        "return_items": {"items": n, "total_ms": timed(
+            lambda: services.return_items(batch_pairs, db_name=db))},
+    }
+    for name, result in results.items():
+        result["median_ms"] = round(result["total_ms"] / n, 4)  # per item, compared like the other suites
+        log(f"  {name:<20} {result['total_ms']:>10.1f} ms for {n} items")
+    return results
@@ -0,0 +1,46 @@
+"""Timing and setup helpers shared by the benchmark suites"""
+import os
+import shutil
+import statistics
+import time
+
+from database import services
+from database.cache import clear_caches
+
+SEARCH_TERMS = ["river", "night gar", "sto", "light", "win", "history sci", "ocean", "golden", "machine"]
+
+
+def measure(call, runs=30, budget=2.0):
+    """
+    Time call(i) for i = 0, 1, ... up to `runs` times or `budget` seconds
+    (at least 3 runs). Caches are cleared before each run so lookups hit SQLite.
+    """
+    times = []
+    deadline = time.perf_counter() + budget
+    for i in range(runs):
+        clear_caches()
+        start = time.perf_counter()
+        call(i)
+        times.append((time.perf_counter() - start) * 1000)
+        if i >= 2 and time.perf_counter() > deadline:
+            break
+    times.sort()
+    return {
+        "runs": len(times),
+        "min_ms": round(times[0], 4),
+        "median_ms": round(statistics.median(times), 4),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 4),
+        "max_ms": round(times[-1], 4),
+    }
+
+
+def copy_db(source, workdir, name):
+    path = os.path.join(workdir, name)
+    shutil.copy(source, path)
+    return path
+
+
+def fresh_patrons(db, n, tag):
+    """n new patrons without history (for borrow/register/staff benchmarks)"""
+    return [services.add_patron("Bench", tag, f"bench.{tag}.{i}@example.org", db_name=db)["id"]
+            for i in range(n)]
@@ -0,0 +1,81 @@
+"""
+Concurrency suite: --threads threads mixing reads and borrow/return writes
+(--write-share) for --duration seconds, once per PRAGMA profile ("rollback"
+journal and "wal"), counting "database is locked" failures.
+"""
+import random
+import sqlite3
+import threading
+import time
+
+from database import services
+from database.connection import close_all_pools, configure_pool
+from benchmarks.common import SEARCH_TERMS, copy_db, fresh_patrons
+
+
+def run_concurrency(source, workdir, args, log):
+    results = {}
+    for profile in ("rollback", "wal"):
+        db = copy_db(source, workdir, f"concurrency_{profile}.db")
+        configure_pool(db, max_size=args.threads, profile=profile)
+        conn = sqlite3.connect(db)
+        items = [row[0] for row in conn.execute(
+            "SELECT item_id FROM Items WHERE status = 'available' LIMIT ?", (args.threads * 20,))]
+        all_items = [row[0] for row in conn.execute("SELECT item_id FROM Items")]
+        conn.close()
+        patrons = fresh_patrons(db, args.threads, f"conc{profile}")
+
+        counts = {"reads": 0, "writes": 0, "locked": 0, "errors": 0}
+        lock = threading.Lock()
+        stop = time.perf_counter() + args.duration
+
+        def worker(n):
+            rng = random.Random(n)
+            patron = patrons[n]
+            own_items = items[n::args.threads]  # writers never touch the same item
+            local = {"reads": 0, "writes": 0, "locked": 0, "errors": 0}
+            borrowed = set()
+            while time.perf_counter() < stop:
+                try:
+                    if rng.random() < args.write_share and own_items:
+                        item = rng.choice(own_items)
+                        # the (patron, item) history row is unique, so each item once
+                        if item in borrowed:
+                            continue
+                        services.borrow_item(patron, item, db_name=db)
+                        services.return_item(patron, item, db_name=db)
+                        borrowed.add(item)
+                        local["writes"] += 2
+                    else:
+                        choice = rng.random()
+                        if choice < 0.4:
+                            services.get_item(rng.choice(all_items), db_name=db)
+                        elif choice < 0.7:
+                            services.search_catalog(rng.choice(SEARCH_TERMS), db_name=db)
+                        else:
+                            services.get_items_with_display_status_page(False, page_size=50, db_name=db)
+                        local["reads"] += 1
+                except sqlite3.OperationalError as e:
+                    local["locked" if "locked" in str(e) else "errors"] += 1
+                except ValueError:
+                    local["errors"] += 1
+            with lock:
+                for key, value in local.items():
+                    counts[key] += value
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        close_all_pools()
+
+        ops = counts["reads"] + counts["writes"]
+        results[profile] = dict(counts, threads=args.threads, seconds=round(elapsed, 2),
+                                ops_per_second=round(ops / elapsed, 1))
+        log(f"  {profile:<9} {results[profile]['ops_per_second']:>9.1f} ops/s "
+            f"({counts['reads']} reads, {counts['writes']} writes, {counts['locked']} locked, "
+            f"{counts['errors']} errors)")
+    return results
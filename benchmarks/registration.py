@@ -0,0 +1,45 @@
+"""
+Registration load suite: add_patron --registrations times into one
+database, checking every new patron gets a distinct ID and that latency
+doesn't climb as the Patron table fills (first against last 10%).
+"""
+import statistics
+import time
+
+from database import services
+from benchmarks.common import copy_db
+
+
+def run_registration(source, workdir, args, log):
+    db = copy_db(source, workdir, "registration.db")
+    n = args.registrations
+    times, ids = [], set()
+    start = time.perf_counter()
+    for i in range(n):
+        t = time.perf_counter()
+        result = services.add_patron("Load", "Test", f"load.{i}@example.org", db_name=db)
+        times.append((time.perf_counter() - t) * 1000)
+        if result["status"] != "success":
+            raise RuntimeError(f"registration {i} failed: {result}")
+        ids.add(result["id"])
+    total = time.perf_counter() - start
+    if len(ids) != n:
+        raise RuntimeError(f"duplicate patron IDs: {n - len(ids)}")
+
+    # latency must not climb as the table fills: compare first and last 10%
+    tenth = max(1, n // 10)
+    times_sorted = sorted(times)
+    result = {
+        "registrations": n,
+        "total_s": round(total, 3),
+        "per_second": round(n / total, 1),
+        "median_ms": round(statistics.median(times), 4),
+        "p95_ms": round(times_sorted[int(n * 0.95) - 1 if n >= 20 else -1], 4),
+        "max_ms": round(times_sorted[-1], 4),
+        "first_10pct_median_ms": round(statistics.median(times[:tenth]), 4),
+        "last_10pct_median_ms": round(statistics.median(times[-tenth:]), 4),
+    }
+    log(f"  {n} registrations in {total:.1f} s ({result['per_second']}/s), "
+        f"median {result['median_ms']:.3f} ms, first/last 10% {result['first_10pct_median_ms']:.3f}"
+        f"/{result['last_10pct_median_ms']:.3f} ms")
+    return {"add_patron_load": result}
@@ -0,0 +1,497 @@
+"""
+Service-layer benchmarks on a synthetic dataset (see synthetic_data.py).
+
+    python -m benchmarks.run_benchmarks --scale 10k --save benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --scale 10k --compare benchmarks/baseline.json
+
+Suites (--suite, default all):
+  services      latency of every public function in database.services
+  batch         borrow_items/return_items against the per-item loop
+  registration  add_patron throughput and ID uniqueness (--registrations, 100k default)
+  concurrency   mixed read/write throughput from several threads per PRAGMA profile
+  contention    checkout/return throughput of several processes fighting over a
+                few hot items (--processes, --hot-items), and a sign-up rush on one
+                event of --event-capacity seats, with consistency checks
+
+Results are JSON ({suite: {case: stats}}). --compare exits with status 1 if a
+case's median got slower than --threshold times the baseline (its *_per_second
+throughput lower, for cases without a median), or if the baseline has no
+numbers for a case that ran: save a new baseline when adding cases.
+"""
+import argparse
+import inspect
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from database import services, instrumentation
+from database.connection import close_all_pools
+from benchmarks.batch import run_batch
+from benchmarks.common import SEARCH_TERMS, copy_db, fresh_patrons, measure
+from benchmarks.concurrency import run_concurrency
+from benchmarks.registration import run_registration
+from benchmarks.synthetic_data import generate
+
+
+class Context:
+    """Sample IDs of a benchmark database"""
+
+    def __init__(self, db, rng, fresh=600):
+        self.db = db
+        self.rng = rng
+        conn = sqlite3.connect(db)
+        column = lambda sql: [row[0] for row in conn.execute(sql)]
+        self.patrons = column("SELECT id FROM Patron")
+        self.items = column("SELECT item_id FROM Items")
+        self.available = column("SELECT item_id FROM Items WHERE status = 'available'")
+        self.checked_out = column("SELECT item_id FROM Items WHERE status = 'checked_out'")
+        self.hold_patrons = column("SELECT DISTINCT patron_id FROM Holds WHERE status = 'waiting'")
+        self.staff = column("SELECT id FROM Staff WHERE position != 'Volunteer'")
+        self.managers = column("SELECT id FROM Staff WHERE position = 'Manager'")
+        self.volunteers = column("SELECT id FROM Staff WHERE position = 'Volunteer'")
+        self.events = column("SELECT event_id FROM Events")
+        self.upcoming = column("SELECT event_id FROM Events WHERE date >= date('now')")
+        self.rooms = column("SELECT roomNum FROM Rooms")
+        self.registrations = column("SELECT registration_id FROM EventRegistrations")
+        self.requests = column("SELECT request_id FROM AcquisitionRequest")
+        self.pending = column("SELECT request_id FROM AcquisitionRequest WHERE request_status = 'Pending'")
+        self.lost_patrons = column("""SELECT DISTINCT ol.id FROM OpenLoans ol
+            JOIN Items i ON i.item_id = ol.item_id WHERE i.status = 'lost'""")
+        self.emails = column("SELECT email FROM Patron LIMIT 1000")
+        conn.close()
+        rng.shuffle(self.available)
+        self.fresh = fresh_patrons(db, fresh, "ctx")
+        self.loans = []  # (patron, item) borrowed by the borrow_item case
+
+    def pick(self, values):
+        return self.rng.choice(values)
+
+    def take(self, values):
+        return values.pop() if values else None
+
+
+## SERVICES SUITE ##
+
+def service_cases(ctx):
+    """{function name: call(i)} covering every public function in services"""
+    db = ctx.db
+    fresh = iter(ctx.fresh)
+    available = ctx.available
+    today = date.today()
+
+    def borrow(i):
+        patron, item = next(fresh), ctx.take(available)
+        services.borrow_item(patron, item, db_name=db)
+        ctx.loans.append((patron, item))
+
+    def borrow_batch(i):
+        pairs = [(next(fresh), ctx.take(available)) for _ in range(10)]
+        services.borrow_items(pairs, db_name=db)
+        ctx.loans.extend(pairs)
+
+    holds = []
+
+    def place_hold(i):
+        holds.append(services.place_hold(next(fresh), ctx.pick(ctx.checked_out), db_name=db)["hold_id"])
+
+    volunteers = []
+
+    def add_volunteer(i):
+        patron = next(fresh)
+        services.add_volunteer(patron, db_name=db)
+        volunteers.append(patron)
+
+    return {
+        "loan_period_days": lambda i: services.loan_period_days("DVD"),
+        # patrons
+        "add_patron": lambda i: services.add_patron("Bench", "Patron", f"bench.add.{i}@example.org", db_name=db),
+        "get_patron": lambda i: services.get_patron(ctx.pick(ctx.patrons), db_name=db),
+        "find_patron_with_staff": lambda i: services.find_patron_with_staff(
+            str(ctx.pick(ctx.patrons)) if i % 2 else ctx.pick(ctx.emails), db_name=db),
+        "get_session_authorization": lambda i: services.get_session_authorization(ctx.pick(ctx.patrons), db_name=db),
+        "get_staff_version": lambda i: services.get_staff_version(db_name=db),
+        "get_patron_fines": lambda i: services.get_patron_fines(ctx.pick(ctx.patrons), db_name=db),
+        "get_patron_balance": lambda i: services.get_patron_balance(ctx.pick(ctx.patrons), db_name=db),
+        "compute_patron_balances": lambda i: services.compute_patron_balances(db_name=db),
+        # catalog
+        "add_item": lambda i: services.add_item(f"Bench Item {i}", "Physical Book", "Bench Author", 10.0, db_name=db),
+        "get_item": lambda i: services.get_item(ctx.pick(ctx.items), db_name=db),
+        "get_available_items": lambda i: services.get_available_items(db_name=db),
+        "get_items_with_display_status": lambda i: services.get_items_with_display_status(True, db_name=db),
+        "get_items_with_display_status_page": lambda i: services.get_items_with_display_status_page(True, db_name=db),
+        "get_items_by_type_for_help": lambda i: services.get_items_by_type_for_help("DVD", db_name=db),
+        "search_catalog": lambda i: services.search_catalog(SEARCH_TERMS[i % len(SEARCH_TERMS)], db_name=db),
+        "search_available_items_by_title": lambda i: services.search_available_items_by_title(
+            SEARCH_TERMS[i % len(SEARCH_TERMS)], db_name=db),
+        # circulation
+        "borrow_item": borrow,
+        "return_item": lambda i: services.return_item(*ctx.loans.pop(), db_name=db),
+        "borrow_items": borrow_batch,
+        "return_items": lambda i: services.return_items([ctx.loans.pop() for _ in range(10)], db_name=db),
+        "get_checked_out_items_for_patron": lambda i: services.get_checked_out_items_for_patron(
+            ctx.pick(ctx.patrons), db_name=db),
+        "get_overdue_items": lambda i: services.get_overdue_items(db_name=db),
+        "run_overdue_sweep": lambda i: services.run_overdue_sweep(full=True, db_name=db),
+        "check_overdue_items": lambda i: services.check_overdue_items(db_name=db),
+        "process_lost_item_payment": lambda i: services.process_lost_item_payment(
+            ctx.take(ctx.lost_patrons) or ctx.pick(ctx.patrons), db_name=db),
+        # holds
+        "place_hold": place_hold,
+        "get_patron_holds": lambda i: services.get_patron_holds(ctx.pick(ctx.hold_patrons or ctx.patrons), db_name=db),
+        "cancel_hold": lambda i: services.cancel_hold(holds.pop(), db_name=db),
+        "expire_holds": lambda i: services.expire_holds(db_name=db),
+        # history / reporting
+        "get_borrowing_history": lambda i: services.get_borrowing_history(ctx.pick(ctx.patrons), db_name=db),
+        "get_borrowing_history_page": lambda i: services.get_borrowing_history_page(
+            ctx.pick(ctx.patrons), db_name=db),
+        "get_all_borrowing_history": lambda i: services.get_all_borrowing_history(True, db_name=db),
+        "get_all_borrowing_history_page": lambda i: services.get_all_borrowing_history_page(True, db_name=db),
+        # staff
+        "is_manager": lambda i: services.is_manager(ctx.pick(ctx.patrons), db_name=db),
+        "is_volunteer": lambda i: services.is_volunteer(ctx.pick(ctx.patrons), db_name=db),
+        "get_all_staff_members": lambda i: services.get_all_staff_members(db_name=db),
+        "add_staff": lambda i: services.add_staff(next(fresh), "Shelver", 40000, db_name=db),
+        "add_staff_record": lambda i: services.add_staff_record(ctx.pick(ctx.staff), "Note", "benchmark", db_name=db),
+        "add_volunteer": add_volunteer,
+        "remove_volunteer": lambda i: services.remove_volunteer(volunteers.pop() if volunteers else 0, db_name=db),
+        # acquisition requests
+        "submit_acquisition_request": lambda i: services.submit_acquisition_request(
+            ctx.pick(ctx.patrons), "DVD", "Bench Creator", f"Bench Request {i}", db_name=db),
+        "show_acquisition_requests": lambda i: services.show_acquisition_requests(db_name=db),
+        "show_acquisition_requests_page": lambda i: services.show_acquisition_requests_page(db_name=db),
+        "approve_acquisition_request": lambda i: services.approve_acquisition_request(
+            ctx.pick(ctx.requests), ctx.pick(ctx.staff), db_name=db),
+        "update_acquisition_request_status": lambda i: services.update_acquisition_request_status(
+            ctx.take(ctx.pending) or ctx.pick(ctx.requests), "approved", db_name=db),
+        # events
+        # a day each, so the runs don't clash over the room
+        "create_event": lambda i: services.create_event(
+            ctx.pick(ctx.staff), f"Bench Event {i}", (today + timedelta(days=400 + i)).isoformat(), "101", "All",
+            start_time="10:00", end_time="12:00", db_name=db),
+        "find_room_conflicts": lambda i: services.find_room_conflicts(
+            ctx.pick(ctx.rooms), (today + timedelta(days=i % 180)).isoformat(), "10:00", "14:00", db_name=db),
+        "get_free_rooms": lambda i: services.get_free_rooms(
+            (today + timedelta(days=i % 180)).isoformat(), "10:00", "14:00", min_seats=50, db_name=db),
+        "add_room": lambda i: services.add_room(f"Bench {i}", 30, db_name=db),
+        "get_event": lambda i: services.get_event(ctx.pick(ctx.events), db_name=db),
+        "get_upcoming_events": lambda i: services.get_upcoming_events(True, db_name=db),
+        "get_upcoming_events_page": lambda i: services.get_upcoming_events_page(True, db_name=db),
+        "register_for_event": lambda i: services.register_for_event(next(fresh), ctx.pick(ctx.upcoming), db_name=db),
+        "get_event_registrations": lambda i: services.get_event_registrations(ctx.pick(ctx.events), db_name=db),
+        "get_registrations_for_patron": lambda i: services.get_registrations_for_patron(
+            ctx.pick(ctx.patrons), db_name=db),
+        "cancel_event_registration": lambda i: services.cancel_event_registration(
+            ctx.take(ctx.registrations), db_name=db),
+    }
+
+
+def run_services(source, workdir, args, log):
+    db = copy_db(source, workdir, "services.db")
+    ctx = Context(db, random.Random(args.seed))
+    cases = service_cases(ctx)
+
+    public = {name for name, fn in inspect.getmembers(services, inspect.isfunction)
+              if not name.startswith("_") and fn.__module__ == services.__name__}
+    missing = sorted(public - set(cases))
+    if missing:
+        log(f"  no benchmark for: {', '.join(missing)}")
+
+    results = {}
+    for name, call in cases.items():
+        try:
+            results[name] = measure(call, runs=args.runs)
+        except Exception as e:  # a case running out of sample data shouldn't stop the suite
+            log(f"  {name}: failed ({type(e).__name__}: {e})")
+            continue
+        log(f"  {name:<38} median {results[name]['median_ms']:>9.3f} ms   p95 {results[name]['p95_ms']:>9.3f} ms")
+    return results
+
+
+## CONTENTION SUITE ##
+
+def _contention_worker(db, patrons, hot_items, start_at, duration, seed, instrumented):
+    """One desk terminal: borrow a random hot item and return it, until time is up"""
+    instrumentation.ENABLED = instrumented
+    rng = random.Random(seed)
+    counts = {"checkouts": 0, "returns": 0, "unavailable": 0, "busy": 0, "errors": 0}
+    # the (patron, item) history row is unique: every pair at most once
+    pairs = [(patron, item) for item in hot_items for patron in patrons]
+    rng.shuffle(pairs)
+    time.sleep(max(0.0, start_at - time.time()))
+    stop = start_at + duration
+    for patron, item in pairs:
+        if time.time() >= stop:
+            break
+        try:
+            services.borrow_item(patron, item, db_name=db)
+        except ValueError:
+            counts["unavailable"] += 1
+            continue
+        except sqlite3.OperationalError:
+            counts["busy"] += 1
+            continue
+        except sqlite3.Error:
+            counts["errors"] += 1
+            continue
+        counts["checkouts"] += 1
+        try:
+            services.return_item(patron, item, db_name=db)
+            counts["returns"] += 1
+        except sqlite3.OperationalError:
+            counts["busy"] += 1
+        except (ValueError, sqlite3.Error):
+            counts["errors"] += 1
+    close_all_pools()
+    return counts
+
+
+def _signup_worker(db, patrons, event_id, start_at, instrumented):
+    """One patron terminal per process: register every patron as fast as possible"""
+    instrumentation.ENABLED = instrumented
+    counts = {"registered": 0, "waitlisted": 0, "busy": 0, "errors": 0}
+    time.sleep(max(0.0, start_at - time.time()))
+    for patron in patrons:
+        try:
+            counts[services.register_for_event(patron, event_id, db_name=db)] += 1
+        except sqlite3.OperationalError:
+            counts["busy"] += 1
+        except (ValueError, sqlite3.Error):
+            counts["errors"] += 1
+    close_all_pools()
+    return counts
+
+
+def _seat_mismatches(db, event_id, capacity):
+    """Ways the event's counter and registrations disagree (empty if consistent)"""
+    conn = sqlite3.connect(db)
+    seats_taken = conn.execute("SELECT seats_taken FROM Events WHERE event_id = ?", (event_id,)).fetchone()[0]
+    registered, waitlisted = conn.execute(
+        """SELECT COALESCE(SUM(status = 'registered'), 0), COALESCE(SUM(status = 'waitlisted'), 0)
+        FROM EventRegistrations WHERE event_id = ?""", (event_id,)
+    ).fetchone()
+    conn.close()
+    problems = []
+    if seats_taken != registered:
+        problems.append(f"seats_taken {seats_taken} != {registered} registered")
+    if registered > capacity:
+        problems.append(f"{registered} registered over capacity {capacity}")
+    if waitlisted and registered < capacity:
+        problems.append(f"{waitlisted} waitlisted with {capacity - registered} seats free")
+    return problems
+
+
+def run_event_signup(db, patrons, args, log):
+    """Every patron signs up for one event at once, then some registered ones cancel"""
+    conn = sqlite3.connect(db)
+    staff = conn.execute("SELECT id FROM Staff LIMIT 1").fetchone()[0]
+    conn.close()
+    event_id = services.create_event(staff, "Signup Rush", (date.today() + timedelta(days=30)).isoformat(),
+                                     "Signup Rush", "All", capacity=args.event_capacity, db_name=db)
+    close_all_pools()
+
+    context = multiprocessing.get_context("spawn")
+    start_at = time.time() + 2.0
+    per_process = len(patrons) // args.processes
+    jobs = [(db, patrons[n * per_process:(n + 1) * per_process], event_id, start_at, args.instrumented)
+            for n in range(args.processes)]
+    with context.Pool(args.processes) as pool:
+        per_worker = pool.starmap(_signup_worker, jobs)
+    elapsed = time.time() - start_at
+    counts = {key: sum(worker[key] for worker in per_worker) for key in per_worker[0]}
+    problems = _seat_mismatches(db, event_id, args.event_capacity)
+
+    # cancellations hand their seats to the head of the waitlist
+    conn = sqlite3.connect(db)
+    cancelling = [row[0] for row in conn.execute(
+        "SELECT registration_id FROM EventRegistrations WHERE event_id = ? AND status = 'registered' LIMIT ?",
+        (event_id, max(1, args.event_capacity // 10)))]
+    conn.close()
+    cancel_times = []
+    for registration_id in cancelling:
+        t = time.perf_counter()
+        services.cancel_event_registration(registration_id, db_name=db)
+        cancel_times.append((time.perf_counter() - t) * 1000)
+    problems += _seat_mismatches(db, event_id, args.event_capacity)
+    consistent = not problems and counts["errors"] == 0
+
+    result = dict(counts, processes=args.processes, capacity=args.event_capacity, seconds=round(elapsed, 2),
+                  signups_per_second=round((counts["registered"] + counts["waitlisted"]) / elapsed, 1),
+                  cancel_median_ms=round(statistics.median(cancel_times), 4),
+                  problems=problems, consistent=consistent)
+    log(f"  {result['signups_per_second']:>9.1f} sign-ups/s from {args.processes} processes for "
+        f"{args.event_capacity} seats ({counts['registered']} registered, {counts['waitlisted']} waitlisted, "
+        f"{counts['busy']} busy, {counts['errors']} errors), cancel {result['cancel_median_ms']:.3f} ms, "
+        f"{'consistent' if consistent else 'INCONSISTENT'}")
+    if not consistent:
+        raise RuntimeError(f"sign-up rush left inconsistent seats: {result}")
+    return result
+
+
+def run_contention(source, workdir, args, log):
+    db = copy_db(source, workdir, "contention.db")
+    conn = sqlite3.connect(db)
+    hot_items = [row[0] for row in conn.execute(
+        "SELECT item_id FROM Items WHERE status = 'available' LIMIT ?", (args.hot_items,))]
+    conn.close()
+    # enough patrons that no process runs out of (patron, item) pairs
+    per_process = 1000
+    patrons = fresh_patrons(db, args.processes * per_process, "contention")
+    close_all_pools()
+
+    # spawn: workers start without this process's pooled connections
+    context = multiprocessing.get_context("spawn")
+    start_at = time.time() + 2.0  # after every worker has imported
+    jobs = [(db, patrons[n * per_process:(n + 1) * per_process], hot_items, start_at, args.duration,
+             args.seed + n, args.instrumented) for n in range(args.processes)]
+    with context.Pool(args.processes) as pool:
+        per_worker = pool.starmap(_contention_worker, jobs)
+    elapsed = min(args.duration, time.time() - start_at)
+
+    counts = {key: sum(worker[key] for worker in per_worker) for key in per_worker[0]}
+    conn = sqlite3.connect(db)
+    placeholders = ",".join("?" * len(hot_items))
+    # every successful checkout left exactly one loan row, and an item is
+    # checked out exactly when it has an open loan
+    loans = conn.execute(
+        "SELECT COUNT(*) FROM BorrowingHistory WHERE id IN (SELECT id FROM Patron WHERE last_name = 'contention')"
+    ).fetchone()[0]
+    mismatched = conn.execute(
+        f"""SELECT COUNT(*) FROM Items i WHERE i.item_id IN ({placeholders})
+            AND (i.status = 'checked_out') != EXISTS (SELECT 1 FROM OpenLoans ol WHERE ol.item_id = i.item_id)""",
+        hot_items
+    ).fetchone()[0]
+    conn.close()
+    consistent = loans == counts["checkouts"] and mismatched == 0 and counts["errors"] == 0
+
+    result = dict(counts, processes=args.processes, hot_items=len(hot_items), seconds=elapsed,
+                  checkouts_per_second=round(counts["checkouts"] / elapsed, 1),
+                  loan_rows=loans, status_mismatches=mismatched, consistent=consistent)
+    log(f"  {result['checkouts_per_second']:>9.1f} checkouts/s from {args.processes} processes on "
+        f"{len(hot_items)} items ({counts['unavailable']} unavailable, {counts['busy']} busy, "
+        f"{counts['errors']} errors), {'consistent' if consistent else 'INCONSISTENT'}")
+    if not consistent:
+        raise RuntimeError(f"contention run left inconsistent loans: {result}")
+    return {"borrow_return": result, "event_signup": run_event_signup(db, patrons, args, log)}
+
+
+SUITES = {
+    "services": run_services,
+    "batch": run_batch,
+    "registration": run_registration,
+    "concurrency": run_concurrency,
+    "contention": run_contention,
+}
+
+
+## BASELINE ##
+
+def _compared_metric(stats):
+    """(key, higher is better) of the number compared for a case, None if it has none"""
+    if "median_ms" in stats:
+        return "median_ms", False
+    throughput = sorted(key for key in stats if key.endswith("_per_second"))
+    return (throughput[0], True) if throughput else None
+
+
+def compare(results, baseline, threshold, log):
+    """Print changes against a baseline; returns the regressed cases and those missing from it"""
+    failures = []
+    for suite, cases in results.items():
+        for case, stats in cases.items():
+            metric = _compared_metric(stats)
+            if metric is None:
+                continue
+            key, higher_is_better = metric
+            name = f"{suite}.{case}"
+            old = baseline.get("results", {}).get(suite, {}).get(case, {})
+            if key not in old:
+                failures.append(name)
+                log(f"  {name:<48} {'-':>9} -> {stats[key]:>9.3f}  MISSING FROM BASELINE")
+                continue
+            if higher_is_better:
+                ratio = old[key] / stats[key] if stats[key] else float("inf")
+                regressed = ratio > threshold
+                unit = "/s"
+            else:
+                ratio = stats[key] / old[key] if old[key] else 1.0
+                # sub-50µs differences are timer noise
+                regressed = ratio > threshold and stats[key] - old[key] > 0.05
+                unit = "ms"
+            if regressed:
+                failures.append(name)
+            log(f"  {name:<48} {old[key]:>9.3f} -> {stats[key]:>9.3f} {unit} "
+                f"x{ratio:.2f}{'  REGRESSION' if regressed else ''}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark database.services on synthetic data")
+    parser.add_argument("--scale", default="10k", help="dataset scale (see synthetic_data.SCALES)")
+    parser.add_argument("--db", help="use this generated database instead of generating one")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES),
+                        help="suite(s) to run, default all")
+    parser.add_argument("--runs", type=int, default=30, help="max runs per services case")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--registrations", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0,
+                        help="seconds per concurrency profile and contention run")
+    parser.add_argument("--write-share", type=float, default=0.2)
+    parser.add_argument("--processes", type=int, default=4, help="contention suite worker processes")
+    parser.add_argument("--hot-items", type=int, default=8, help="items the contention workers compete for")
+    parser.add_argument("--event-capacity", type=int, default=200, help="seats of the contention sign-up event")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--instrumented", action="store_true", help="keep service instrumentation on")
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=1.3, help="slowdown ratio counted as regression")
+    args = parser.parse_args()
+
+    instrumentation.ENABLED = args.instrumented
+    log = lambda message: print(message, flush=True)
+
+    with tempfile.TemporaryDirectory(prefix="library-bench-") as workdir:
+        source = args.db
+        if not source:
+            source = os.path.join(workdir, "dataset.db")
+            log(f"generating {args.scale} dataset")
+            generate(source, args.scale, args.seed, log=log)
+
+        results = {}
+        for suite in args.suite or list(SUITES):
+            log(f"[{suite}]")
+            results[suite] = SUITES[suite](source, workdir, args, log)
+            close_all_pools()
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "scale": args.scale if not args.db else os.path.basename(args.db),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        log(f"saved {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        log(f"[compare with {args.compare}]")
+        failures = compare(results, baseline, args.threshold, log)
+        if failures:
+            log(f"{len(failures)} regressed or missing case(s): {', '.join(failures)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
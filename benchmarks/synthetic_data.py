@@ -0,0 +1,330 @@
+"""
+Synthetic library dataset generator.
+
+Fills a fresh database (schema from database.migrations) with items, patrons,
+staff, borrowing history, events, registrations and acquisition requests at
+a given scale, with skewed (Zipf-like) popularity so a few items, authors
+and patrons account for most of the loans, like a real catalog.
+
+    python -m benchmarks.synthetic_data --scale 100k --out /tmp/library_100k.db
+
+The scale is the number of items; the other tables are sized relative to it
+(see SCALES). Generation is deterministic for a given --seed.
+"""
+import argparse
+import bisect
+import itertools
+import os
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from database import services
+from database.connection import get_db_connection, close_all_pools
+from database.migrations import ANALYTICS_REBUILD, PATRON_BALANCE_COMPUTE, run_script
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+# Relative table sizes per item
+PATRONS_PER_ITEM = 0.5
+LOANS_PER_ITEM = 3.0
+EVENTS_PER_ITEM = 0.01
+REGISTRATIONS_PER_ITEM = 0.5
+REQUESTS_PER_ITEM = 0.02
+HOLDS_PER_ITEM = 0.02  # queued on items that are out, most on a few popular ones
+STAFF_PER_PATRON = 0.01
+
+OPEN_LOAN_SHARE = 0.03  # of loans, not yet returned
+HISTORY_DAYS = 3 * 365
+
+ITEM_TYPES = [  # (type, weight, replacement cost median)
+    ("Physical Book", 50, 25.0),
+    ("Online Book", 10, 12.0),
+    ("Magazine", 12, 8.0),
+    ("Journal", 10, 40.0),
+    ("DVD", 10, 20.0),
+    ("Vinyl", 8, 30.0),
+]
+STAFF_POSITIONS = [("Shelver", 40), ("Assistant Librarian", 30), ("Volunteer", 20), ("Manager", 10)]
+ROOMS = [f"{floor}{room:02d}" for floor in range(1, 5) for room in range(1, 11)]
+ROOM_SEATS = [40, 80, 150, 300]
+EVENT_HOURS = range(9, 20)  # start hours, events last 1-3 hours
+AUDIENCES = ["All", "Kids", "Teens", "Adults", "Seniors", "Film and TV", "Book Club"]
+EVENT_CAPACITIES = [(None, 20), (20, 20), (40, 30), (80, 20), (150, 10)]  # (seats, weight), None = no limit
+
+WORDS = ("river night garden stone light winter silent empire city road shadow fire glass "
+         "ocean forest paper iron summer secret lost golden last house north song blue "
+         "history science guide art world story music journey dream machine letters").split()
+FIRST_NAMES = ("Ava Liam Noah Emma Olivia Mia Lucas Amir Sofia Chen Priya Mateo Zoe Yuki "
+               "Omar Lena Jonas Ines Kofi Maya Arjun Elena Hugo Nora Ravi Sara Tomas Alba").split()
+LAST_NAMES = ("Smith Nguyen Garcia Patel Kim Müller Rossi Silva Cohen Okafor Tanaka Novak "
+              "Martin Lopez Singh Brown Dubois Ivanova Haddad Larsen Costa Wright Ali Moreau").split()
+
+
+class Zipf:
+    """Sampler over range(n) with P(k) ~ 1 / (k + 1) ** s"""
+
+    def __init__(self, rng, n, s=1.1):
+        self.rng = rng
+        self.cum = list(itertools.accumulate(1.0 / (k + 1) ** s for k in range(n)))
+
+    def sample(self):
+        return bisect.bisect_left(self.cum, self.rng.random() * self.cum[-1])
+
+
+def _batched(rows, size=50_000):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _title(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+
+
+def _name(rng):
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+
+def generate(db_path, scale="10k", seed=42, today=None, log=print):
+    """Create `db_path` (must not exist) filled at `scale`; returns table row counts"""
+    if os.path.exists(db_path):
+        raise ValueError(f"{db_path} already exists")
+    n_items = SCALES[scale] if scale in SCALES else int(scale)
+    rng = random.Random(seed)
+    today = today or date.today()
+
+    # schema + migrations through the normal connection path
+    get_db_connection(db_path).close()
+    close_all_pools()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    start = time.perf_counter()
+
+    def insert(sql, rows, table):
+        count = 0
+        for batch in _batched(rows):
+            conn.executemany(sql, batch)
+            count += len(batch)
+        conn.commit()
+        log(f"  {table}: {count} rows ({time.perf_counter() - start:.1f} s)")
+        return count
+
+    counts = {}
+
+    # Items: creators and types skewed, status fixed up after the loans
+    type_names = [t for t, _, _ in ITEM_TYPES]
+    type_weights = [w for _, w, _ in ITEM_TYPES]
+    cost_median = {t: c for t, _, c in ITEM_TYPES}
+    creators = [" ".join(_name(rng)) for _ in range(max(10, n_items // 20))]
+    creator_zipf = Zipf(rng, len(creators))
+    item_types = [None] * (n_items + 1)
+
+    def items():
+        for item_id in range(1, n_items + 1):
+            item_type = item_types[item_id] = rng.choices(type_names, type_weights)[0]
+            cost = round(cost_median[item_type] * rng.lognormvariate(0, 0.4), 2)
+            yield (item_id, _title(rng), item_type, creators[creator_zipf.sample()], cost, "available")
+    counts["Items"] = insert(
+        "INSERT INTO Items (item_id, title, type, creator, replacement_cost, status) VALUES (?, ?, ?, ?, ?, ?)",
+        items(), "Items")
+
+    # Patrons: IDs from the same permutation the allocator uses, then advance
+    # its counter so add_patron keeps producing fresh IDs
+    n_patrons = max(10, int(n_items * PATRONS_PER_ITEM))
+    key = conn.execute("SELECT key FROM IdSequence WHERE name = 'patron'").fetchone()[0]
+    patron_ids = [services.PATRON_ID_OFFSET + services._feistel24(i, key) for i in range(n_patrons)]
+
+    def patrons():
+        for i, patron_id in enumerate(patron_ids):
+            first, last = _name(rng)
+            yield (patron_id, first, last, f"{first}.{last}.{i}@example.org".lower())
+    counts["Patron"] = insert("INSERT INTO Patron (id, first_name, last_name, email) VALUES (?, ?, ?, ?)",
+                              patrons(), "Patron")
+    conn.execute("UPDATE IdSequence SET next_value = ? WHERE name = 'patron'", (n_patrons,))
+    conn.commit()
+
+    # Staff: a small share of patrons
+    staff_ids = rng.sample(patron_ids, max(4, int(n_patrons * STAFF_PER_PATRON)))
+    positions = [p for p, _ in STAFF_POSITIONS]
+    position_weights = [w for _, w in STAFF_POSITIONS]
+
+    def staff():
+        for i, staff_id in enumerate(staff_ids):
+            # at least one manager and one volunteer
+            position = ("Manager", "Volunteer")[i] if i < 2 else rng.choices(positions, position_weights)[0]
+            yield (staff_id, position, 0 if position == "Volunteer" else round(rng.uniform(30000, 80000), 2))
+    counts["Staff"] = insert("INSERT INTO Staff (id, position, salary) VALUES (?, ?, ?)", staff(), "Staff")
+
+    # Loans: popular items and heavy borrowers get most of the history.
+    # The app allows one open loan per patron and per item.
+    n_loans = int(n_items * LOANS_PER_ITEM)
+    # the analytics rollup triggers are rebuilt in one pass after loading
+    rollup_triggers = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ('OpenLoans', 'LoanArchive')"
+    ).fetchall()
+    for name, _ in rollup_triggers:
+        conn.execute(f"DROP TRIGGER {name}")
+    item_zipf = Zipf(rng, n_items, s=0.9)
+    patron_zipf = Zipf(rng, n_patrons, s=0.8)
+    item_order = list(range(1, n_items + 1))
+    rng.shuffle(item_order)  # popularity unrelated to item_id
+    open_items, open_patrons, lost_items, seen = set(), set(), set(), set()
+    open_loans = []  # a few percent of the loans, inserted after the archive
+
+    def loans():
+        attempts = 0
+        produced = 0
+        while produced < n_loans and attempts < n_loans * 3:
+            attempts += 1
+            item_id = item_order[item_zipf.sample()]
+            patron_id = patron_ids[patron_zipf.sample()]
+            if (patron_id, item_id) in seen:
+                continue
+            checkout = today - timedelta(days=rng.randint(0, HISTORY_DAYS))
+            is_open = (rng.random() < OPEN_LOAN_SHARE and item_id not in open_items
+                       and patron_id not in open_patrons)
+            due = checkout + timedelta(days=services.loan_period_days(item_types[item_id]))
+            lost = due + timedelta(days=services.GRACE_PERIOD_DAYS)
+            if is_open:
+                open_items.add(item_id)
+                open_patrons.add(patron_id)
+                if lost <= today:
+                    lost_items.add(item_id)
+                open_loans.append((patron_id, item_id, checkout.isoformat(), due.isoformat(), lost.isoformat()))
+            else:
+                returned = checkout + timedelta(days=max(1, int(rng.gauss(20, 10))))
+                if returned > today:
+                    continue
+                yield (patron_id, item_id, checkout.isoformat(), returned.isoformat(),
+                       due.isoformat(), lost.isoformat())
+            seen.add((patron_id, item_id))
+            produced += 1
+    counts["LoanArchive"] = insert(
+        """INSERT INTO LoanArchive (id, item_id, checkoutDate, returnDate, due_date, lost_date)
+        VALUES (?, ?, ?, ?, ?, ?)""", loans(), "LoanArchive")
+    counts["OpenLoans"] = insert(
+        "INSERT INTO OpenLoans (id, item_id, checkoutDate, due_date, lost_date) VALUES (?, ?, ?, ?, ?)",
+        open_loans, "OpenLoans")
+    seen.clear()
+    for _, sql in rollup_triggers:
+        conn.execute(sql)
+    run_script(conn, ANALYTICS_REBUILD)
+
+    conn.executemany("UPDATE Items SET status = 'checked_out' WHERE item_id = ?",
+                     [(i,) for i in open_items - lost_items])
+    conn.executemany("UPDATE Items SET status = 'lost' WHERE item_id = ?", [(i,) for i in lost_items])
+    conn.execute(PATRON_BALANCE_COMPUTE.format(open_loans="OpenLoans", where=""), {"today": today.isoformat()})
+    conn.commit()
+
+    # Holds: waiting queues on checked-out items, longest on the popular ones
+    # (item_order is in popularity order for item_zipf)
+    holders = {item_id: patron_id for patron_id, item_id, *_ in open_loans}
+    queued = [item_id for item_id in item_order if item_id in holders and item_id not in lost_items]
+    open_loans.clear()
+
+    def holds():
+        if not queued:
+            return
+        queue_zipf = Zipf(rng, len(queued), s=1.0)
+        pairs = set()
+        for _ in range(int(n_items * HOLDS_PER_ITEM)):
+            item_id = queued[queue_zipf.sample()]
+            patron_id = patron_ids[patron_zipf.sample()]
+            if patron_id == holders[item_id] or (item_id, patron_id) in pairs:
+                continue
+            pairs.add((item_id, patron_id))
+            placed = today - timedelta(days=rng.randint(0, 60))
+            yield (item_id, patron_id, placed.isoformat())
+    counts["Holds"] = insert(
+        "INSERT INTO Holds (item_id, patron_id, placed_date) VALUES (?, ?, ?)", holds(), "Holds")
+
+    room_seats = {room: rng.choice(ROOM_SEATS) for room in ROOMS}
+    counts["Rooms"] = insert("INSERT INTO Rooms (roomNum, seats) VALUES (?, ?)", room_seats.items(), "Rooms")
+
+    # Events: a year back to half a year ahead, organized by staff, in a
+    # room big enough and free at the time (after a few tries, the last pick)
+    n_events = max(5, int(n_items * EVENTS_PER_ITEM))
+    event_dates = [today + timedelta(days=rng.randint(-365, 180)) for _ in range(n_events)]
+    capacities = rng.choices([c for c, _ in EVENT_CAPACITIES], [w for _, w in EVENT_CAPACITIES], k=n_events)
+
+    def events():
+        booked = set()  # (date, room, hour)
+        for event_id, event_date in enumerate(event_dates, start=1):
+            capacity = capacities[event_id - 1]
+            for _ in range(20):
+                room = rng.choice(ROOMS)
+                start_hour = rng.choice(EVENT_HOURS)
+                hours = [(event_date, room, hour) for hour in range(start_hour, start_hour + rng.randint(1, 3))]
+                if (capacity or 0) <= room_seats[room] and booked.isdisjoint(hours):
+                    break
+            booked.update(hours)
+            yield (event_id, rng.choice(staff_ids), f"{_title(rng)} {rng.choice(['Talk', 'Workshop', 'Reading', 'Screening'])}",
+                   event_date.isoformat(), f"{start_hour:02d}:00", f"{start_hour + len(hours):02d}:00",
+                   room, rng.choice(AUDIENCES), capacity)
+    counts["Events"] = insert(
+        """INSERT INTO Events (event_id, organizer, eventName, date, start_time, end_time, roomNum, audience, capacity)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        events(), "Events")
+
+    # Registrations: a few popular events draw most patrons, past capacity
+    # they go on the waitlist
+    n_registrations = int(n_items * REGISTRATIONS_PER_ITEM)
+    event_zipf = Zipf(rng, n_events, s=1.0)
+    seats_taken = [0] * n_events
+
+    def registrations():
+        pairs = set()
+        for _ in range(n_registrations):
+            event_id = event_zipf.sample() + 1
+            patron_id = patron_ids[patron_zipf.sample()]
+            if (event_id, patron_id) in pairs:
+                continue
+            pairs.add((event_id, patron_id))
+            registered = event_dates[event_id - 1] - timedelta(days=rng.randint(1, 60))
+            capacity = capacities[event_id - 1]
+            status = "registered" if capacity is None or seats_taken[event_id - 1] < capacity else "waitlisted"
+            seats_taken[event_id - 1] += status == "registered"
+            yield (event_id, patron_id, registered.isoformat(), status)
+    counts["EventRegistrations"] = insert(
+        "INSERT INTO EventRegistrations (event_id, patron_id, registration_date, status) VALUES (?, ?, ?, ?)",
+        registrations(), "EventRegistrations")
+    conn.executemany("UPDATE Events SET seats_taken = ? WHERE event_id = ?",
+                     [(taken, event_id) for event_id, taken in enumerate(seats_taken, start=1) if taken])
+    conn.commit()
+
+    def requests():
+        for _ in range(max(5, int(n_items * REQUESTS_PER_ITEM))):
+            status = rng.choices(["Pending", "approved", "denied"], [50, 35, 15])[0]
+            yield (rng.choice(patron_ids), status, rng.choices(type_names, type_weights)[0],
+                   rng.choice(creators), _title(rng))
+    counts["AcquisitionRequest"] = insert(
+        """INSERT INTO AcquisitionRequest (requested_by, request_status, item_type, creator, title)
+        VALUES (?, ?, ?, ?, ?)""", requests(), "AcquisitionRequest")
+
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    log(f"done in {time.perf_counter() - start:.1f} s")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic library database")
+    parser.add_argument("--scale", default="10k", help="10k, 100k, 1m, 10m or a number of items")
+    parser.add_argument("--out", required=True, help="path of the database file to create")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    generate(args.out, args.scale, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Circulation analytics read from precomputed rollup tables.
+
+Triggers on OpenLoans and LoanArchive (migrations v8, v10) keep three
+aggregates current as loans are made and returned, whichever code path
+writes them:
+
+  DailyCirculation  checkouts / returns / late returns per day and item type
+  ItemPopularity    checkouts and last checkout per item
+  PatronActivity    checkouts, open loans, late returns, first/last checkout per patron
+
+The report functions below only read these tables, never BorrowingHistory.
+rebuild_analytics() recomputes everything from BorrowingHistory, for data
+written with the triggers missing (restored backups, manual SQL). It holds
+the write lock for the whole recompute, so it is run by hand, not on a timer.
+"""
+import json
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+
+from .connection import get_db_connection
+from .instrumentation import instrument_functions
+from .migrations import ANALYTICS_REBUILD, run_script
+
+ANALYTICS_REBUILD_JOB = "analytics_rebuild"
+
+# Patron activity by days since the last checkout: (label, max days), None = older
+ACTIVITY_BUCKETS = [("Last 30 days", 30), ("31-90 days", 90), ("91-365 days", 365), ("Over a year", None)]
+
+
+def _today(today):
+    return today or date.today().isoformat()
+
+
+def rebuild_analytics(db_name=None):
+    """
+    Recompute the rollup tables from BorrowingHistory in one transaction.
+    A repair command (see rebuild_analytics.py), the triggers keep the
+    rollups current otherwise. Returns {"run_at", "elapsed", "rows": {table: count}}.
+    """
+    conn = get_db_connection(db_name)
+    try:
+        start = time.perf_counter()
+        now = datetime.now()
+        conn.execute("BEGIN IMMEDIATE")
+        run_script(conn, ANALYTICS_REBUILD)
+        report = {
+            "run_at": now.isoformat(timespec="seconds"),
+            "rows": {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                     for table in ("DailyCirculation", "ItemPopularity", "PatronActivity")},
+            "elapsed": round(time.perf_counter() - start, 4),
+        }
+        conn.execute(
+            """INSERT INTO MaintenanceRuns (job, last_run, report) VALUES (?, ?, ?)
+            ON CONFLICT(job) DO UPDATE SET last_run = excluded.last_run, report = excluded.report""",
+            (ANALYTICS_REBUILD_JOB, report["run_at"], json.dumps(report))
+        )
+        conn.commit()
+        return report
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def get_daily_circulation(start_date, end_date, item_type=None, db_name=None):
+    """Checkouts, returns and late returns per day (and item type) in [start_date, end_date]"""
+    conn = get_db_connection(db_name)
+    try:
+        sql = """SELECT day, item_type, checkouts, returns, late_returns FROM DailyCirculation
+                 WHERE day BETWEEN ? AND ?"""
+        params = [start_date, end_date]
+        if item_type:
+            sql += " AND item_type = ?"
+            params.append(item_type)
+        rows = conn.execute(sql + " ORDER BY day, item_type", params).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def get_circulation_by_type(start_date, end_date, db_name=None):
+    """Totals per item type in [start_date, end_date], with the share of returns that came back late"""
+    conn = get_db_connection(db_name)
+    try:
+        rows = conn.execute(
+            """
+            SELECT item_type, SUM(checkouts) AS checkouts, SUM(returns) AS returns,
+                   SUM(late_returns) AS late_returns,
+                   ROUND(1.0 * SUM(late_returns) / NULLIF(SUM(returns), 0), 4) AS overdue_rate
+            FROM DailyCirculation
+            WHERE day BETWEEN ? AND ?
+            GROUP BY item_type
+            ORDER BY checkouts DESC
+            """,
+            (start_date, end_date)
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def get_popular_items(limit=10, db_name=None):
+    """Most borrowed items of all time"""
+    conn = get_db_connection(db_name)
+    try:
+        rows = conn.execute(
+            """
+            SELECT p.item_id, i.title, i.creator, i.type, p.checkouts, p.last_checkout
+            FROM ItemPopularity p
+            JOIN Items i ON i.item_id = p.item_id
+            ORDER BY p.checkouts DESC, p.item_id
+            LIMIT ?
+            """,
+            (limit,)
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def get_patron_activity(today=None, db_name=None):
+    """
+    Patrons who ever borrowed, bucketed by days since their last checkout
+    (ACTIVITY_BUCKETS), plus how many have loans open or returned late.
+    """
+    today = _today(today)
+    bounds = [(label, (date.fromisoformat(today) - timedelta(days=days)).isoformat() if days else None)
+              for label, days in ACTIVITY_BUCKETS]
+    # newest bucket first: the first bound the last checkout is on or after
+    case = " ".join(f"WHEN last_checkout >= '{since}' THEN {i}" for i, (_, since) in enumerate(bounds) if since)
+    conn = get_db_connection(db_name)
+    try:
+        counts = {row['bucket']: row['patrons'] for row in conn.execute(
+            f"""SELECT CASE {case} ELSE {len(bounds) - 1} END AS bucket, COUNT(*) AS patrons
+                FROM PatronActivity GROUP BY bucket"""
+        )}
+        totals = conn.execute(
+            """SELECT COUNT(*) AS patrons, COALESCE(SUM(open_loans > 0), 0) AS with_open_loans,
+                      COALESCE(SUM(late_returns > 0), 0) AS with_late_returns
+               FROM PatronActivity"""
+        ).fetchone()
+        return {
+            "buckets": [{"bucket": label, "patrons": counts.get(i, 0)} for i, (label, _) in enumerate(bounds)],
+            **dict(totals),
+        }
+    finally:
+        conn.close()
+
+
+def get_analytics_summary(days=30, today=None, db_name=None):
+    """Dashboard overview: the last `days` days by item type, top items and patron activity"""
+    today = _today(today)
+    start = (date.fromisoformat(today) - timedelta(days=days - 1)).isoformat()
+    by_type = get_circulation_by_type(start, today, db_name=db_name)
+    returns = sum(row['returns'] for row in by_type)
+    return {
+        "start_date": start,
+        "end_date": today,
+        "checkouts": sum(row['checkouts'] for row in by_type),
+        "returns": returns,
+        "late_returns": sum(row['late_returns'] for row in by_type),
+        "overdue_rate": round(sum(row['late_returns'] for row in by_type) / returns, 4) if returns else None,
+        "by_type": by_type,
+        "popular_items": get_popular_items(10, db_name=db_name),
+        "patron_activity": get_patron_activity(today, db_name=db_name),
+    }
+
+
+## INSTRUMENTATION ##
+
+instrument_functions(globals(), __name__)
@@ -0,0 +1,70 @@
+"""
+asyncio version of database.services, for a web front end.
+
+Every public function of services has an async twin here with the same name,
+arguments and return value (and the same exceptions):
+
+    from database import async_services
+    items = await async_services.get_available_items()
+
+SQLite calls block, so they run on a small dedicated executor instead of the
+event loop. Its size matches the connection pool, any number of concurrent
+sessions share those few threads and simply queue for them.
+"""
+import asyncio
+import functools
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from . import services
+from .connection import POOL_MAX_SIZE
+
+DB_EXECUTOR_THREADS = POOL_MAX_SIZE
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The executor database calls run on (created on first use)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_THREADS,
+                                           thread_name_prefix="library-db")
+        return _executor
+
+
+def shutdown(wait=True):
+    """Stop the executor (e.g. on server shutdown); it is recreated if used again"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run(fn, *args, **kwargs):
+    """Await any blocking call (e.g. several services calls in a row) on the DB executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def _make_async(fn):
+    @functools.wraps(fn)
+    async def call(*args, **kwargs):
+        return await run(fn, *args, **kwargs)
+    return call
+
+
+__all__ = ["get_executor", "shutdown", "run"]
+
+for _name, _fn in inspect.getmembers(services, inspect.isfunction):
+    # public service functions only, not helpers imported into services
+    if _name.startswith("_") or _fn.__module__ != services.__name__:
+        continue
+    globals()[_name] = _make_async(_fn)
+    __all__.append(_name)
+
+del _name, _fn
@@ -0,0 +1,150 @@
+"""
+In-process read-through cache for hot service lookups.
+
+    @cached("items", max_size=2048, ttl=60)
+    def get_item(item_id, db_name=None): ...
+
+    get_item.invalidate(item_id, db_name=db_name)   # one entry
+    get_item.cache.clear()                          # everything
+
+Entries are keyed by the call's bound arguments (so get_item(5) and
+get_item(item_id=5) share an entry) and expire after `ttl` seconds, which
+bounds how stale a value written by another terminal can get. Writes made
+through services invalidate explicitly; a lookup that was already reading
+when its key was invalidated returns what it read but doesn't cache it, so
+an older value can't outlive the write. Values are copied on the way out,
+callers may modify what they get back.
+"""
+import copy
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+_caches = {}
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry time to live"""
+
+    def __init__(self, name, max_size=1024, ttl=60.0):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._loads = {}  # key -> [invalidations, loads running] while a miss is being computed
+        self._epoch = 0   # bumped by clear()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0,
+                      "stale_loads": 0}
+
+    def get(self, key):
+        """(True, value) on a hit, (False, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return True, entry[1]
+                del self._entries[key]
+                self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            self._put(key, value)
+
+    def _put(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def load(self, key, compute):
+        """
+        Fill a miss with compute(). The value is only stored if the key wasn't
+        invalidated (and the cache not cleared) while compute() ran, since it
+        may have been read before that write committed.
+        """
+        with self._lock:
+            state = self._loads.setdefault(key, [0, 0])
+            state[1] += 1
+            token = (state[0], self._epoch)
+        try:
+            value = compute()
+        except BaseException:
+            with self._lock:
+                self._end_load(key)
+            raise
+        with self._lock:
+            if (self._loads[key][0], self._epoch) == token:
+                self._put(key, value)
+            else:
+                self.stats["stale_loads"] += 1
+            self._end_load(key)
+        return value
+
+    def _end_load(self, key):
+        state = self._loads[key]
+        state[1] -= 1
+        if not state[1]:
+            del self._loads[key]
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._loads:
+                self._loads[key][0] += 1
+            if self._entries.pop(key, None) is not None:
+                self.stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self.stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats, size=len(self._entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+def cached(name, max_size=1024, ttl=60.0):
+    """Decorator: read-through cache a service function under `name`"""
+    def decorate(fn):
+        cache = _caches[name] = LRUCache(name, max_size, ttl)
+        signature = inspect.signature(fn)
+
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(bound.arguments.items())
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            hit, value = cache.get(key)
+            if not hit:
+                value = cache.load(key, lambda: fn(*args, **kwargs))
+            return copy.deepcopy(value)
+
+        wrapper.cache = cache
+        wrapper.invalidate = lambda *args, **kwargs: cache.invalidate(make_key(args, kwargs))
+        return wrapper
+    return decorate
+
+
+def get_cache_stats():
+    """{cache name: hit/miss/eviction counters} for every cache"""
+    return {name: cache.get_stats() for name, cache in _caches.items()}
+
+
+def clear_caches():
+    for cache in _caches.values():
+        cache.clear()
@@ -0,0 +1,285 @@
+"""
+Streaming bulk import of catalog records into Items.
+
+    report = import_catalog("acquisitions.csv", progress=print)
+
+Input formats (picked from the file extension, or format=...):
+  csv    header row with title, creator, type, replacement_cost
+         (aliases: author, item_type, cost, price)
+  jsonl  one JSON object per line with the same keys
+  mrk    "MARC-lite": MARCMaker mnemonic text, one record per block of
+         "=TAG  ind$a..." lines separated by blank lines. Title from 245
+         $a/$b, creator from 100/110/111/700 $a, price from 365 $b or 020 $c,
+         type from a local 990 $a or else the leader's type of record.
+
+Records are read and validated one at a time and inserted with executemany
+in chunks of `chunk_size`, committing every `transaction_rows` rows, so
+memory use doesn't grow with the file. Invalid records are skipped and
+reported (or raise ValueError with strict=True).
+
+defer_indexes=True drops the Items indexes and the catalog search trigger
+for the duration of the import and rebuilds them at the end, which is much
+faster for large loads. The whole import then runs as one transaction
+(other terminals wait on the write lock, the catalog is never left without
+its indexes).
+"""
+import csv
+import json
+import os
+import re
+import time
+
+from . import services
+from .connection import get_db_connection
+
+CHUNK_SIZE = 10_000
+TRANSACTION_ROWS = 200_000
+MAX_REPORTED_ERRORS = 100
+
+FIELD_ALIASES = {
+    "title": "title",
+    "creator": "creator",
+    "author": "creator",
+    "type": "type",
+    "item_type": "type",
+    "replacement_cost": "replacement_cost",
+    "cost": "replacement_cost",
+    "price": "replacement_cost",
+}
+
+FORMATS_BY_EXTENSION = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".mrk": "mrk", ".txt": "mrk"}
+
+# MARC leader/06 (type of record) -> item type; leader/07 's' (serial) is a Magazine
+MARC_RECORD_TYPES = {
+    "a": "Physical Book",
+    "t": "Physical Book",
+    "g": "DVD",
+    "i": "Audiobook",
+    "j": "CD",
+    "m": "Online Book",
+}
+MARC_CREATOR_TAGS = ("100", "110", "111", "700")
+
+_COST_PATTERN = re.compile(r"\d+(?:[.,]\d{1,2})?")
+
+
+## READERS ##
+
+def _normalize_keys(record):
+    return {FIELD_ALIASES[key.strip().lower()]: value for key, value in record.items()
+            if key and key.strip().lower() in FIELD_ALIASES}
+
+
+def read_csv(path):
+    """(line number, record) for each CSV row"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        for record in reader:
+            yield reader.line_num, _normalize_keys(record)
+
+
+def read_jsonl(path):
+    """(line number, record) for each non-empty JSONL line"""
+    with open(path, encoding="utf-8") as f:
+        for line_num, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_num, ValueError(f"invalid JSON: {e.msg}")
+                continue
+            if not isinstance(record, dict):
+                yield line_num, ValueError("expected a JSON object")
+                continue
+            yield line_num, _normalize_keys(record)
+
+
+def _subfields(data):
+    """'10$aTitle :$bsubtitle' -> {'a': 'Title :', 'b': 'subtitle'} (first occurrence wins)"""
+    subfields = {}
+    for part in data.split("$")[1:]:
+        if part:
+            subfields.setdefault(part[0], part[1:].strip())
+    return subfields
+
+
+def _marc_record(fields):
+    leader = fields.get("LDR", [""])[0]
+    title_fields = _subfields(fields.get("245", [""])[0])
+    title = " ".join(filter(None, (title_fields.get("a"), title_fields.get("b"))))
+    record = {"title": title.rstrip(" /:;,.") or None}
+
+    for tag in MARC_CREATOR_TAGS:
+        if tag in fields:
+            record["creator"] = _subfields(fields[tag][0]).get("a", "").rstrip(" ,.") or None
+            break
+
+    for tag, code in (("365", "b"), ("020", "c")):
+        for data in fields.get(tag, []):
+            match = _COST_PATTERN.search(_subfields(data).get(code, ""))
+            if match:
+                record["replacement_cost"] = match.group().replace(",", ".")
+                break
+        if "replacement_cost" in record:
+            break
+
+    if "990" in fields:
+        record["type"] = _subfields(fields["990"][0]).get("a")
+    elif len(leader) > 7 and leader[7] == "s":
+        record["type"] = "Magazine"
+    elif len(leader) > 6:
+        record["type"] = MARC_RECORD_TYPES.get(leader[6], "Other")
+    return record
+
+
+def read_mrk(path):
+    """(line number of the record's first line, record) for each MARCMaker record"""
+    with open(path, encoding="utf-8") as f:
+        fields, start = {}, None
+        for line_num, line in enumerate(f, start=1):
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                if fields:
+                    yield start, _marc_record(fields)
+                fields, start = {}, None
+                continue
+            if not line.startswith("="):
+                continue
+            tag, _, data = line[1:].partition("  ")
+            fields.setdefault(tag.strip(), []).append(data)
+            start = start or line_num
+        if fields:
+            yield start, _marc_record(fields)
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "mrk": read_mrk}
+
+
+## VALIDATION ##
+
+_CANONICAL_TYPES = {item_type.lower(): item_type for item_type in services.ITEM_TYPES}
+
+
+def validate_record(record):
+    """(title, type, creator, replacement_cost) for an Items row; ValueError if invalid"""
+    if isinstance(record, ValueError):
+        raise record
+    title = str(record.get("title") or "").strip()
+    creator = str(record.get("creator") or "").strip()
+    item_type = str(record.get("type") or "").strip()
+    if not title:
+        raise ValueError("title is required")
+    if len(title) > 100:
+        raise ValueError("title is longer than 100 characters")
+    if not creator:
+        raise ValueError("creator is required")
+    if len(creator) > 50:
+        raise ValueError("creator is longer than 50 characters")
+    canonical = _CANONICAL_TYPES.get(item_type.lower())
+    if canonical is None:
+        raise ValueError(f"unknown item type {item_type!r}")
+
+    cost = record.get("replacement_cost")
+    try:
+        cost = float(cost)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid replacement cost {cost!r}")
+    if not cost > 0 or cost == float("inf"):
+        raise ValueError(f"replacement cost must be positive, got {cost!r}")
+    return title, canonical, creator, round(cost, 2)
+
+
+## IMPORT ##
+
+def _deferred_objects(conn):
+    """CREATE statements of the Items indexes and the catalog search insert trigger"""
+    return conn.execute("""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE tbl_name = 'Items' AND sql IS NOT NULL
+          AND (type = 'index' OR (type = 'trigger' AND name = 'items_fts_insert'))
+    """).fetchall()
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS_BY_EXTENSION:
+        raise ValueError(f"Cannot tell the format of {path}, pass one of: {', '.join(READERS)}")
+    return FORMATS_BY_EXTENSION[extension]
+
+
+def import_catalog(path, format=None, chunk_size=CHUNK_SIZE, transaction_rows=TRANSACTION_ROWS,
+                   defer_indexes=False, strict=False, progress=None, db_name=None):
+    """
+    Import catalog records from `path` as available Items.
+    progress(report) is called after every chunk with the running report.
+    Returns {"read", "imported", "skipped", "errors", "first_item_id",
+    "last_item_id", "elapsed"}; errors lists (line, message) for the first
+    MAX_REPORTED_ERRORS invalid records.
+    """
+    reader = READERS.get(format or detect_format(path))
+    if reader is None:
+        raise ValueError(f"Unknown import format {format!r}, expected one of: {', '.join(READERS)}")
+
+    start = time.perf_counter()
+    report = {"read": 0, "imported": 0, "skipped": 0, "errors": [],
+              "first_item_id": None, "last_item_id": None, "elapsed": 0.0}
+    insert = ("INSERT INTO Items (title, type, creator, replacement_cost, status) "
+              "VALUES (?, ?, ?, ?, 'available') RETURNING item_id")
+
+    conn = get_db_connection(db_name)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        deferred = _deferred_objects(conn) if defer_indexes else []
+        for object_type, name, _ in deferred:
+            conn.execute(f"DROP {object_type.upper()} {name}")
+
+        def flush(rows):
+            # we hold the write lock and new rowids are max(item_id) + 1: a chunk's ids are consecutive
+            first = conn.execute(insert, rows[0]).fetchone()[0]
+            conn.executemany(insert.replace(" RETURNING item_id", ""), rows[1:])
+            if report["first_item_id"] is None:
+                report["first_item_id"] = first
+            report["last_item_id"] = first + len(rows) - 1
+            report["imported"] += len(rows)
+            if not defer_indexes and report["imported"] % transaction_rows < len(rows):
+                conn.commit()
+                conn.execute("BEGIN IMMEDIATE")
+            report["elapsed"] = time.perf_counter() - start
+            if progress:
+                progress(report)
+
+        rows = []
+        for line, record in reader(path):
+            report["read"] += 1
+            try:
+                rows.append(validate_record(record))
+            except ValueError as e:
+                if strict:
+                    raise ValueError(f"{os.path.basename(path)}, line {line}: {e}")
+                report["skipped"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append((line, str(e)))
+                continue
+            if len(rows) >= chunk_size:
+                flush(rows)
+                rows = []
+        if rows:
+            flush(rows)
+
+        for _, _, sql in deferred:
+            conn.execute(sql)
+        if any(name == "items_fts_insert" for _, name, _ in deferred):
+            conn.execute("INSERT INTO ItemsFTS(ItemsFTS) VALUES ('rebuild')")
+        conn.commit()
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    # get_item caches misses too, new ids may have been looked up before
+    services.get_item.cache.clear()
+    report["elapsed"] = time.perf_counter() - start
+    return report
@@ -1,12 +1,311 @@
 from pathlib import Path
+import os
 import sqlite3
+import threading
+import time
+
+from . import instrumentation
+from .migrations import migrate
 
 DB_PATH = "database/library.db"  # project root /library.db
 
-def get_db_connection(db_name=None):
+# What ":memory:" is pooled as: every plain ":memory:" connection is a new
+# empty database, pooled ones have to share one (it lives until the process exits)
+MEMORY_URI = "file:library-memory?mode=memory&cache=shared"
+
+# Idle connections kept per database file. Checkouts beyond this still succeed,
+# the surplus connections are simply closed on checkin instead of being kept.
+POOL_MAX_SIZE = 4
+
+# Idle connections older than this (seconds) get a `SELECT 1` before reuse
+HEALTH_CHECK_AFTER = 30.0
+
+# PRAGMAs applied to every new connection. "wal" lets the desk terminals
+# read while another one writes; "rollback" is the classic journal for
+# filesystems where WAL's shared memory doesn't work (e.g. network shares).
+# busy_timeout makes a writer wait for the lock instead of failing at once
+# with "database is locked".
+PRAGMA_PROFILES = {
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",      # durable at checkpoints, safe with WAL
+        "busy_timeout": 5000,         # ms
+        "cache_size": -16000,         # KiB (negative = size, not pages)
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+    "rollback": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "cache_size": -16000,
+        "mmap_size": 0,
+        "temp_store": "MEMORY",
+    },
+}
+
+# Profile for pools that don't configure one, selectable per deployment
+DEFAULT_PROFILE = os.environ.get("LIBRARY_DB_PROFILE", "wal")
+
+
+def _resolve_profile(profile):
+    """Profile name or dict of PRAGMAs -> dict of PRAGMAs"""
+    if isinstance(profile, dict):
+        return profile
+    if profile not in PRAGMA_PROFILES:
+        raise ValueError(f"Unknown database profile: {profile}")
+    return PRAGMA_PROFILES[profile]
+
+
+class PooledConnection:
+    """
+    Thin proxy around a sqlite3.Connection checked out from a ConnectionPool.
+    Behaves like the raw connection, except close() hands it back to the pool.
+    Statements and transactions run through it are timed (see instrumentation).
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+        self._tx_start = None
+
+    def _checked(self):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return self._conn
+
+    def __getattr__(self, name):
+        return getattr(self._checked(), name)
+
+    def _run(self, method, sql, params, record_params):
+        if not instrumentation.ENABLED:
+            return method(sql, params)
+        in_transaction = self._conn.in_transaction
+        start = time.perf_counter()
+        cursor = method(sql, params)
+        elapsed = time.perf_counter() - start
+        if not in_transaction and self._conn.in_transaction:
+            self._tx_start = start
+        instrumentation.record_statement(self._conn, sql, record_params, elapsed, max(cursor.rowcount, 0))
+        return cursor
+
+    def _end_transaction(self):
+        if self._tx_start is not None and not self._conn.in_transaction:
+            instrumentation.record_timing("transaction", time.perf_counter() - self._tx_start)
+            self._tx_start = None
+
+    def execute(self, sql, params=()):
+        cursor = self._run(self._checked().execute, sql, params, params)
+        return instrumentation.TimedCursor(cursor, sql) if instrumentation.ENABLED else cursor
+
+    def executemany(self, sql, seq_of_params):
+        return self._run(self._checked().executemany, sql, seq_of_params, None)
+
+    def cursor(self):
+        return PooledCursor(self, self._checked().cursor())
+
+    def commit(self):
+        self._checked().commit()
+        self._end_transaction()
+
+    def rollback(self):
+        self._checked().rollback()
+        self._end_transaction()
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        result = self._conn.__exit__(exc_type, exc, tb)
+        self._end_transaction()
+        return result
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.checkin(conn)  # rolls back an unfinished transaction
+            if self._tx_start is not None:
+                instrumentation.record_timing("transaction", time.perf_counter() - self._tx_start)
+                self._tx_start = None
+
+
+class PooledCursor:
+    """Cursor of a PooledConnection, times execute()/executemany() like the connection does"""
+
+    def __init__(self, connection, cursor):
+        self._connection = connection
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, sql, params=()):
+        self._connection._run(self._cursor.execute, sql, params, params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._connection._run(self._cursor.executemany, sql, seq_of_params, None)
+        return self
+
+
+class ConnectionPool:
+    """Checkout/checkin pool of connections to a single SQLite file"""
+
+    def __init__(self, path, max_size=POOL_MAX_SIZE, profile=None):
+        self.path = path
+        self.max_size = max_size
+        self.pragmas = _resolve_profile(profile or DEFAULT_PROFILE)
+        self._idle = []  # (conn, last_used)
+        self._lock = threading.Lock()
+        self._migrate_lock = threading.Lock()  # held while the first connection migrates
+        self._migrated = False
+        self._keeper = None  # in-memory databases: an unpooled connection that keeps it alive
+        self.stats = {"hits": 0, "misses": 0, "opened": 0, "discarded": 0,
+                      "open_time_total": 0.0, "open_time_max": 0.0}
+
+    def _open(self):
+        start = time.perf_counter()
+        # Connections move between threads through the pool, but only one
+        # thread holds a given connection at a time (checkout/checkin).
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON;")
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        elapsed = time.perf_counter() - start
+        instrumentation.record_timing("connection_open", elapsed)
+        with self._lock:
+            self.stats["opened"] += 1
+            self.stats["open_time_total"] += elapsed
+            self.stats["open_time_max"] = max(self.stats["open_time_max"], elapsed)
+        if not self._migrated:
+            with self._migrate_lock:
+                if not self._migrated:
+                    try:
+                        if "mode=memory" in self.path:
+                            self._keeper = self._keeper or self._connect()
+                        migrate(conn)
+                    except sqlite3.Error:
+                        conn.close()
+                        raise
+                    self._migrated = True
+        return conn
+
+    def _connect(self):
+        return sqlite3.connect(self.path, check_same_thread=False, uri=self.path.startswith("file:"))
+
+    def _is_healthy(self, conn, last_used):
+        if time.monotonic() - last_used < HEALTH_CHECK_AFTER:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def checkout(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    self.stats["misses"] += 1
+                    break
+                conn, last_used = self._idle.pop()
+            if self._is_healthy(conn, last_used):
+                with self._lock:
+                    self.stats["hits"] += 1
+                return PooledConnection(self, conn)
+            self._discard(conn)
+        return PooledConnection(self, self._open())
+
+    def checkin(self, conn):
+        try:
+            # never hand out a connection with a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        self._discard(conn)
+
+    def _discard(self, conn):
+        with self._lock:
+            self.stats["discarded"] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(db_name=None):
     path = str(db_name or DB_PATH)
-    print("Opening DB:", db_name or DB_PATH)
-    conn = sqlite3.connect(path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    if path == ":memory:":
+        return MEMORY_URI
+    if path.startswith("file:"):
+        return path
+    return os.path.abspath(path)
+
+
+def get_pool(db_name=None):
+    """Return (creating on first use) the pool for a database path"""
+    key = _pool_key(db_name)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(key)
+        return pool
+
+
+def configure_pool(db_name=None, max_size=None, profile=None):
+    """
+    Change pool settings for a database path. A new PRAGMA profile (name in
+    PRAGMA_PROFILES or a dict) applies to connections opened from now on, so
+    the idle ones are closed.
+    """
+    pool = get_pool(db_name)
+    if max_size is not None:
+        pool.max_size = max_size
+    if profile is not None:
+        pool.pragmas = _resolve_profile(profile)
+        pool.close_all()
+    return pool
+
+
+def get_pool_stats(db_name=None):
+    """Pool-hit and connection-open counters for a database path"""
+    pool = get_pool(db_name)
+    with pool._lock:
+        stats = dict(pool.stats)
+        stats["idle"] = len(pool._idle)
+    stats["open_time_avg"] = stats["open_time_total"] / stats["opened"] if stats["opened"] else 0.0
+    return stats
+
+
+def close_all_pools():
+    """Close every idle pooled connection (e.g. on application exit)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
+
+def get_db_connection(db_name=None):
+    """Check out a pooled connection; conn.close() returns it to the pool"""
+    return get_pool(db_name).checkout()
@@ -0,0 +1,215 @@
+"""
+Streaming exports of history and report tables.
+
+    export("borrowing_history", "audit_2024.csv", start_date="2024-01-01", end_date="2024-12-31")
+
+Rows are read in batches of `batch_size` and written as they arrive, so
+memory use is the same for a hundred rows or the full history. Borrowing
+history is read from OpenLoans and LoanArchive separately, each in its
+checkout index order, and the two streams are merged here: sorting the
+BorrowingHistory view would build a temp B-tree of the whole selection.
+
+Datasets: borrowing_history (filtered on checkout date), events (event
+date), acquisition_requests (no date column, can't be date-filtered).
+Formats: csv, jsonl, and parquet when pyarrow is installed (one row group
+per batch).
+"""
+import csv
+import heapq
+import json
+import os
+import time
+from itertools import islice
+
+from .connection import get_db_connection
+from .services import LOAN_SOURCES
+
+BATCH_SIZE = 5_000
+
+# name -> query parts; columns are (name, type) with type one of int/float/str.
+# With "sources" the select is run once per source (its {source}) and the
+# results merged on the "merge_key" columns, which must match order_by.
+DATASETS = {
+    "borrowing_history": {
+        "select": """
+            SELECT bh.id AS patron_id, p.first_name || ' ' || p.last_name AS patron_name,
+                   bh.item_id, i.title, i.creator, i.type, bh.checkoutDate, bh.due_date,
+                   bh.returnDate, bh.lost_date, i.status
+            FROM {source} bh
+            JOIN Items i ON i.item_id = bh.item_id
+            JOIN Patron p ON p.id = bh.id
+        """,
+        "sources": LOAN_SOURCES,
+        "merge_key": ("checkoutDate", "patron_id", "item_id"),
+        "date_column": "bh.checkoutDate",
+        "order_by": "bh.checkoutDate, bh.id, bh.item_id",
+        "columns": [("patron_id", int), ("patron_name", str), ("item_id", int), ("title", str),
+                    ("creator", str), ("type", str), ("checkoutDate", str), ("due_date", str),
+                    ("returnDate", str), ("lost_date", str), ("status", str)],
+    },
+    "events": {
+        "select": """
+            SELECT e.event_id, e.eventName, e.date, e.start_time, e.end_time, e.roomNum, e.audience, e.organizer,
+                   p.first_name || ' ' || p.last_name AS organizer_name,
+                   e.capacity, e.seats_taken AS registrations
+            FROM Events e
+            LEFT JOIN Patron p ON p.id = e.organizer
+        """,
+        "date_column": "e.date",
+        "order_by": "e.date, e.start_time, e.event_id",
+        "columns": [("event_id", int), ("eventName", str), ("date", str), ("start_time", str),
+                    ("end_time", str), ("roomNum", str), ("audience", str), ("organizer", int),
+                    ("organizer_name", str), ("capacity", int), ("registrations", int)],
+    },
+    "acquisition_requests": {
+        "select": """
+            SELECT ar.request_id, ar.requested_by, p.first_name || ' ' || p.last_name AS requested_by_name,
+                   ar.request_status, ar.item_type, ar.creator, ar.title
+            FROM AcquisitionRequest ar
+            LEFT JOIN Patron p ON p.id = ar.requested_by
+        """,
+        "date_column": None,
+        "order_by": "ar.request_id",
+        "columns": [("request_id", int), ("requested_by", int), ("requested_by_name", str),
+                    ("request_status", str), ("item_type", str), ("creator", str), ("title", str)],
+    },
+}
+
+FORMATS_BY_EXTENSION = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+
+
+## READING ##
+
+def _dataset(name):
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset {name!r}, expected one of: {', '.join(DATASETS)}")
+    return DATASETS[name]
+
+
+def dataset_queries(dataset, start_date=None, end_date=None):
+    """[(sql, params)] read by iter_batches, one per source of the dataset"""
+    spec = _dataset(dataset)
+    conditions, params = [], []
+    if start_date or end_date:
+        if spec["date_column"] is None:
+            raise ValueError(f"{dataset} has no date column to filter on")
+        if start_date:
+            conditions.append(f"{spec['date_column']} >= ?")
+            params.append(str(start_date))
+        if end_date:
+            conditions.append(f"{spec['date_column']} <= ?")
+            params.append(str(end_date))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    selects = [spec["select"].format(source=source) for source in spec["sources"]] if "sources" in spec \
+        else [spec["select"]]
+    return [(f"{select} {where} ORDER BY {spec['order_by']}", params) for select in selects]
+
+
+def iter_batches(dataset, start_date=None, end_date=None, batch_size=BATCH_SIZE, db_name=None):
+    """Yield lists of row tuples (in DATASETS[dataset]["columns"] order), oldest first"""
+    spec = _dataset(dataset)
+    queries = dataset_queries(dataset, start_date, end_date)
+
+    conn = get_db_connection(db_name)
+    try:
+        # every statement steps through its index as rows are taken
+        streams = [map(tuple, conn.execute(sql, params)) for sql, params in queries]
+        if len(streams) == 1:
+            rows = streams[0]
+        else:
+            names = [name for name, _ in spec["columns"]]
+            positions = [names.index(name) for name in spec["merge_key"]]
+            rows = heapq.merge(*streams, key=lambda row: [row[i] for i in positions])
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+    finally:
+        conn.close()
+
+
+def iter_records(dataset, start_date=None, end_date=None, batch_size=BATCH_SIZE, db_name=None):
+    """Yield one dict per row"""
+    names = [name for name, _ in _dataset(dataset)["columns"]]
+    for batch in iter_batches(dataset, start_date, end_date, batch_size, db_name):
+        for row in batch:
+            yield dict(zip(names, row))
+
+
+## WRITERS ##
+
+def _write_csv(path, columns, batches):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([name for name, _ in columns])
+        for batch in batches:
+            writer.writerows(batch)
+            yield len(batch)
+
+
+def _write_jsonl(path, columns, batches):
+    names = [name for name, _ in columns]
+    with open(path, "w", encoding="utf-8") as f:
+        for batch in batches:
+            f.writelines(json.dumps(dict(zip(names, row)), ensure_ascii=False) + "\n" for row in batch)
+            yield len(batch)
+
+
+def _write_parquet(path, columns, batches):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export needs the pyarrow package (pip install pyarrow)")
+
+    types = {int: pa.int64(), float: pa.float64(), str: pa.string()}
+    schema = pa.schema([(name, types[column_type]) for name, column_type in columns])
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in batches:
+            arrays = [pa.array([row[i] for row in batch], type=schema.field(i).type)
+                      for i in range(len(columns))]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield len(batch)
+
+
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS_BY_EXTENSION:
+        raise ValueError(f"Cannot tell the format of {path}, pass one of: {', '.join(WRITERS)}")
+    return FORMATS_BY_EXTENSION[extension]
+
+
+def export(dataset, path, format=None, start_date=None, end_date=None, batch_size=BATCH_SIZE,
+           progress=None, db_name=None):
+    """
+    Write a dataset to `path`. progress(rows written so far) is called after
+    every batch. Returns {"dataset", "path", "format", "rows", "elapsed"}.
+    A failed export removes its partial file.
+    """
+    columns = _dataset(dataset)["columns"]
+    format = format or detect_format(path)
+    writer = WRITERS.get(format)
+    if writer is None:
+        raise ValueError(f"Unknown export format {format!r}, expected one of: {', '.join(WRITERS)}")
+    batches = iter_batches(dataset, start_date, end_date, batch_size, db_name)
+    writing = writer(path, columns, batches)
+
+    start = time.perf_counter()
+    rows = 0
+    try:
+        for written in writing:
+            rows += written
+            if progress:
+                progress(rows)
+    except BaseException:
+        writing.close()
+        batches.close()
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return {"dataset": dataset, "path": path, "format": format, "rows": rows,
+            "elapsed": time.perf_counter() - start}
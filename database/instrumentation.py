@@ -0,0 +1,237 @@
+"""
+Latency instrumentation for the service layer.
+
+Records into an in-process registry:
+  - per services function: calls, errors, latency histogram, rows returned
+  - per SQL statement (whitespace-normalized text): executions, latency
+    histogram, rows fetched/changed
+  - connection open time and transaction duration
+
+Statements slower than SLOW_QUERY_MS are logged together with their
+EXPLAIN QUERY PLAN and kept in a short list for the staff dashboard.
+get_metrics() returns a JSON-serializable snapshot, export_metrics(path)
+writes it to a file. LIBRARY_INSTRUMENTATION=0 turns recording off.
+"""
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("LIBRARY_INSTRUMENTATION", "1") != "0"
+
+# Statements at or above this latency (ms) go to the slow-query log
+SLOW_QUERY_MS = float(os.environ.get("LIBRARY_SLOW_QUERY_MS", "100"))
+SLOW_QUERY_LOG_SIZE = 50
+
+# Histogram bucket upper bounds in ms (last bucket: everything above)
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+_lock = threading.Lock()
+_functions = {}
+_statements = {}
+_timings = {}  # "connection_open", "transaction"
+_slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+
+def _new_stats():
+    return {"count": 0, "errors": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "buckets": [0] * (len(BUCKETS_MS) + 1)}
+
+
+def _add(registry, key, elapsed_ms, rows=0, error=False):
+    with _lock:
+        stats = registry.get(key)
+        if stats is None:
+            stats = registry[key] = _new_stats()
+        stats["count"] += 1
+        stats["errors"] += bool(error)
+        stats["rows"] += rows
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["buckets"][bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+
+
+def _percentile(buckets, count, fraction):
+    """Upper bound (ms) of the bucket holding the given fraction of samples"""
+    if not count:
+        return 0.0
+    seen = 0
+    for i, n in enumerate(buckets):
+        seen += n
+        if seen >= fraction * count:
+            return BUCKETS_MS[i] if i < len(BUCKETS_MS) else float("inf")
+    return float("inf")
+
+
+def normalize_sql(sql):
+    return " ".join(sql.split())
+
+
+## RECORDING ##
+
+def record_statement(conn, sql, params, elapsed, rows=0):
+    """Record one statement execution; slow ones get their query plan logged"""
+    if not ENABLED:
+        return
+    key = normalize_sql(sql)
+    elapsed_ms = elapsed * 1000
+    _add(_statements, key, elapsed_ms, rows)
+    if elapsed_ms >= SLOW_QUERY_MS:
+        _log_slow_query(conn, key, params, elapsed_ms)
+
+
+def record_statement_rows(sql, rows, elapsed):
+    """Rows and time spent fetching the results of an already recorded statement"""
+    if not ENABLED:
+        return
+    with _lock:
+        stats = _statements.get(normalize_sql(sql))
+        if stats is not None:
+            stats["rows"] += rows
+            stats["total_ms"] += elapsed * 1000
+
+
+def record_timing(name, elapsed):
+    """Connection open time, transaction duration, ..."""
+    if ENABLED:
+        _add(_timings, name, elapsed * 1000)
+
+
+def _log_slow_query(conn, sql, params, elapsed_ms):
+    plan = []
+    # executemany passes params=None: no single parameter set to plan with
+    if params is not None and sql.split(" ", 1)[0].upper() in ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE"):
+        try:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+        except Exception as e:
+            plan = [f"(plan unavailable: {e})"]
+    logger.warning("slow query (%.1f ms): %s\n  plan: %s", elapsed_ms, sql, "; ".join(plan))
+    with _lock:
+        _slow_queries.append({"sql": sql, "elapsed_ms": round(elapsed_ms, 3), "plan": plan,
+                              "at": time.strftime("%Y-%m-%d %H:%M:%S")})
+
+
+class TimedCursor:
+    """Cursor proxy that adds fetched rows and fetch time to its statement's stats"""
+
+    def __init__(self, cursor, sql):
+        self._cursor = cursor
+        self._sql = sql
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _fetch(self, fetch, *args):
+        start = time.perf_counter()
+        result = fetch(*args)
+        rows = (result is not None) if not isinstance(result, list) else len(result)
+        record_statement_rows(self._sql, int(rows), time.perf_counter() - start)
+        return result
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(self._cursor.fetchmany, size or self._cursor.arraysize)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany(100)
+            if not rows:
+                return
+            yield from rows
+
+
+def _result_rows(result):
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict) and isinstance(result.get("rows"), list):
+        return len(result["rows"])
+    return 0
+
+
+def instrument(fn):
+    """Decorator recording latency, errors and returned rows of a service function"""
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not ENABLED:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            _add(_functions, name, (time.perf_counter() - start) * 1000, error=True)
+            raise
+        _add(_functions, name, (time.perf_counter() - start) * 1000, _result_rows(result))
+        return result
+    return wrapper
+
+
+def instrument_functions(namespace, module_name):
+    """Wrap every public function defined in a module (pass globals(), __name__)"""
+    for name, value in list(namespace.items()):
+        if (callable(value) and not name.startswith("_") and not isinstance(value, type)
+                and getattr(value, "__module__", None) == module_name):
+            namespace[name] = instrument(value)
+
+
+## REPORTING ##
+
+def _summary(stats):
+    count = stats["count"]
+    return {
+        "count": count,
+        "errors": stats["errors"],
+        "rows": stats["rows"],
+        "total_ms": round(stats["total_ms"], 3),
+        "avg_ms": round(stats["total_ms"] / count, 3) if count else 0.0,
+        "p50_ms": _percentile(stats["buckets"], count, 0.50),
+        "p95_ms": _percentile(stats["buckets"], count, 0.95),
+        "max_ms": round(stats["max_ms"], 3),
+        "buckets": list(stats["buckets"]),
+    }
+
+
+def get_metrics():
+    """Snapshot of everything recorded so far (JSON-serializable)"""
+    with _lock:
+        metrics = {
+            "bucket_bounds_ms": BUCKETS_MS,
+            "functions": {name: _summary(s) for name, s in _functions.items()},
+            "statements": {sql: _summary(s) for sql, s in _statements.items()},
+            "timings": {name: _summary(s) for name, s in _timings.items()},
+            "slow_queries": list(_slow_queries),
+        }
+    # infinite percentiles (overflow bucket) aren't valid JSON
+    for group in ("functions", "statements", "timings"):
+        for summary in metrics[group].values():
+            for key in ("p50_ms", "p95_ms"):
+                if summary[key] == float("inf"):
+                    summary[key] = None
+    return metrics
+
+
+def export_metrics(path):
+    """Write get_metrics() as JSON to `path`"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(get_metrics(), f, indent=2)
+    return path
+
+
+def reset_metrics():
+    with _lock:
+        _functions.clear()
+        _statements.clear()
+        _timings.clear()
+        _slow_queries.clear()
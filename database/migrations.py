@@ -0,0 +1,732 @@
+"""
+Versioned schema migrations for the library database.
+
+The schema version lives in SQLite's `PRAGMA user_version`. Each migration is
+a function that receives an open connection and runs inside one transaction
+together with the version bump, so a database is never left half-migrated.
+"""
+import re
+import secrets
+import sqlite3
+from datetime import date
+
+# Base schema (same as mp_sql.ipynb). Existing databases already have these
+# tables, IF NOT EXISTS makes this a no-op for them and bootstraps fresh files.
+BASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Patron (
+    id INTEGER NOT NULL,
+    first_name CHAR(50) NOT NULL,
+    last_name CHAR(50) NOT NULL,
+    email CHAR(40) NOT NULL,
+    PRIMARY KEY(id)
+);
+CREATE TABLE IF NOT EXISTS Items (
+    item_id INTEGER NOT NULL,
+    title CHAR(100) NOT NULL ,
+    type CHAR(50) NOT NULL,
+    creator CHAR(50) NOT NULL,
+    replacement_cost REAL NOT NULL,
+    status CHAR(15) NOT NULL,
+    PRIMARY KEY(item_id)
+);
+CREATE TABLE IF NOT EXISTS Staff (
+    id INTEGER NOT NULL,
+    position CHAR(30) NOT NULL,
+    salary REAL NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY (id) REFERENCES Patron(id)
+);
+CREATE TABLE IF NOT EXISTS BorrowingHistory (
+    id INTEGER NOT NULL,
+    item_id INTEGER NOT NULL,
+    checkoutDate CHAR(10) NOT NULL,
+    returnDate CHAR(10),
+    PRIMARY KEY(id, item_id),
+    FOREIGN KEY (id) REFERENCES Patron(id),
+    FOREIGN KEY (item_id) REFERENCES Items(item_id)
+);
+CREATE TABLE IF NOT EXISTS AcquisitionRequest (
+    request_id INTEGER NOT NULL,
+    requested_by INTEGER NOT NULL,
+    request_status TEXT NOT NULL,
+    item_type CHAR(50) NOT NULL,
+    creator CHAR(50) NOT NULL,
+    title CHAR(100) NOT NULL,
+    PRIMARY KEY (request_id),
+    FOREIGN KEY (requested_by) REFERENCES Patron(id)
+);
+CREATE TABLE IF NOT EXISTS Events (
+    event_id INTEGER NOT NULL,
+    organizer INTEGER NOT NULL,
+    eventName CHAR(70) NOT NULL,
+    date CHAR(10) NOT NULL,
+    roomNum CHAR(10) NOT NULL,
+    audience CHAR(70),
+    PRIMARY KEY (event_id),
+    FOREIGN KEY (organizer) REFERENCES Staff(id)
+);
+CREATE TABLE IF NOT EXISTS EventRegistrations (
+    registration_id INTEGER,
+    event_id INTEGER NOT NULL,
+    patron_id INTEGER NOT NULL,
+    registration_date CHAR(10) NOT NULL,
+    PRIMARY KEY (registration_id),
+    FOREIGN KEY (event_id) REFERENCES Events(event_id),
+    FOREIGN KEY (patron_id) REFERENCES Patron(id),
+    UNIQUE(event_id, patron_id)
+);
+CREATE TABLE IF NOT EXISTS StaffRecords (
+    record_id INTEGER,
+    staff_id INTEGER NOT NULL,
+    record_type CHAR(40) NOT NULL,
+    details CHAR(300),
+    date CHAR(10) NOT NULL,
+    PRIMARY KEY (record_id),
+    FOREIGN KEY (staff_id) REFERENCES Staff(id)
+);
+"""
+
+
+def run_script(conn, script):
+    """Run a multi-statement SQL script inside the caller's transaction"""
+    # executescript() would COMMIT first, run statement by statement instead.
+    # complete_statement() keeps trigger bodies (BEGIN ...; END) in one piece.
+    statement = ""
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):
+            if statement.strip(" \n;"):
+                conn.execute(statement)
+            statement = ""
+
+
+def _v1_base_schema(conn):
+    """Base tables from the project notebook"""
+    run_script(conn, BASE_SCHEMA)
+
+
+def _v2_index_pack(conn):
+    """Indexes for the hot predicates in services.py"""
+    run_script(conn, """
+        -- login by email (find_patron_with_staff), also enforces one account per email
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_patron_email ON Patron(email);
+
+        -- browse / borrow lists filter on status, help prompt on type + status
+        CREATE INDEX IF NOT EXISTS idx_items_status ON Items(status);
+        CREATE INDEX IF NOT EXISTS idx_items_type_status ON Items(type, status);
+
+        -- open loans only: the display-status LEFT JOINs probe by item_id,
+        -- the overdue scans range over checkoutDate
+        CREATE INDEX IF NOT EXISTS idx_bh_open_item
+            ON BorrowingHistory(item_id) WHERE returnDate IS NULL;
+        CREATE INDEX IF NOT EXISTS idx_bh_open_checkout
+            ON BorrowingHistory(checkoutDate, item_id) WHERE returnDate IS NULL;
+
+        -- staff history view is ordered by checkoutDate
+        CREATE INDEX IF NOT EXISTS idx_bh_checkout ON BorrowingHistory(checkoutDate)
+    """)
+
+
+def _v3_catalog_fts(conn):
+    """FTS5 catalog index over Items, kept in sync by triggers"""
+    run_script(conn, """
+        CREATE VIRTUAL TABLE IF NOT EXISTS ItemsFTS USING fts5(
+            title, creator, type,
+            content='Items', content_rowid='item_id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON Items BEGIN
+            INSERT INTO ItemsFTS(rowid, title, creator, type)
+            VALUES (new.item_id, new.title, new.creator, new.type);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON Items BEGIN
+            INSERT INTO ItemsFTS(ItemsFTS, rowid, title, creator, type)
+            VALUES ('delete', old.item_id, old.title, old.creator, old.type);
+        END;
+
+        -- status changes (checkouts/returns) don't touch the text index
+        CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF title, creator, type ON Items BEGIN
+            INSERT INTO ItemsFTS(ItemsFTS, rowid, title, creator, type)
+            VALUES ('delete', old.item_id, old.title, old.creator, old.type);
+            INSERT INTO ItemsFTS(rowid, title, creator, type)
+            VALUES (new.item_id, new.title, new.creator, new.type);
+        END;
+
+        INSERT INTO ItemsFTS(ItemsFTS) VALUES ('rebuild')
+    """)
+
+
+def _v4_maintenance_runs(conn):
+    """Last-run bookkeeping for scheduled maintenance jobs (overdue sweep)"""
+    run_script(conn, """
+        CREATE TABLE IF NOT EXISTS MaintenanceRuns (
+            job TEXT NOT NULL,
+            last_run TEXT NOT NULL,   -- ISO timestamp of the last completed run
+            watermark TEXT,           -- job specific progress marker
+            report TEXT,              -- JSON report of the last run
+            PRIMARY KEY (job)
+        )
+    """)
+
+
+def _v5_loan_due_dates(conn):
+    """Due and lost dates stored on each loan instead of derived from checkoutDate"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(BorrowingHistory)")}
+    if "due_date" not in columns:
+        conn.execute("ALTER TABLE BorrowingHistory ADD COLUMN due_date CHAR(10)")
+    if "lost_date" not in columns:
+        conn.execute("ALTER TABLE BorrowingHistory ADD COLUMN lost_date CHAR(10)")
+
+    # existing loans were all made under the fixed 28 day loan + 14 day grace rule
+    run_script(conn, """
+        UPDATE BorrowingHistory
+        SET due_date = date(checkoutDate, '+28 days'),
+            lost_date = date(checkoutDate, '+42 days')
+        WHERE due_date IS NULL;
+
+        -- overdue report ranges over due_date, the lost sweep over lost_date
+        CREATE INDEX IF NOT EXISTS idx_bh_open_due
+            ON BorrowingHistory(due_date, item_id) WHERE returnDate IS NULL;
+        CREATE INDEX IF NOT EXISTS idx_bh_open_lost
+            ON BorrowingHistory(lost_date, item_id) WHERE returnDate IS NULL;
+
+        -- nothing ranges over checkoutDate on open loans anymore
+        DROP INDEX IF EXISTS idx_bh_open_checkout
+    """)
+
+
+def _v6_id_sequence(conn):
+    """Counter + secret permutation key for patron IDs (see services._allocate_patron_id)"""
+    run_script(conn, """
+        CREATE TABLE IF NOT EXISTS IdSequence (
+            name TEXT NOT NULL,
+            next_value INTEGER NOT NULL,
+            key INTEGER NOT NULL,
+            PRIMARY KEY (name)
+        )
+    """)
+    # existing patrons keep their IDs, new ones are allocated above the old
+    # 1000-9999 random range so the two never overlap
+    conn.execute(
+        "INSERT OR IGNORE INTO IdSequence (name, next_value, key) VALUES ('patron', 0, ?)",
+        (secrets.randbits(32),)
+    )
+
+
+def _v7_staff_version(conn):
+    """Version stamp bumped on every Staff change, lets sessions detect stale roles"""
+    run_script(conn, """
+        CREATE TABLE IF NOT EXISTS TableVersions (
+            name TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (name)
+        );
+        INSERT OR IGNORE INTO TableVersions (name, version) VALUES ('Staff', 0);
+
+        CREATE TRIGGER IF NOT EXISTS staff_version_insert AFTER INSERT ON Staff BEGIN
+            UPDATE TableVersions SET version = version + 1 WHERE name = 'Staff';
+        END;
+        CREATE TRIGGER IF NOT EXISTS staff_version_update AFTER UPDATE ON Staff BEGIN
+            UPDATE TableVersions SET version = version + 1 WHERE name = 'Staff';
+        END;
+        CREATE TRIGGER IF NOT EXISTS staff_version_delete AFTER DELETE ON Staff BEGIN
+            UPDATE TableVersions SET version = version + 1 WHERE name = 'Staff';
+        END
+    """)
+
+
+# Full recompute of the circulation rollups from BorrowingHistory, used to
+# backfill them (v8) and by analytics.rebuild_analytics()
+ANALYTICS_REBUILD = """
+    DELETE FROM DailyCirculation;
+    DELETE FROM ItemPopularity;
+    DELETE FROM PatronActivity;
+
+    INSERT INTO DailyCirculation (day, item_type, checkouts, returns, late_returns)
+    SELECT day, item_type, SUM(checkouts), SUM(returns), SUM(late_returns) FROM (
+        SELECT bh.checkoutDate AS day, coalesce(i.type, 'Other') AS item_type,
+               1 AS checkouts, 0 AS returns, 0 AS late_returns
+        FROM BorrowingHistory bh LEFT JOIN Items i ON i.item_id = bh.item_id
+        UNION ALL
+        SELECT bh.returnDate, coalesce(i.type, 'Other'), 0, 1, coalesce(bh.returnDate > bh.due_date, 0)
+        FROM BorrowingHistory bh LEFT JOIN Items i ON i.item_id = bh.item_id
+        WHERE bh.returnDate IS NOT NULL
+    )
+    GROUP BY day, item_type;
+
+    INSERT INTO ItemPopularity (item_id, checkouts, last_checkout)
+    SELECT item_id, COUNT(*), MAX(checkoutDate) FROM BorrowingHistory GROUP BY item_id;
+
+    INSERT INTO PatronActivity (patron_id, checkouts, open_loans, late_returns, first_checkout, last_checkout)
+    SELECT id, COUNT(*), SUM(returnDate IS NULL), SUM(coalesce(returnDate > due_date, 0)),
+           MIN(checkoutDate), MAX(checkoutDate)
+    FROM BorrowingHistory GROUP BY id
+"""
+
+
+def _v8_circulation_rollups(conn):
+    """Circulation aggregates kept current by triggers on BorrowingHistory (see analytics.py)"""
+    run_script(conn, """
+        CREATE TABLE IF NOT EXISTS DailyCirculation (
+            day CHAR(10) NOT NULL,
+            item_type CHAR(50) NOT NULL,
+            checkouts INTEGER NOT NULL DEFAULT 0,
+            returns INTEGER NOT NULL DEFAULT 0,
+            late_returns INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, item_type)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS ItemPopularity (
+            item_id INTEGER NOT NULL,
+            checkouts INTEGER NOT NULL DEFAULT 0,
+            last_checkout CHAR(10),
+            PRIMARY KEY (item_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_item_popularity ON ItemPopularity(checkouts DESC, item_id);
+
+        CREATE TABLE IF NOT EXISTS PatronActivity (
+            patron_id INTEGER NOT NULL,
+            checkouts INTEGER NOT NULL DEFAULT 0,
+            open_loans INTEGER NOT NULL DEFAULT 0,
+            late_returns INTEGER NOT NULL DEFAULT 0,
+            first_checkout CHAR(10),
+            last_checkout CHAR(10),
+            PRIMARY KEY (patron_id)
+        );
+
+        -- the item type is read at checkout / return time, a later type change
+        -- doesn't move past counts
+        CREATE TRIGGER IF NOT EXISTS bh_rollup_insert AFTER INSERT ON BorrowingHistory BEGIN
+            INSERT INTO DailyCirculation (day, item_type, checkouts)
+            VALUES (new.checkoutDate, coalesce((SELECT type FROM Items WHERE item_id = new.item_id), 'Other'), 1)
+            ON CONFLICT (day, item_type) DO UPDATE SET checkouts = checkouts + 1;
+
+            INSERT INTO ItemPopularity (item_id, checkouts, last_checkout)
+            VALUES (new.item_id, 1, new.checkoutDate)
+            ON CONFLICT (item_id) DO UPDATE SET
+                checkouts = checkouts + 1,
+                last_checkout = max(coalesce(last_checkout, ''), excluded.last_checkout);
+
+            INSERT INTO PatronActivity (patron_id, checkouts, open_loans, late_returns, first_checkout, last_checkout)
+            VALUES (new.id, 1, new.returnDate IS NULL, coalesce(new.returnDate > new.due_date, 0),
+                    new.checkoutDate, new.checkoutDate)
+            ON CONFLICT (patron_id) DO UPDATE SET
+                checkouts = checkouts + 1,
+                open_loans = open_loans + excluded.open_loans,
+                late_returns = late_returns + excluded.late_returns,
+                first_checkout = min(coalesce(first_checkout, excluded.first_checkout), excluded.first_checkout),
+                last_checkout = max(coalesce(last_checkout, ''), excluded.last_checkout);
+        END;
+
+        -- loans inserted already returned (imports, history loads). Triggers on
+        -- the same event fire in no guaranteed order, this one only touches
+        -- the return day's row.
+        CREATE TRIGGER IF NOT EXISTS bh_rollup_insert_returned AFTER INSERT ON BorrowingHistory
+        WHEN new.returnDate IS NOT NULL BEGIN
+            INSERT INTO DailyCirculation (day, item_type, returns, late_returns)
+            VALUES (new.returnDate, coalesce((SELECT type FROM Items WHERE item_id = new.item_id), 'Other'),
+                    1, coalesce(new.returnDate > new.due_date, 0))
+            ON CONFLICT (day, item_type) DO UPDATE SET
+                returns = returns + 1, late_returns = late_returns + excluded.late_returns;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS bh_rollup_return AFTER UPDATE OF returnDate ON BorrowingHistory
+        WHEN old.returnDate IS NULL AND new.returnDate IS NOT NULL BEGIN
+            INSERT INTO DailyCirculation (day, item_type, returns, late_returns)
+            VALUES (new.returnDate, coalesce((SELECT type FROM Items WHERE item_id = new.item_id), 'Other'),
+                    1, coalesce(new.returnDate > new.due_date, 0))
+            ON CONFLICT (day, item_type) DO UPDATE SET
+                returns = returns + 1, late_returns = late_returns + excluded.late_returns;
+
+            UPDATE PatronActivity SET
+                open_loans = open_loans - 1,
+                late_returns = late_returns + coalesce(new.returnDate > new.due_date, 0)
+            WHERE patron_id = new.id;
+        END
+    """)
+    run_script(conn, ANALYTICS_REBUILD)
+
+
+# Per-patron balances from open loans ({open_loans}: a table or subquery with
+# id, item_id, due_date): replacement cost of lost items plus overdue counts
+# as of :today. Filtered to a patron set by the caller's extra condition
+# ({where}); see services._refresh_balances().
+PATRON_BALANCE_COMPUTE = """
+    INSERT INTO PatronBalance (patron_id, lost_items, lost_fines, overdue_items, max_days_overdue,
+                               computed_on)
+    SELECT bh.id,
+           SUM(i.status = 'lost'),
+           ROUND(SUM(CASE WHEN i.status = 'lost' THEN i.replacement_cost ELSE 0 END), 2),
+           SUM(bh.due_date < :today),
+           MAX(MAX(CAST(julianday(:today) - julianday(bh.due_date) AS INTEGER), 0)),
+           :today
+    FROM {open_loans} bh
+    JOIN Items i ON i.item_id = bh.item_id
+    WHERE 1 = 1 {where}
+    GROUP BY bh.id
+    HAVING SUM(i.status = 'lost') > 0 OR SUM(bh.due_date < :today) > 0
+"""
+
+
+def _v9_patron_balance(conn):
+    """Precomputed fines / overdue status per patron (rows only for patrons who owe something)"""
+    run_script(conn, """
+        CREATE TABLE IF NOT EXISTS PatronBalance (
+            patron_id INTEGER NOT NULL,
+            lost_items INTEGER NOT NULL DEFAULT 0,
+            lost_fines REAL NOT NULL DEFAULT 0,
+            overdue_items INTEGER NOT NULL DEFAULT 0,
+            max_days_overdue INTEGER NOT NULL DEFAULT 0,
+            computed_on CHAR(10) NOT NULL,
+            PRIMARY KEY (patron_id)
+        )
+    """)
+    conn.execute(
+        PATRON_BALANCE_COMPUTE.format(
+            open_loans="(SELECT id, item_id, due_date FROM BorrowingHistory WHERE returnDate IS NULL)",
+            where=""),
+        {"today": date.today().isoformat()}
+    )
+
+
+def _v10_open_loans_split(conn):
+    """
+    Split BorrowingHistory into OpenLoans (hot: one row per item out right
+    now) and LoanArchive (cold: returned loans). BorrowingHistory becomes a
+    UNION ALL view over both, for the reports that read the whole history.
+    """
+    run_script(conn, """
+        CREATE TABLE IF NOT EXISTS OpenLoans (
+            id INTEGER NOT NULL,            -- patron
+            item_id INTEGER NOT NULL,
+            checkoutDate CHAR(10) NOT NULL,
+            due_date CHAR(10),
+            lost_date CHAR(10),
+            PRIMARY KEY (item_id),
+            FOREIGN KEY (id) REFERENCES Patron(id),
+            FOREIGN KEY (item_id) REFERENCES Items(item_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_open_loans_patron ON OpenLoans(id);
+        CREATE INDEX IF NOT EXISTS idx_open_loans_checkout ON OpenLoans(checkoutDate, id, item_id);
+        CREATE INDEX IF NOT EXISTS idx_open_loans_due ON OpenLoans(due_date, item_id);
+        CREATE INDEX IF NOT EXISTS idx_open_loans_lost ON OpenLoans(lost_date, item_id);
+
+        -- keeps BorrowingHistory's one-row-per-(patron, item) key
+        CREATE TABLE IF NOT EXISTS LoanArchive (
+            id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            checkoutDate CHAR(10) NOT NULL,
+            returnDate CHAR(10) NOT NULL,
+            due_date CHAR(10),
+            lost_date CHAR(10),
+            PRIMARY KEY (id, item_id),
+            FOREIGN KEY (id) REFERENCES Patron(id),
+            FOREIGN KEY (item_id) REFERENCES Items(item_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_loan_archive_checkout ON LoanArchive(checkoutDate, id, item_id);
+
+        INSERT INTO OpenLoans (id, item_id, checkoutDate, due_date, lost_date)
+        SELECT id, item_id, checkoutDate, due_date, lost_date
+        FROM BorrowingHistory WHERE returnDate IS NULL;
+
+        INSERT INTO LoanArchive (id, item_id, checkoutDate, returnDate, due_date, lost_date)
+        SELECT id, item_id, checkoutDate, returnDate, due_date, lost_date
+        FROM BorrowingHistory WHERE returnDate IS NOT NULL;
+
+        -- takes its indexes and the v8 rollup triggers with it
+        DROP TABLE BorrowingHistory;
+
+        CREATE VIEW BorrowingHistory AS
+            SELECT id, item_id, checkoutDate, NULL AS returnDate, due_date, lost_date FROM OpenLoans
+            UNION ALL
+            SELECT id, item_id, checkoutDate, returnDate, due_date, lost_date FROM LoanArchive;
+
+        -- rollups (v8): a checkout counts when the loan opens, a return when
+        -- it's archived
+        CREATE TRIGGER IF NOT EXISTS open_loan_insert AFTER INSERT ON OpenLoans BEGIN
+            INSERT INTO DailyCirculation (day, item_type, checkouts)
+            VALUES (new.checkoutDate, coalesce((SELECT type FROM Items WHERE item_id = new.item_id), 'Other'), 1)
+            ON CONFLICT (day, item_type) DO UPDATE SET checkouts = checkouts + 1;
+
+            INSERT INTO ItemPopularity (item_id, checkouts, last_checkout)
+            VALUES (new.item_id, 1, new.checkoutDate)
+            ON CONFLICT (item_id) DO UPDATE SET
+                checkouts = checkouts + 1,
+                last_checkout = max(coalesce(last_checkout, ''), excluded.last_checkout);
+
+            INSERT INTO PatronActivity (patron_id, checkouts, open_loans, first_checkout, last_checkout)
+            VALUES (new.id, 1, 1, new.checkoutDate, new.checkoutDate)
+            ON CONFLICT (patron_id) DO UPDATE SET
+                checkouts = checkouts + 1,
+                open_loans = open_loans + 1,
+                first_checkout = min(coalesce(first_checkout, excluded.first_checkout), excluded.first_checkout),
+                last_checkout = max(coalesce(last_checkout, ''), excluded.last_checkout);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS open_loan_delete AFTER DELETE ON OpenLoans BEGIN
+            UPDATE PatronActivity SET open_loans = open_loans - 1 WHERE patron_id = old.id;
+        END;
+
+        -- services archive a loan before deleting its OpenLoans row, so an
+        -- archive row without an open loan is a history load: count its
+        -- checkout here
+        CREATE TRIGGER IF NOT EXISTS loan_archive_insert AFTER INSERT ON LoanArchive BEGIN
+            INSERT INTO DailyCirculation (day, item_type, checkouts)
+            SELECT new.checkoutDate, coalesce((SELECT type FROM Items WHERE item_id = new.item_id), 'Other'), 1
+            WHERE NOT EXISTS (SELECT 1 FROM OpenLoans WHERE item_id = new.item_id AND id = new.id)
+            ON CONFLICT (day, item_type) DO UPDATE SET checkouts = checkouts + 1;
+
+            INSERT INTO ItemPopularity (item_id, checkouts, last_checkout)
+            SELECT new.item_id, 1, new.checkoutDate
+            WHERE NOT EXISTS (SELECT 1 FROM OpenLoans WHERE item_id = new.item_id AND id = new.id)
+            ON CONFLICT (item_id) DO UPDATE SET
+                checkouts = checkouts + 1,
+                last_checkout = max(coalesce(last_checkout, ''), excluded.last_checkout);
+
+            INSERT INTO PatronActivity (patron_id, checkouts, late_returns, first_checkout, last_checkout)
+            VALUES (new.id,
+                    NOT EXISTS (SELECT 1 FROM OpenLoans WHERE item_id = new.item_id AND id = new.id),
+                    coalesce(new.returnDate > new.due_date, 0), new.checkoutDate, new.checkoutDate)
+            ON CONFLICT (patron_id) DO UPDATE SET
+                checkouts = checkouts + excluded.checkouts,
+                late_returns = late_returns + excluded.late_returns,
+                first_checkout = min(coalesce(first_checkout, excluded.first_checkout), excluded.first_checkout),
+                last_checkout = max(coalesce(last_checkout, ''), excluded.last_checkout);
+
+            INSERT INTO DailyCirculation (day, item_type, returns, late_returns)
+            VALUES (new.returnDate, coalesce((SELECT type FROM Items WHERE item_id = new.item_id), 'Other'),
+                    1, coalesce(new.returnDate > new.due_date, 0))
+            ON CONFLICT (day, item_type) DO UPDATE SET
+                returns = returns + 1, late_returns = late_returns + excluded.late_returns;
+        END
+    """)
+
+
+def _v11_holds(conn):
+    """
+    Hold queues (see services.place_hold). Holds are served oldest first, so
+    the next patron for an item is the first entry of its range in
+    idx_holds_queue, however long the queue.
+    """
+    run_script(conn, """
+        CREATE TABLE IF NOT EXISTS Holds (
+            hold_id INTEGER NOT NULL,       -- also the queue order
+            item_id INTEGER NOT NULL,
+            patron_id INTEGER NOT NULL,
+            placed_date CHAR(10) NOT NULL,
+            status CHAR(10) NOT NULL DEFAULT 'waiting',  -- waiting, ready, fulfilled, cancelled, expired
+            ready_date CHAR(10),            -- put on the hold shelf
+            expires CHAR(10),               -- last day to pick it up
+            PRIMARY KEY (hold_id),
+            FOREIGN KEY (item_id) REFERENCES Items(item_id),
+            FOREIGN KEY (patron_id) REFERENCES Patron(id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_holds_queue ON Holds(item_id, hold_id) WHERE status = 'waiting';
+        -- one active hold per patron and item
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_holds_active
+            ON Holds(item_id, patron_id) WHERE status IN ('waiting', 'ready');
+        CREATE INDEX IF NOT EXISTS idx_holds_patron ON Holds(patron_id, status);
+        CREATE INDEX IF NOT EXISTS idx_holds_expiry ON Holds(expires) WHERE status = 'ready';
+    """)
+
+
+def _v12_event_capacity(conn):
+    """
+    Event capacity (NULL = unlimited) and a seats_taken counter that
+    register/cancel keep in the same transaction as the registration row,
+    so nothing counts EventRegistrations. Registrations past capacity are
+    'waitlisted'; idx_event_waitlist makes the next one to promote an index
+    seek.
+    """
+    run_script(conn, """
+        ALTER TABLE Events ADD COLUMN capacity INTEGER;
+        ALTER TABLE Events ADD COLUMN seats_taken INTEGER NOT NULL DEFAULT 0;
+        ALTER TABLE EventRegistrations ADD COLUMN status CHAR(10) NOT NULL DEFAULT 'registered';  -- or 'waitlisted'
+        CREATE INDEX IF NOT EXISTS idx_event_waitlist
+            ON EventRegistrations(event_id, registration_id) WHERE status = 'waitlisted';
+
+        UPDATE Events SET seats_taken = (
+            SELECT COUNT(*) FROM EventRegistrations r WHERE r.event_id = Events.event_id
+        );
+    """)
+
+# Events as rectangles in EventSlots: minutes since 1970-01-01 (rtree_i32
+# boxes are closed, so a booking ending at 12:00 stops at 11:59 and doesn't
+# clash with one starting at 12:00) by room_id
+EVENT_SLOT_INSERT = """
+    INSERT OR IGNORE INTO Rooms (roomNum) VALUES (new.roomNum);
+    INSERT INTO EventSlots (event_id, start_min, end_min, room_lo, room_hi)
+    SELECT new.event_id,
+           CAST(julianday(new.date) - 2440587.5 AS INTEGER) * 1440
+               + substr(new.start_time, 1, 2) * 60 + substr(new.start_time, 4, 2),
+           CAST(julianday(new.date) - 2440587.5 AS INTEGER) * 1440
+               + substr(new.end_time, 1, 2) * 60 + substr(new.end_time, 4, 2) - 1,
+           room_id, room_id
+    FROM Rooms WHERE roomNum = new.roomNum;
+"""
+
+
+def _v13_room_booking(conn):
+    """
+    Event times and room bookings. Events get start_time/end_time ("HH:MM",
+    end "24:00" at the latest); older events default to the whole day.
+    EventSlots is a 2-D R*Tree over (time, room) kept in step with Events by
+    triggers, so a room's conflicts for a slot, or every room busy in it, is
+    a tree search rather than a scan of the calendar.
+    """
+    run_script(conn, f"""
+        ALTER TABLE Events ADD COLUMN start_time CHAR(5) NOT NULL DEFAULT '00:00';
+        ALTER TABLE Events ADD COLUMN end_time CHAR(5) NOT NULL DEFAULT '24:00';
+
+        CREATE TABLE IF NOT EXISTS Rooms (
+            room_id INTEGER NOT NULL,
+            roomNum CHAR(10) NOT NULL UNIQUE,
+            seats INTEGER,                  -- NULL = unknown
+            PRIMARY KEY (room_id)
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS EventSlots USING rtree_i32(
+            event_id, start_min, end_min, room_lo, room_hi
+        );
+
+        CREATE TRIGGER IF NOT EXISTS event_slot_insert AFTER INSERT ON Events BEGIN
+            {EVENT_SLOT_INSERT}
+        END;
+        CREATE TRIGGER IF NOT EXISTS event_slot_update
+        AFTER UPDATE OF date, start_time, end_time, roomNum ON Events BEGIN
+            DELETE FROM EventSlots WHERE event_id = old.event_id;
+            {EVENT_SLOT_INSERT}
+        END;
+        CREATE TRIGGER IF NOT EXISTS event_slot_delete AFTER DELETE ON Events BEGIN
+            DELETE FROM EventSlots WHERE event_id = old.event_id;
+        END;
+
+        INSERT OR IGNORE INTO Rooms (roomNum) SELECT DISTINCT roomNum FROM Events ORDER BY roomNum;
+        INSERT INTO EventSlots (event_id, start_min, end_min, room_lo, room_hi)
+        SELECT e.event_id,
+               CAST(julianday(e.date) - 2440587.5 AS INTEGER) * 1440
+                   + substr(e.start_time, 1, 2) * 60 + substr(e.start_time, 4, 2),
+               CAST(julianday(e.date) - 2440587.5 AS INTEGER) * 1440
+                   + substr(e.end_time, 1, 2) * 60 + substr(e.end_time, 4, 2) - 1,
+               r.room_id, r.room_id
+        FROM Events e JOIN Rooms r ON r.roomNum = e.roomNum;
+    """)
+
+
+# date(x, '+0 days') gives back exactly the real YYYY-MM-DD dates: julianday()
+# of '2025-4-12' is NULL (and so is the slot), '2025-02-30' would be booked on March 2
+EVENT_DATE_CHECK = """
+    SELECT RAISE(ABORT, 'Event date must be YYYY-MM-DD') WHERE date(new.date, '+0 days') IS NOT new.date;
+"""
+
+UNPADDED_DATE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+
+
+def _v14_event_dates(conn):
+    """
+    Events entered by hand had dates like '2025-4-12', which v13 booked as
+    NULL slots: they never clashed with anything. Their dates are zero-padded
+    here (the update trigger re-books them) and the slot triggers now reject
+    a date that isn't YYYY-MM-DD.
+    """
+    run_script(conn, f"""
+        DROP TRIGGER IF EXISTS event_slot_insert;
+        DROP TRIGGER IF EXISTS event_slot_update;
+        CREATE TRIGGER event_slot_insert AFTER INSERT ON Events BEGIN
+            {EVENT_DATE_CHECK}
+            {EVENT_SLOT_INSERT}
+        END;
+        CREATE TRIGGER event_slot_update
+        AFTER UPDATE OF date, start_time, end_time, roomNum ON Events BEGIN
+            {EVENT_DATE_CHECK}
+            DELETE FROM EventSlots WHERE event_id = old.event_id;
+            {EVENT_SLOT_INSERT}
+        END;
+    """)
+    rows = conn.execute("SELECT event_id, date FROM Events WHERE date(date, '+0 days') IS NOT date").fetchall()
+    for event_id, event_date in rows:
+        match = UNPADDED_DATE.fullmatch(event_date or "")
+        if not match:
+            continue
+        padded = "{:0>4}-{:0>2}-{:0>2}".format(*match.groups())
+        try:
+            date.fromisoformat(padded)
+        except ValueError:
+            continue
+        conn.execute("UPDATE Events SET date = ? WHERE event_id = ?", (padded, event_id))
+    # whatever is left can't be placed on the calendar, don't let it clash at minute 0
+    conn.execute("DELETE FROM EventSlots WHERE event_id IN "
+                 "(SELECT event_id FROM Events WHERE date(date, '+0 days') IS NOT date)")
+
+
+def _v15_event_schedule_index(conn):
+    """Events listed in schedule order (date, start_time, event_id) read from an index"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_schedule ON Events(date, start_time, event_id)")
+
+
+MIGRATIONS = [
+    (1, _v1_base_schema),
+    (2, _v2_index_pack),
+    (3, _v3_catalog_fts),
+    (4, _v4_maintenance_runs),
+    (5, _v5_loan_due_dates),
+    (6, _v6_id_sequence),
+    (7, _v7_staff_version),
+    (8, _v8_circulation_rollups),
+    (9, _v9_patron_balance),
+    (10, _v10_open_loans_split),
+    (11, _v11_holds),
+    (12, _v12_event_capacity),
+    (13, _v13_room_booking),
+    (14, _v14_event_dates),
+    (15, _v15_event_schedule_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target=None):
+    """
+    Bring the database up to `target` (default: latest) schema version.
+    Returns the list of versions that were applied.
+    """
+    target = LATEST_VERSION if target is None else target
+    if get_schema_version(conn) >= target:
+        return []
+
+    if conn.in_transaction:
+        conn.commit()
+
+    applied = []
+    for version, migration in MIGRATIONS:
+        if version > target:
+            break
+        # take the write lock before re-reading the version so two terminals
+        # starting at the same time don't both apply the same migration
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied.append(version)
+
+    if applied:
+        conn.execute("PRAGMA optimize")
+    return applied
+
+
+def explain_query_plan(conn, sql, params=()):
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
@@ -1,50 +1,103 @@
+import base64
+import functools
+import json
 import sqlite3
 from datetime import datetime, timedelta
-import random
+import re
 import time
 
+from .cache import cached
 from .connection import get_db_connection
+from .instrumentation import instrument_functions
+from .migrations import PATRON_BALANCE_COMPUTE
 
 LOAN_PERIOD_DAYS = 28
 GRACE_PERIOD_DAYS = 14
 
+# Loan period overrides per item type, e.g. {"DVD": 14}. Types not listed
+# get LOAN_PERIOD_DAYS. Due/lost dates are stored on the loan at checkout,
+# so changing these only affects new loans.
+LOAN_PERIOD_DAYS_BY_TYPE = {}
+
+def loan_period_days(item_type):
+    """Loan period in days for an item type"""
+    return LOAN_PERIOD_DAYS_BY_TYPE.get(item_type, LOAN_PERIOD_DAYS)
+
+## CACHE INVALIDATION ##
+# Writes below drop the cached lookups they make stale (see database/cache.py)
+
+def _invalidate_items(item_ids, db_name=None):
+    for item_id in item_ids:
+        get_item.invalidate(int(item_id), db_name=db_name)
+
+def _invalidate_patron(patron_id, db_name=None):
+    get_patron.invalidate(int(patron_id), db_name=db_name)
+    # keyed by ID or email, and may hold a cached "not found"
+    find_patron_with_staff.cache.clear()
+
+def _invalidate_staff(patron_id, db_name=None):
+    is_manager.invalidate(int(patron_id), db_name=db_name)
+    is_volunteer.invalidate(int(patron_id), db_name=db_name)
+    get_all_staff_members.cache.clear()
+    find_patron_with_staff.cache.clear()
+
 ## PATRON MANAGEMENT FUNCTIONS ##
 
+# Patron IDs: a counter from IdSequence run through a keyed Feistel permutation
+# of [0, 2**24), so IDs are unique without retries but not sequential/guessable.
+PATRON_ID_OFFSET = 10000  # old random IDs were 1000-9999
+PATRON_ID_BITS = 24
+
+def _feistel24(value, key):
+    """Keyed bijection on 24-bit integers (4 rounds over 12-bit halves)"""
+    left, right = value >> 12, value & 0xFFF
+    for round_no in range(4):
+        round_key = (key * (round_no + 1) * 0x9E3779B1) & 0xFFFFFFFF
+        f = (((right + round_key) * 0x2C1B3C6D) & 0xFFFFFFFF) >> 20
+        left, right = right, left ^ f
+    return (left << 12) | right
+
+def _allocate_patron_id(conn):
+    """Next patron ID; must run inside the write transaction that inserts the patron"""
+    while True:
+        row = conn.execute(
+            """UPDATE IdSequence SET next_value = next_value + 1 WHERE name = 'patron'
+            RETURNING next_value - 1 AS value, key"""
+        ).fetchone()
+        if row['value'] >= 1 << PATRON_ID_BITS:
+            raise ValueError("Patron ID space exhausted")
+        patron_id = PATRON_ID_OFFSET + _feistel24(row['value'], row['key'])
+        # allocated IDs never repeat, only an ID inserted by hand can be in the way
+        if not conn.execute("SELECT 1 FROM Patron WHERE id = ?", (patron_id,)).fetchone():
+            return patron_id
+
 def add_patron(first_name, last_name, email, db_name=None):
     """Add a new patron to the system"""
     conn = get_db_connection(db_name)
-    cursor = conn.cursor()
     try:
-        cursor.execute("SELECT 1 FROM Patron WHERE email = ?", (email,))
-        if cursor.fetchone():
+        if conn.execute("SELECT 1 FROM Patron WHERE email = ?", (email,)).fetchone():
             return {"status": "error", "message": "Email Already Exists!"}
-    except sqlite3.Error:
-        pass
-    
-    # loop with a timeout to generate random ID for patron
-    start_time = time.time()
-    max_duration = 3  # Max seconds to try
-    attempts = 0
-    
-    while True:
-        attempts += 1
-        patron_id = random.randint(1000, 9999)  
-        try:
-            cursor.execute(
-                "INSERT INTO Patron (id, first_name, last_name, email) VALUES (?, ?, ?, ?)",
-                (patron_id, first_name, last_name, email)
-            )
-            conn.commit()
-            return {"status": "success", "id": patron_id}
-            
-        except sqlite3.IntegrityError as e:
-            if time.time() - start_time > max_duration:
-                return {"status": "error", "message": "ID Generation timed out, Please Try Again."}
-            time.sleep(min(0.1 * (1.5 ** attempts), 1.0))  # Max 1 second delay
-        
-        except Exception as e:
-            return {"status": "error", "message": f"Database error: {str(e)}"}
 
+        conn.execute("BEGIN IMMEDIATE")
+        patron_id = _allocate_patron_id(conn)
+        conn.execute(
+            "INSERT INTO Patron (id, first_name, last_name, email) VALUES (?, ?, ?, ?)",
+            (patron_id, first_name, last_name, email)
+        )
+        conn.commit()
+        _invalidate_patron(patron_id, db_name)
+        return {"status": "success", "id": patron_id}
+    except sqlite3.IntegrityError:
+        # idx_patron_email: registered from another terminal in the meantime
+        conn.rollback()
+        return {"status": "error", "message": "Email Already Exists!"}
+    except sqlite3.Error as e:
+        conn.rollback()
+        return {"status": "error", "message": f"Database error: {str(e)}"}
+    finally:
+        conn.close()
+
+@cached("patrons")
 def get_patron(patron_id, db_name=None):
     """Retrieve patron information"""
     conn = get_db_connection(db_name)
@@ -59,6 +112,8 @@ def get_patron(patron_id, db_name=None):
 
 ## ITEM MANAGEMENT FUNCTIONS ##
 
+ITEM_TYPES = ("Physical Book", "Online Book", "Journal", "Vinyl", "DVD", "Magazine", "CD", "Audiobook", "Other")
+
 def add_item(title, item_type, creator, replacement_cost, status="available", db_name=None):
     """Add a new item to the library inventory"""
     conn = get_db_connection(db_name)
@@ -69,10 +124,12 @@ def add_item(title, item_type, creator, replacement_cost, status="available", db
             (title, item_type, creator, replacement_cost, status)
         )
         conn.commit()
+        _invalidate_items([cursor.lastrowid], db_name)
         return cursor.lastrowid
     finally:
         conn.close()
 
+@cached("items")
 def get_item(item_id, db_name=None):
     """Retrieve complete item information"""
     conn = get_db_connection(db_name)
@@ -151,57 +208,140 @@ def update_acquisition_request_status(request_id, new_status, db_name=None):
 
 ## BORROWING SYSTEM FUNCTIONS ##
 
+# Bound parameters per IN (...) lookup in the batch functions
+BATCH_CHUNK_SIZE = 500
+
+def _chunks(values, size=BATCH_CHUNK_SIZE):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def _loan_dates(now, item_type):
+    """(checkout, due, lost) date strings for a loan starting at `now`"""
+    loan_days = loan_period_days(item_type)
+    return (now.strftime('%Y-%m-%d'),
+            (now + timedelta(days=loan_days)).strftime('%Y-%m-%d'),
+            (now + timedelta(days=loan_days + GRACE_PERIOD_DAYS)).strftime('%Y-%m-%d'))
+
+def _close_loans(conn, pairs, return_date):
+    """
+    Move open loans, given as (patron_id, item_id) pairs, to LoanArchive.
+    The archive row goes in before the OpenLoans row is deleted: the rollup
+    triggers count a checkout for archive rows that never had an open loan.
+    """
+    pairs = [(return_date, patron_id, item_id) for patron_id, item_id in pairs]
+    conn.executemany(
+        """INSERT INTO LoanArchive (id, item_id, checkoutDate, returnDate, due_date, lost_date)
+        SELECT id, item_id, checkoutDate, ?, due_date, lost_date FROM OpenLoans
+        WHERE id = ? AND item_id = ?""",
+        pairs
+    )
+    conn.executemany(
+        "DELETE FROM OpenLoans WHERE id = ? AND item_id = ?",
+        [pair[1:] for pair in pairs]
+    )
+
+# A checkout or return that still finds the database locked after the
+# connection's busy_timeout is retried as a whole, this many more times,
+# with a pause that doubles each time
+BUSY_RETRIES = 3
+BUSY_RETRY_DELAY = 0.05  # seconds
+
+def _is_busy(error):
+    """SQLITE_BUSY or SQLITE_LOCKED, including their extended codes"""
+    code = getattr(error, "sqlite_errorcode", None)  # Python 3.11+
+    if code is None:
+        return "locked" in str(error) or "busy" in str(error)
+    return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+def _retry_busy(fn):
+    """Re-run a write transaction function that failed on a busy database"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(BUSY_RETRIES + 1):
+            try:
+                return fn(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if attempt == BUSY_RETRIES or not _is_busy(e):
+                    raise
+            time.sleep(BUSY_RETRY_DELAY * 2 ** attempt)
+    return wrapper
+
+@_retry_busy
 def borrow_item(patron_id, item_id, db_name=None):
-    """Patron Loan item function"""
+    """
+    Patron Loan item function. Runs under BEGIN IMMEDIATE, and the item is
+    claimed with a conditional UPDATE (available -> checked_out), so two
+    terminals can never lend the same copy. An item on the hold shelf can
+    only be borrowed by the patron it's held for.
+    """
     conn = get_db_connection(db_name)
     try:
-        # Check if item is available
-        item = conn.execute("SELECT * FROM Items WHERE item_id = ?", (item_id,)).fetchone()
+        conn.execute("BEGIN IMMEDIATE")
+        item = conn.execute("SELECT type, status FROM Items WHERE item_id = ?", (item_id,)).fetchone()
         if not item:
             raise ValueError("Item not found")
-        if item['status'] != 'available':
+
+        # compare-and-set: only an available item (or one held for this patron) changes hands
+        claimed = conn.execute(
+            """UPDATE Items SET status = 'checked_out'
+            WHERE item_id = ?
+              AND (status = 'available'
+                   OR (status = 'on_hold' AND EXISTS (SELECT 1 FROM Holds h WHERE h.item_id = Items.item_id
+                                                      AND h.patron_id = ? AND h.status = 'ready')))""",
+            (item_id, patron_id)
+        ).rowcount
+        if claimed != 1:
+            if item['status'] == 'on_hold':
+                raise ValueError("Item is on hold for another patron")
             raise ValueError("Item is not available for borrowing")
-        
+
         # Check if patron already has an item borrowed
         active_loan = conn.execute(
-            """SELECT * FROM BorrowingHistory 
-            WHERE id = ? AND returnDate IS NULL""",
+            "SELECT 1 FROM OpenLoans WHERE id = ?",
             (patron_id,)
         ).fetchone()
         if active_loan:
             raise ValueError("You already borrow an item, Please return it first to borrow a new item.")
-        
-        # Calculate due date
-        checkout_date = datetime.now().strftime('%Y-%m-%d')
-        due_date = (datetime.now() + timedelta(days=LOAN_PERIOD_DAYS)).strftime('%Y-%m-%d')
-        
-        # Update item status
-        conn.execute(
-            "UPDATE Items SET status = 'checked_out' WHERE item_id = ?",
-            (item_id,)
-        )
-        
-        # Create borrowing record
+
+        # LoanArchive keeps one row per (patron, item) pair
+        if conn.execute(
+            "SELECT 1 FROM LoanArchive WHERE id = ? AND item_id = ?",
+            (patron_id, item_id)
+        ).fetchone():
+            raise ValueError("You have already borrowed this item before")
+
+        checkout_date, due_date, lost_date = _loan_dates(datetime.now(), item['type'])
         conn.execute(
-            """INSERT INTO BorrowingHistory 
-            (id, item_id, checkoutDate) 
-            VALUES (?, ?, ?)""",
-            (patron_id, item_id, checkout_date)
+            """INSERT INTO OpenLoans 
+            (id, item_id, checkoutDate, due_date, lost_date) 
+            VALUES (?, ?, ?, ?, ?)""",
+            (patron_id, item_id, checkout_date, due_date, lost_date)
         )
+        _fulfill_holds(conn, [(patron_id, item_id)])
         
         conn.commit()
+        _invalidate_items([item_id], db_name)
         return due_date
+    except:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
-# in services.py 
+@_retry_busy
 def return_item(patron_id, item_id, db_name=None):
-    """Return item back to the library"""
+    """
+    Return item back to the library. Like borrow_item, one transaction under
+    BEGIN IMMEDIATE; the item goes back with a conditional UPDATE that only
+    matches while this patron's loan of it is open. If patrons are queued for
+    it, it goes on the hold shelf for the first one (result "on_hold_for").
+    """
     conn = get_db_connection(db_name)
     try:
-        # Get item status first
+        conn.execute("BEGIN IMMEDIATE")
         item_status = conn.execute(
-            "SELECT status FROM Items WHERE item_id = ?", 
+            "SELECT status, replacement_cost FROM Items WHERE item_id = ?", 
             (item_id,)
         ).fetchone()
         
@@ -209,77 +349,563 @@ def return_item(patron_id, item_id, db_name=None):
             raise ValueError("Item not found")
             
         if item_status['status'] == 'lost':
-            return {"status": "lost", "replacement_cost": get_item(item_id, db_name=db_name)['replacement_cost']}
-            
+            conn.rollback()
+            return {"status": "lost", "replacement_cost": item_status['replacement_cost']}
+
         loan = conn.execute(
-            """SELECT * FROM BorrowingHistory 
-            WHERE id = ? AND item_id = ? AND returnDate IS NULL""",
+            "SELECT due_date FROM OpenLoans WHERE id = ? AND item_id = ?",
             (patron_id, item_id)
         ).fetchone()
-        
-        if not loan:
+
+        # compare-and-set: checked_out -> available, only while the loan is open
+        released = conn.execute(
+            """UPDATE Items SET status = 'available'
+            WHERE item_id = ? AND status = 'checked_out'
+              AND EXISTS (SELECT 1 FROM OpenLoans WHERE id = ? AND item_id = ?)""",
+            (item_id, patron_id, item_id)
+        ).rowcount
+        if not loan or released != 1:
             raise ValueError("No active loan found")
-            
-        # Process the return
+
         return_date = datetime.now().strftime('%Y-%m-%d')
-        conn.execute(
-            """UPDATE BorrowingHistory SET returnDate = ? 
-            WHERE id = ? AND item_id = ? AND returnDate IS NULL""",
-            (return_date, patron_id, item_id)
-        )
+        _close_loans(conn, [(patron_id, item_id)], return_date)
+        shelved = _shelve_for_holds(conn, [item_id], return_date)
+        _refresh_balances(conn, [patron_id], return_date)
+        conn.commit()
+        _invalidate_items([item_id], db_name)
         
-        conn.execute(
+        # Check for late return (dates are zero-padded, compare as text)
+        if return_date > loan['due_date']:
+            result = {"status": "returned_late", "replacement_cost": item_status['replacement_cost']}
+        else:
+            result = {"status": "returned"}
+        if item_id in shelved:
+            result["on_hold_for"] = shelved[item_id]
+        return result
+    except:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+@_retry_busy
+def borrow_items(loans, db_name=None):
+    """
+    Batch checkout: loans is an iterable of (patron_id, item_id) pairs.
+    All valid loans are written in one transaction, invalid ones are skipped.
+    Returns one result per pair, in order: {"patron_id", "item_id", "status"}
+    with status "borrowed" (plus "due_date") or "error" (plus "message").
+    """
+    loans = [(int(patron_id), int(item_id)) for patron_id, item_id in loans]
+    if not loans:
+        return []
+
+    conn = get_db_connection(db_name)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+
+        items, held = {}, {}  # held: item on the hold shelf -> patron it's held for
+        for chunk in _chunks({item_id for _, item_id in loans}):
+            rows = conn.execute(
+                f"SELECT item_id, status, type FROM Items WHERE item_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            items.update((row['item_id'], row) for row in rows)
+            held.update((row['item_id'], row['patron_id']) for row in conn.execute(
+                f"SELECT item_id, patron_id FROM Holds WHERE status = 'ready' AND item_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ))
+
+        # existing patrons, patrons with an open loan, and (patron, item) pairs
+        # already in the history (LoanArchive's primary key allows one row per pair)
+        patrons, borrowing, history = set(), set(), set()
+        for chunk in _chunks({patron_id for patron_id, _ in loans}):
+            placeholders = ','.join('?' * len(chunk))
+            patrons.update(row['id'] for row in conn.execute(
+                f"SELECT id FROM Patron WHERE id IN ({placeholders})", chunk
+            ))
+            for row in conn.execute(f"SELECT id, item_id FROM OpenLoans WHERE id IN ({placeholders})", chunk):
+                history.add((row['id'], row['item_id']))
+                borrowing.add(row['id'])
+            history.update((row['id'], row['item_id']) for row in conn.execute(
+                f"SELECT id, item_id FROM LoanArchive WHERE id IN ({placeholders})", chunk
+            ))
+
+        now = datetime.now()
+        results, inserts = [], []
+        for patron_id, item_id in loans:
+            result = {"patron_id": patron_id, "item_id": item_id}
+            results.append(result)
+            item = items.get(item_id)
+            if patron_id not in patrons:
+                message = "Patron not found"
+            elif item is None:
+                message = "Item not found"
+            elif item['status'] == 'on_hold' and held.get(item_id) != patron_id:
+                message = "Item is on hold for another patron"
+            elif item['status'] not in ('available', 'on_hold'):
+                message = "Item is not available for borrowing"
+            elif patron_id in borrowing:
+                message = "Patron already has an item borrowed"
+            elif (patron_id, item_id) in history:
+                message = "Patron has already borrowed this item before"
+            else:
+                checkout_date, due_date, lost_date = _loan_dates(now, item['type'])
+                inserts.append((patron_id, item_id, checkout_date, due_date, lost_date))
+                # later pairs in the same batch see this loan
+                items[item_id] = {"status": "checked_out", "type": item['type']}
+                borrowing.add(patron_id)
+                history.add((patron_id, item_id))
+                result.update(status="borrowed", due_date=due_date)
+                continue
+            result.update(status="error", message=message)
+
+        conn.executemany(
+            "UPDATE Items SET status = 'checked_out' WHERE item_id = ?",
+            [(row[1],) for row in inserts]
+        )
+        conn.executemany(
+            """INSERT INTO OpenLoans (id, item_id, checkoutDate, due_date, lost_date)
+            VALUES (?, ?, ?, ?, ?)""",
+            inserts
+        )
+        _fulfill_holds(conn, [row[:2] for row in inserts])
+        conn.commit()
+        _invalidate_items([row[1] for row in inserts], db_name)
+        return results
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+@_retry_busy
+def return_items(returns, db_name=None):
+    """
+    Batch return (e.g. emptying the book drop): returns is an iterable of
+    (patron_id, item_id) pairs, processed in one transaction.
+    Returns one result per pair, in order, with the statuses of return_item
+    ("returned", "returned_late", "lost", plus "replacement_cost" for the
+    last two, and "on_hold_for" like return_item) or "error" with a "message".
+    """
+    returns = [(int(patron_id), int(item_id)) for patron_id, item_id in returns]
+    if not returns:
+        return []
+
+    conn = get_db_connection(db_name)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+
+        items, open_loans = {}, {}
+        for chunk in _chunks({item_id for _, item_id in returns}):
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT item_id, status, replacement_cost FROM Items WHERE item_id IN ({placeholders})",
+                chunk
+            ).fetchall()
+            items.update((row['item_id'], row) for row in rows)
+            rows = conn.execute(
+                f"SELECT id, item_id, due_date FROM OpenLoans WHERE item_id IN ({placeholders})",
+                chunk
+            ).fetchall()
+            open_loans.update(((row['id'], row['item_id']), row['due_date']) for row in rows)
+
+        return_date = datetime.now().strftime('%Y-%m-%d')
+        results, updates = [], []
+        for patron_id, item_id in returns:
+            result = {"patron_id": patron_id, "item_id": item_id}
+            results.append(result)
+            item = items.get(item_id)
+            if item is None:
+                result.update(status="error", message="Item not found")
+            elif item['status'] == 'lost':
+                result.update(status="lost", replacement_cost=item['replacement_cost'])
+            elif (patron_id, item_id) not in open_loans:
+                result.update(status="error", message="No active loan found")
+            else:
+                due_date = open_loans.pop((patron_id, item_id))
+                updates.append((patron_id, item_id))
+                if return_date > due_date:
+                    result.update(status="returned_late", replacement_cost=item['replacement_cost'])
+                else:
+                    result.update(status="returned")
+
+        _close_loans(conn, updates, return_date)
+        conn.executemany(
             "UPDATE Items SET status = 'available' WHERE item_id = ?",
+            [(item_id,) for _, item_id in updates]
+        )
+        shelved = _shelve_for_holds(conn, [item_id for _, item_id in updates], return_date)
+        for result in results:
+            if result.get("status") in ("returned", "returned_late") and result["item_id"] in shelved:
+                result["on_hold_for"] = shelved[result["item_id"]]
+        _refresh_balances(conn, [patron_id for patron_id, _ in updates], return_date)
+        conn.commit()
+        _invalidate_items([item_id for _, item_id in updates], db_name)
+        return results
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+## HOLDS ##
+# Patrons queue for an item that is out (Holds, oldest hold first). When it
+# comes back it goes on the hold shelf (Items.status 'on_hold') for the first
+# patron in line, who has HOLD_SHELF_DAYS to borrow it before expire_holds()
+# passes it to the next one.
+HOLD_SHELF_DAYS = 7
+
+def _shelve_for_holds(conn, item_ids, today):
+    """
+    Put items that just became available on the hold shelf for their next
+    waiting patron, inside the caller's transaction. Returns {item_id: patron_id}.
+    Holds of patrons who borrowed the item before are cancelled, borrow_item
+    would refuse them.
+    """
+    expires = (datetime.strptime(today, '%Y-%m-%d') + timedelta(days=HOLD_SHELF_DAYS)).strftime('%Y-%m-%d')
+    shelved = {}
+    for item_id in item_ids:
+        conn.execute(
+            """UPDATE Holds SET status = 'cancelled'
+            WHERE item_id = ? AND status = 'waiting'
+              AND EXISTS (SELECT 1 FROM LoanArchive a WHERE a.id = Holds.patron_id AND a.item_id = Holds.item_id)""",
             (item_id,)
         )
+        # head of the queue: one seek on idx_holds_queue
+        hold = conn.execute(
+            """UPDATE Holds SET status = 'ready', ready_date = ?, expires = ?
+            WHERE hold_id = (SELECT hold_id FROM Holds WHERE item_id = ? AND status = 'waiting'
+                             ORDER BY hold_id LIMIT 1)
+            RETURNING patron_id""",
+            (today, expires, item_id)
+        ).fetchone()
+        if hold:
+            conn.execute("UPDATE Items SET status = 'on_hold' WHERE item_id = ?", (item_id,))
+            shelved[item_id] = hold['patron_id']
+    return shelved
+
+def _pass_on_holds(conn, item_ids, today):
+    """Items whose ready hold ended: to the next patron in line, or back to available"""
+    conn.executemany(
+        "UPDATE Items SET status = 'available' WHERE item_id = ? AND status = 'on_hold'",
+        [(item_id,) for item_id in item_ids]
+    )
+    return _shelve_for_holds(conn, item_ids, today)
+
+def _fulfill_holds(conn, pairs):
+    """Close the holds of (patron_id, item_id) pairs that just became loans"""
+    conn.executemany(
+        """UPDATE Holds SET status = 'fulfilled'
+        WHERE patron_id = ? AND item_id = ? AND status IN ('waiting', 'ready')""",
+        pairs
+    )
+
+def _hold_position(conn, item_id, hold_id):
+    return conn.execute(
+        "SELECT COUNT(*) FROM Holds WHERE item_id = ? AND status = 'waiting' AND hold_id <= ?",
+        (item_id, hold_id)
+    ).fetchone()[0]
+
+@_retry_busy
+def place_hold(patron_id, item_id, db_name=None):
+    """
+    Queue for an item that is checked out or on the hold shelf.
+    Returns {"hold_id", "item_id", "position"} (1 = next in line).
+    """
+    conn = get_db_connection(db_name)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        item = conn.execute("SELECT status FROM Items WHERE item_id = ?", (item_id,)).fetchone()
+        if not item:
+            raise ValueError("Item not found")
+        if item['status'] == 'available':
+            raise ValueError("Item is available, you can borrow it now")
+        if item['status'] not in ('checked_out', 'on_hold'):
+            raise ValueError("Item can't be placed on hold")
+        if not conn.execute("SELECT 1 FROM Patron WHERE id = ?", (patron_id,)).fetchone():
+            raise ValueError("Patron not found")
+        if conn.execute("SELECT 1 FROM OpenLoans WHERE id = ? AND item_id = ?", (patron_id, item_id)).fetchone():
+            raise ValueError("You are currently borrowing this item")
+        # borrow_item refuses a (patron, item) pair already in the history
+        if conn.execute("SELECT 1 FROM LoanArchive WHERE id = ? AND item_id = ?", (patron_id, item_id)).fetchone():
+            raise ValueError("You have already borrowed this item before")
+
+        try:
+            hold_id = conn.execute(
+                "INSERT INTO Holds (item_id, patron_id, placed_date) VALUES (?, ?, ?)",
+                (item_id, patron_id, datetime.now().strftime('%Y-%m-%d'))
+            ).lastrowid
+        except sqlite3.IntegrityError:
+            raise ValueError("You already have a hold on this item")
+        position = _hold_position(conn, item_id, hold_id)
         conn.commit()
-        
-        # Check for late return
-        checkout_date = datetime.strptime(loan['checkoutDate'], '%Y-%m-%d')
-        due_date = checkout_date + timedelta(days=LOAN_PERIOD_DAYS)
-        return_date_obj = datetime.strptime(return_date, '%Y-%m-%d')
-        
-        if return_date_obj > due_date:
-            item = get_item(item_id, db_name=db_name)
-            return {"status": "returned_late", "replacement_cost": item['replacement_cost']}
-        
-        return {"status": "returned"}
-        
+        return {"hold_id": hold_id, "item_id": item_id, "position": position}
+    except:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+@_retry_busy
+def cancel_hold(hold_id, patron_id=None, db_name=None):
+    """
+    Cancel a waiting or ready hold (with patron_id, only if it's theirs).
+    An item held on the shelf for it goes to the next patron in line.
+    """
+    conn = get_db_connection(db_name)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        # read the status before the UPDATE: SQLite 3.40 can evaluate
+        # `ready_date IS NOT NULL` wrongly in this statement's RETURNING clause
+        hold = conn.execute(
+            """SELECT item_id, status FROM Holds
+            WHERE hold_id = ? AND status IN ('waiting', 'ready') AND (? IS NULL OR patron_id = ?)""",
+            (hold_id, patron_id, patron_id)
+        ).fetchone()
+        if not hold:
+            raise ValueError("Hold not found")
+        conn.execute("UPDATE Holds SET status = 'cancelled' WHERE hold_id = ?", (hold_id,))
+        if hold['status'] == 'ready':
+            _pass_on_holds(conn, [hold['item_id']], datetime.now().strftime('%Y-%m-%d'))
+        conn.commit()
+        _invalidate_items([hold['item_id']], db_name)
+        return True
+    except:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def get_patron_holds(patron_id, db_name=None):
+    """A patron's waiting and ready holds with item details and place in the queue"""
+    conn = get_db_connection(db_name)
+    try:
+        rows = conn.execute(
+            """
+            SELECT h.hold_id, h.item_id, i.title, i.creator, i.type, h.status,
+                   h.placed_date, h.expires,
+                   CASE WHEN h.status = 'waiting' THEN
+                       (SELECT COUNT(*) FROM Holds q
+                        WHERE q.item_id = h.item_id AND q.status = 'waiting' AND q.hold_id <= h.hold_id)
+                   END AS position
+            FROM Holds h
+            JOIN Items i ON i.item_id = h.item_id
+            WHERE h.patron_id = ? AND h.status IN ('waiting', 'ready')
+            ORDER BY h.status = 'waiting', h.hold_id
+            """,
+            (patron_id,)
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+@_retry_busy
+def expire_holds(today=None, db_name=None):
+    """
+    Expire ready holds not picked up by their `expires` date and pass each
+    item on. Returns {"expired": [item_id, ...], "on_hold_for": {item_id: patron_id}}.
+    """
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    conn = get_db_connection(db_name)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        expired = sorted(row['item_id'] for row in conn.execute(
+            "UPDATE Holds SET status = 'expired' WHERE status = 'ready' AND expires < ? RETURNING item_id",
+            (today,)
+        ).fetchall())
+        shelved = _pass_on_holds(conn, expired, today)
+        conn.commit()
+        _invalidate_items(expired, db_name)
+        return {"expired": expired, "on_hold_for": shelved}
+    except sqlite3.Error:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
 # Check for items that need to be considered lost
 # If an item is not returned after the loan and grace period then its marked as lost
+OVERDUE_SWEEP_JOB = "overdue_sweep"
+
+def run_overdue_sweep(today=None, full=False, min_interval=None, db_name=None):
+    """
+    Mark items lost whose open loan reached its lost_date (due date + grace
+    period), in one set-based UPDATE over the open-loan lost_date index.
+
+    The cutoff of the last run is kept as a watermark in MaintenanceRuns, so
+    a regular sweep only looks at loans whose lost_date passed since then
+    (full=True rescans every open loan). With min_interval (seconds), the
+    sweep is skipped if the last one ran more recently than that.
+
+    Returns a report dict: {"ran", "full", "run_at", "cutoff", "since",
+    "marked_lost": [item_id, ...], "elapsed"}; a skipped sweep returns the
+    report of the last run with "ran" False.
+    """
+    conn = get_db_connection(db_name)
+    try:
+        start = time.perf_counter()
+        now = datetime.now()
+        today = today or now.strftime("%Y-%m-%d")
+
+        # write lock up front: two terminals sweeping at once would otherwise
+        # both read the same watermark
+        conn.execute("BEGIN IMMEDIATE")
+        last = conn.execute(
+            "SELECT last_run, watermark, report FROM MaintenanceRuns WHERE job = ?",
+            (OVERDUE_SWEEP_JOB,)
+        ).fetchone()
+
+        if last and min_interval is not None:
+            age = (now - datetime.fromisoformat(last['last_run'])).total_seconds()
+            if 0 <= age < min_interval:
+                conn.rollback()
+                report = json.loads(last['report']) if last['report'] else {}
+                report["ran"] = False
+                return report
+
+        cutoff = today
+        since = None if full or not last else last['watermark']
+
+        where = "lost_date <= ?"
+        params = [cutoff]
+        if since is not None:
+            where += " AND lost_date > ?"
+            params.append(since)
+
+        lost_items = [row['item_id'] for row in conn.execute(
+            f"""UPDATE Items SET status = 'lost'
+            WHERE status != 'lost'
+                AND item_id IN (SELECT item_id FROM OpenLoans WHERE {where})
+            RETURNING item_id""",
+            params
+        ).fetchall()]
+        lost_items.sort()
+
+        # the patrons holding them now owe the replacement cost
+        holders = []
+        for chunk in _chunks(lost_items):
+            placeholders = ','.join('?' * len(chunk))
+            holders += [row['id'] for row in conn.execute(
+                f"SELECT id FROM OpenLoans WHERE item_id IN ({placeholders})",
+                chunk
+            )]
+        _refresh_balances(conn, holders, today)
+
+        report = {
+            "ran": True,
+            "full": since is None,
+            "run_at": now.isoformat(timespec="seconds"),
+            "cutoff": cutoff,
+            "since": since,
+            "marked_lost": lost_items,
+            "elapsed": round(time.perf_counter() - start, 4),
+        }
+        # never move the watermark backwards (e.g. a sweep with an older `today`)
+        watermark = max(cutoff, last['watermark']) if last and last['watermark'] else cutoff
+        conn.execute(
+            """INSERT INTO MaintenanceRuns (job, last_run, watermark, report) VALUES (?, ?, ?, ?)
+            ON CONFLICT(job) DO UPDATE SET
+                last_run = excluded.last_run, watermark = excluded.watermark, report = excluded.report""",
+            (OVERDUE_SWEEP_JOB, report["run_at"], watermark, json.dumps(report))
+        )
+        conn.commit()
+        _invalidate_items(lost_items, db_name)
+        return report
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
 def check_overdue_items(db_name=None):
     """A scan function to check item dates and declare them lost based on conditions"""
+    return run_overdue_sweep(full=True, db_name=db_name)["marked_lost"]
+
+## PATRON BALANCES ##
+# PatronBalance holds what each patron owes (replacement cost of lost items)
+# and their overdue loans, computed set-based from open loans. Writes that
+# change a fine (sweep, payment, returns) refresh the patrons involved,
+# compute_patron_balances() recomputes everyone, e.g. nightly so days
+# overdue move on.
+PATRON_BALANCE_JOB = "patron_balances"
+
+def _refresh_balances(conn, patron_ids=None, today=None):
+    """Recompute PatronBalance rows inside the caller's transaction (None = all patrons)"""
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    if patron_ids is None:
+        conn.execute("DELETE FROM PatronBalance")
+        conn.execute(PATRON_BALANCE_COMPUTE.format(open_loans="OpenLoans", where=""), {"today": today})
+        return
+    for chunk in _chunks(set(patron_ids)):
+        ids = {f"p{n}": patron_id for n, patron_id in enumerate(chunk)}
+        placeholders = ','.join(f":{name}" for name in ids)
+        conn.execute(f"DELETE FROM PatronBalance WHERE patron_id IN ({placeholders})", ids)
+        conn.execute(
+            PATRON_BALANCE_COMPUTE.format(open_loans="OpenLoans", where=f"AND bh.id IN ({placeholders})"),
+            dict(ids, today=today)
+        )
+
+def compute_patron_balances(today=None, min_interval=None, db_name=None):
+    """
+    Recompute every patron's balance in one pass over the open loans.
+    With min_interval (seconds) it's skipped if the last run is more recent.
+    Returns {"ran", "run_at", "today", "patrons", "lost_fines", "elapsed"}.
+    """
     conn = get_db_connection(db_name)
     try:
-        # Get all checked out items without a return date
-        loans = conn.execute(
-            """SELECT bh.*, i.replacement_cost 
-            FROM BorrowingHistory bh
-            JOIN Items i ON bh.item_id = i.item_id
-            WHERE bh.returnDate IS NULL"""
-        ).fetchall()
-        
-        today = datetime.now()
-        lost_items = []
-        
-        for loan in loans:
-            checkout_date = datetime.strptime(loan['checkoutDate'], '%Y-%m-%d')
-            due_date = checkout_date + timedelta(days=LOAN_PERIOD_DAYS)
-            lost_date = due_date + timedelta(days=GRACE_PERIOD_DAYS)
-            
-            if today > lost_date:
-                # Mark item as lost
-                conn.execute(
-                    "UPDATE Items SET status = 'lost' WHERE item_id = ?",
-                    (loan['item_id'],)
-                )
-                lost_items.append(loan['item_id'])
-        
+        start = time.perf_counter()
+        now = datetime.now()
+        today = today or now.strftime("%Y-%m-%d")
+        conn.execute("BEGIN IMMEDIATE")
+        last = conn.execute(
+            "SELECT last_run, report FROM MaintenanceRuns WHERE job = ?", (PATRON_BALANCE_JOB,)
+        ).fetchone()
+        if last and min_interval is not None:
+            age = (now - datetime.fromisoformat(last['last_run'])).total_seconds()
+            if 0 <= age < min_interval:
+                conn.rollback()
+                report = json.loads(last['report']) if last['report'] else {}
+                report["ran"] = False
+                return report
+
+        _refresh_balances(conn, today=today)
+        totals = conn.execute(
+            "SELECT COUNT(*) AS patrons, COALESCE(SUM(lost_fines), 0) AS lost_fines FROM PatronBalance"
+        ).fetchone()
+        report = {
+            "ran": True,
+            "run_at": now.isoformat(timespec="seconds"),
+            "today": today,
+            "patrons": totals['patrons'],
+            "lost_fines": round(totals['lost_fines'], 2),
+            "elapsed": round(time.perf_counter() - start, 4),
+        }
+        conn.execute(
+            """INSERT INTO MaintenanceRuns (job, last_run, report) VALUES (?, ?, ?)
+            ON CONFLICT(job) DO UPDATE SET last_run = excluded.last_run, report = excluded.report""",
+            (PATRON_BALANCE_JOB, report["run_at"], json.dumps(report))
+        )
         conn.commit()
-        return lost_items
+        return report
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def get_patron_balance(patron_id, db_name=None):
+    """
+    {"patron_id", "lost_items", "lost_fines", "overdue_items",
+    "max_days_overdue", "computed_on"}; zeros for patrons who owe nothing
+    """
+    conn = get_db_connection(db_name)
+    try:
+        row = conn.execute("SELECT * FROM PatronBalance WHERE patron_id = ?", (patron_id,)).fetchone()
+        if row:
+            return dict(row)
+        return {"patron_id": patron_id, "lost_items": 0, "lost_fines": 0.0, "overdue_items": 0,
+                "max_days_overdue": 0, "computed_on": None}
     finally:
         conn.close()
 
@@ -290,7 +916,7 @@ def add_staff(patron_id, position, salary, db_name=None):
     conn = get_db_connection(db_name)
     try:
         # Verify patron exists
-        patron = get_patron(patron_id)
+        patron = get_patron(patron_id, db_name=db_name)
         if not patron:
             raise ValueError("Patron not found")
         
@@ -300,6 +926,7 @@ def add_staff(patron_id, position, salary, db_name=None):
             (patron_id, position, salary)
         )
         conn.commit()
+        _invalidate_staff(patron_id, db_name)
         return patron_id
     except sqlite3.IntegrityError:
         raise ValueError("Staff member already exists or invalid patron ID")
@@ -362,24 +989,129 @@ def show_acquisition_requests(db_name=None):
 
 ## EVENT MANAGEMENT FUNCTIONS ##
 
-def create_event(organizer_id, event_name, event_date, room_num, audience, db_name=None):
-    """Create a new library event"""
+# Event times are "HH:MM" on the event's date, an event ends at 24:00 at the latest
+EVENT_TIME_PATTERN = re.compile(r"(?:[01]\d|2[0-3]):[0-5]\d|24:00")
+EVENT_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+def _event_slot(event_date, start_time, end_time):
+    """
+    (first minute, last minute) of an event as stored in EventSlots
+    (minutes since 1970-01-01, see migrations.EVENT_SLOT_INSERT)
+    """
+    try:
+        if not EVENT_DATE_PATTERN.fullmatch(event_date):
+            raise ValueError
+        day = (datetime.strptime(event_date, "%Y-%m-%d") - datetime(1970, 1, 1)).days
+    except (TypeError, ValueError):
+        raise ValueError("Event date must be YYYY-MM-DD")
+    minutes = []
+    for value in (start_time, end_time):
+        if not isinstance(value, str) or not EVENT_TIME_PATTERN.fullmatch(value):
+            raise ValueError("Event times must be HH:MM")
+        minutes.append(int(value[:2]) * 60 + int(value[3:]))
+    if minutes[0] >= minutes[1]:
+        raise ValueError("An event must end after it starts")
+    return day * 1440 + minutes[0], day * 1440 + minutes[1] - 1
+
+def _room_conflicts(conn, room_id, slot, exclude_event_id=None, limit=-1):
+    """Events booked in a room that overlap slot: an R*Tree search on (time, room)"""
+    return conn.execute(
+        """SELECT e.event_id, e.eventName, e.date, e.start_time, e.end_time, e.roomNum
+        FROM EventSlots s
+        JOIN Events e ON e.event_id = s.event_id
+        WHERE s.start_min <= ? AND s.end_min >= ? AND s.room_lo <= ? AND s.room_hi >= ?
+          AND s.event_id IS NOT ?
+        ORDER BY e.date, e.start_time
+        LIMIT ?""",
+        (slot[1], slot[0], room_id, room_id, exclude_event_id, limit)
+    ).fetchall()
+
+@_retry_busy
+def create_event(organizer_id, event_name, event_date, room_num, audience, capacity=None,
+                 start_time="00:00", end_time="24:00", db_name=None):
+    """
+    Create a new library event. capacity=None means no limit on registrations;
+    without times the event takes its room for the whole day. Raises
+    ValueError if the room is already booked for part of that time.
+    """
+    if capacity is not None and (not isinstance(capacity, int) or capacity < 1):
+        raise ValueError("Capacity must be a positive number of seats")
+    slot = _event_slot(event_date, start_time, end_time)
     conn = get_db_connection(db_name)
     try:
+        # the conflict check and the booking commit together
+        conn.execute("BEGIN IMMEDIATE")
         # Verify organizer is staff
         staff = conn.execute("SELECT * FROM Staff WHERE id = ?", (organizer_id,)).fetchone()
         if not staff:
             raise ValueError("Only staff members can organize events")
+
+        room = conn.execute("SELECT room_id, seats FROM Rooms WHERE roomNum = ?", (room_num,)).fetchone()
+        if room:
+            if capacity and room['seats'] and capacity > room['seats']:
+                raise ValueError(f"Room {room_num} only has {room['seats']} seats")
+            clash = _room_conflicts(conn, room['room_id'], slot, limit=1)
+            if clash:
+                clash = clash[0]
+                raise ValueError(f"Room {room_num} is already booked for {clash['eventName']} "
+                                 f"on {clash['date']}, {clash['start_time']}-{clash['end_time']}")
         
         cursor = conn.cursor()
         cursor.execute(
             """INSERT INTO Events 
-            (organizer, eventName, date, roomNum, audience) 
-            VALUES (?, ?, ?, ?, ?)""",
-            (organizer_id, event_name, event_date, room_num, audience)
+            (organizer, eventName, date, roomNum, audience, capacity, start_time, end_time) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (organizer_id, event_name, event_date, room_num, audience, capacity, start_time, end_time)
         )
         conn.commit()
         return cursor.lastrowid
+    except:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def find_room_conflicts(room_num, event_date, start_time, end_time, exclude_event_id=None, db_name=None):
+    """Events already booked in a room for part of a time slot (exclude_event_id: the event being moved)"""
+    slot = _event_slot(event_date, start_time, end_time)
+    conn = get_db_connection(db_name)
+    try:
+        room = conn.execute("SELECT room_id FROM Rooms WHERE roomNum = ?", (room_num,)).fetchone()
+        if not room:
+            return []
+        return [dict(r) for r in _room_conflicts(conn, room['room_id'], slot, exclude_event_id)]
+    finally:
+        conn.close()
+
+def get_free_rooms(event_date, start_time, end_time, min_seats=None, db_name=None):
+    """Rooms with no event in a time slot (and at least min_seats seats, if given)"""
+    slot = _event_slot(event_date, start_time, end_time)
+    conn = get_db_connection(db_name)
+    try:
+        rows = conn.execute(
+            """SELECT roomNum, seats FROM Rooms
+            WHERE room_id NOT IN (SELECT room_lo FROM EventSlots WHERE start_min <= ? AND end_min >= ?)
+              AND (? IS NULL OR seats >= ?)
+            ORDER BY roomNum""",
+            (slot[1], slot[0], min_seats, min_seats)
+        ).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+def add_room(room_num, seats=None, db_name=None):
+    """Add a bookable room, or update its number of seats. Rooms are also added on their first event"""
+    if seats is not None and (not isinstance(seats, int) or seats < 1):
+        raise ValueError("Seats must be a positive number")
+    conn = get_db_connection(db_name)
+    try:
+        conn.execute(
+            """INSERT INTO Rooms (roomNum, seats) VALUES (?, ?)
+            ON CONFLICT (roomNum) DO UPDATE SET seats = excluded.seats""",
+            (room_num, seats)
+        )
+        conn.commit()
+        return True
     finally:
         conn.close()
 
@@ -396,52 +1128,71 @@ def get_upcoming_events(include_past=False, db_name=None):
                          ELSE 'Upcoming' 
                     END as event_status
                 FROM Events
-                ORDER BY date DESC
+                ORDER BY date DESC, start_time DESC, event_id DESC
             """, (today,)).fetchall()
         else:
             # Patron view - only future (upcoming) events
             events = conn.execute("""
                 SELECT * FROM Events 
                 WHERE date >= ?
-                ORDER BY date
+                ORDER BY date, start_time, event_id
             """, (today,)).fetchall()
         return [dict(event) for event in events]
     finally:
         conn.close()
 
 
+@_retry_busy
 def register_for_event(patron_id, event_id, db_name=None):
-    """Register a patron for an event"""
+    """
+    Register a patron for an event, or put them on its waitlist when every
+    seat is taken. The seat is claimed with a conditional UPDATE of the
+    event's seats_taken counter in the same BEGIN IMMEDIATE transaction as
+    the registration row, so a rush of sign-ups can't overfill an event.
+    Returns "registered" or "waitlisted".
+    """
     conn = get_db_connection(db_name)
     try:
-        # Check if event exists and is upcoming
-        event = conn.execute("""
-            SELECT 1 FROM Events 
-            WHERE event_id = ? AND date >= date('now')
-        """, (event_id,)).fetchone()
-        
-        if not event:
-            raise ValueError("Event not found or no longer available")
-            
+        conn.execute("BEGIN IMMEDIATE")
         # Check if already registered
         existing = conn.execute("""
-            SELECT 1 FROM EventRegistrations 
+            SELECT status FROM EventRegistrations 
             WHERE event_id = ? AND patron_id = ?
         """, (event_id, patron_id)).fetchone()
         
         if existing:
+            if existing['status'] == 'waitlisted':
+                raise ValueError("You are already on the waitlist for this event")
             raise ValueError("Already registered for this event")
+
+        # compare-and-set: take a seat while the upcoming event has one left
+        seated = conn.execute("""
+            UPDATE Events SET seats_taken = seats_taken + 1
+            WHERE event_id = ? AND date >= date('now')
+              AND (capacity IS NULL OR seats_taken < capacity)
+        """, (event_id,)).rowcount
+
+        if not seated and not conn.execute("""
+            SELECT 1 FROM Events 
+            WHERE event_id = ? AND date >= date('now')
+        """, (event_id,)).fetchone():
+            raise ValueError("Event not found or no longer available")
             
         # Create registration
+        status = "registered" if seated else "waitlisted"
         conn.execute("""
             INSERT INTO EventRegistrations 
-            (event_id, patron_id, registration_date) 
-            VALUES (?, ?, date('now'))
-        """, (event_id, patron_id))
+            (event_id, patron_id, registration_date, status) 
+            VALUES (?, ?, date('now'), ?)
+        """, (event_id, patron_id, status))
         conn.commit()
-        return True
+        return status
     except sqlite3.IntegrityError as e:
+        conn.rollback()
         raise ValueError("Registration failed") from e
+    except:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
@@ -494,7 +1245,7 @@ def get_borrowing_history(patron_id=None, db_name=None):
     try:
         if patron_id:
             # Query for specific patron
-            return conn.execute("""
+            rows = conn.execute("""
                 SELECT i.title, i.creator, i.type, bh.checkoutDate, bh.returnDate 
                 FROM BorrowingHistory bh
                 JOIN Items i ON bh.item_id = i.item_id
@@ -503,7 +1254,7 @@ def get_borrowing_history(patron_id=None, db_name=None):
             """, (patron_id,)).fetchall()
         else:
             # Query for all patrons (staff view)
-            return conn.execute("""
+            rows = conn.execute("""
                 SELECT bh.*, i.title, i.type, 
                        p.first_name || ' ' || p.last_name as patron_name
                 FROM BorrowingHistory bh
@@ -511,10 +1262,12 @@ def get_borrowing_history(patron_id=None, db_name=None):
                 JOIN Patron p ON bh.id = p.id
                 ORDER BY bh.checkoutDate DESC
             """).fetchall()
+        return [dict(r) for r in rows]
     finally:
         conn.close()
 
 # Limit access to staff records so only Managers can access them
+@cached("staff_manager")
 def is_manager(patron_id, db_name=None):
     """Check if a patron is a Manager"""
     conn = get_db_connection(db_name)
@@ -527,6 +1280,7 @@ def is_manager(patron_id, db_name=None):
     finally:
         conn.close()
 
+@cached("staff_volunteer")
 def is_volunteer(patron_id, db_name=None):
     """Check if a patron is a volunteer staff member"""
     conn = get_db_connection(db_name)
@@ -548,6 +1302,7 @@ def add_volunteer(patron_id, db_name=None):
             VALUES (?, 'Volunteer', 0)
         """, (patron_id,))
         conn.commit()
+        _invalidate_staff(patron_id, db_name)
     finally:
         conn.close()
 
@@ -560,27 +1315,15 @@ def remove_volunteer(patron_id, db_name=None):
             WHERE id = ? AND position = 'Volunteer'
         """, (patron_id,))
         conn.commit()
+        _invalidate_staff(patron_id, db_name)
     finally:
         conn.close()
 
 def get_patron_fines(patron_id, db_name=None):
-    """Calculate total replacement costs for lost items"""
-    conn = get_db_connection(db_name)
-    try:
-        # Get all lost items that were checked out by this patron
-        lost_items = conn.execute(
-            """SELECT i.replacement_cost 
-            FROM BorrowingHistory bh
-            JOIN Items i ON bh.item_id = i.item_id
-            WHERE bh.id = ? AND i.status = 'lost'""",
-            (patron_id,)
-        ).fetchall()
-        
-        total_replacement_cost = sum(item['replacement_cost'] for item in lost_items)
-        return total_replacement_cost
-    finally:
-        conn.close()
+    """Total replacement cost of the lost items a patron still has out"""
+    return get_patron_balance(patron_id, db_name=db_name)['lost_fines']
 
+@cached("patron_logins")
 def find_patron_with_staff(identifier: str, db_name=None):
     """
     Return patron info + is_staff given an identifier (ID digits or email).
@@ -618,6 +1361,7 @@ def find_patron_with_staff(identifier: str, db_name=None):
     finally:
         conn.close()
 
+@cached("staff_list")
 def get_all_staff_members(db_name=None):
     """Return all staff as list of dicts: {id, first_name, last_name}."""
     conn = get_db_connection(db_name)
@@ -634,20 +1378,42 @@ def get_all_staff_members(db_name=None):
     finally:
         conn.close()
 
+@_retry_busy
 def cancel_event_registration(registration_id, db_name=None):
-    """Cancel an event registration by registration_id"""
+    """
+    Cancel an event registration by registration_id. A seat given up goes
+    straight to the first patron on the event's waitlist (the head of
+    idx_event_waitlist), otherwise the event's seats_taken goes down.
+    """
     conn = get_db_connection(db_name)
     try:
-        cur = conn.execute(
-            "DELETE FROM EventRegistrations WHERE registration_id = ?",
+        conn.execute("BEGIN IMMEDIATE")
+        cancelled = conn.execute(
+            "DELETE FROM EventRegistrations WHERE registration_id = ? RETURNING event_id, status",
             (registration_id,)
-        )
-        conn.commit()
-
-        if cur.rowcount == 0:
+        ).fetchone()
+        if not cancelled:
             raise ValueError("Registration not found")
-        
+
+        if cancelled['status'] == 'registered':
+            promoted = conn.execute(
+                """UPDATE EventRegistrations SET status = 'registered'
+                WHERE registration_id = (
+                    SELECT registration_id FROM EventRegistrations
+                    WHERE event_id = ? AND status = 'waitlisted'
+                    ORDER BY registration_id LIMIT 1)""",
+                (cancelled['event_id'],)
+            ).rowcount
+            if not promoted:
+                conn.execute(
+                    "UPDATE Events SET seats_taken = seats_taken - 1 WHERE event_id = ?",
+                    (cancelled['event_id'],)
+                )
+        conn.commit()
         return True
+    except:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
@@ -664,15 +1430,14 @@ def get_overdue_items(today=None, db_name=None):
             """
             SELECT i.item_id, i.title, i.creator, i.type, i.status,
                 bh.id as patron_id, p.first_name, p.last_name,
-                bh.checkoutDate,
-                date(bh.checkoutDate, '+' || ? || ' days') as due_date
-            FROM Items i
-            JOIN BorrowingHistory bh ON i.item_id = bh.item_id
+                bh.checkoutDate, bh.due_date
+            FROM OpenLoans bh
+            JOIN Items i ON i.item_id = bh.item_id
             JOIN Patron p ON bh.id = p.id
-            WHERE bh.returnDate IS NULL
-                AND date(bh.checkoutDate, '+' || ? || ' days') < ?
+            WHERE bh.due_date < ?
+            ORDER BY bh.due_date
             """,
-            (LOAN_PERIOD_DAYS, LOAN_PERIOD_DAYS, today),
+            (today,),
         ).fetchall()
 
         return [dict(r) for r in rows]
@@ -689,12 +1454,11 @@ def get_items_with_display_status(is_staff: bool, db_name=None):
                 SELECT i.*,
                     CASE
                         WHEN i.status = 'lost' THEN 'lost'
-                        WHEN bh.returnDate IS NULL AND bh.id IS NOT NULL THEN 'checked_out'
+                        WHEN ol.id IS NOT NULL THEN 'checked_out'
                         ELSE i.status
                     END as display_status
                 FROM Items i
-                LEFT JOIN BorrowingHistory bh
-                    ON i.item_id = bh.item_id AND bh.returnDate IS NULL
+                LEFT JOIN OpenLoans ol ON ol.item_id = i.item_id
                 """
             ).fetchall()
         else:
@@ -702,13 +1466,12 @@ def get_items_with_display_status(is_staff: bool, db_name=None):
                 """
                 SELECT i.*,
                     CASE
-                        WHEN bh.returnDate IS NULL AND bh.id IS NOT NULL THEN 'checked_out'
+                        WHEN ol.id IS NOT NULL THEN 'checked_out'
                         ELSE i.status
                     END as display_status
                 FROM Items i
-                LEFT JOIN BorrowingHistory bh
-                    ON i.item_id = bh.item_id AND bh.returnDate IS NULL
-                WHERE i.status IN ('available', 'checked_out')
+                LEFT JOIN OpenLoans ol ON ol.item_id = i.item_id
+                WHERE i.status IN ('available', 'checked_out', 'on_hold')
                 """
             ).fetchall()
 
@@ -724,14 +1487,13 @@ def get_items_by_type_for_help(item_type: str, db_name=None):
             """
             SELECT i.item_id, i.title, i.creator,
                 CASE
-                    WHEN bh.returnDate IS NULL AND bh.id IS NOT NULL THEN 'checked_out'
+                    WHEN ol.id IS NOT NULL THEN 'checked_out'
                     ELSE i.status
                 END as display_status
             FROM Items i
-            LEFT JOIN BorrowingHistory bh
-                ON i.item_id = bh.item_id AND bh.returnDate IS NULL
+            LEFT JOIN OpenLoans ol ON ol.item_id = i.item_id
             WHERE i.type = ?
-              AND i.status IN ('available', 'checked_out')
+              AND i.status IN ('available', 'checked_out', 'on_hold')
             """,
             (item_type,),
         ).fetchall()
@@ -740,24 +1502,53 @@ def get_items_by_type_for_help(item_type: str, db_name=None):
         conn.close()
 
     
-def search_available_items_by_title(title_query: str, db_name:None):
-    """Return available items whose title matches the query (LIKE %query%)"""
-    title_query = (title_query or "").strip()
-    if not title_query: 
+def _fts_match(text, columns=None):
+    """
+    Turn free text into an FTS5 query: every word becomes a quoted prefix
+    term ("harr"* matches Harry) and all of them must match.
+    """
+    terms = re.findall(r"\w+", text or "")
+    if not terms:
+        return None
+    match = " AND ".join(f'"{term}"*' for term in terms)
+    if columns:
+        match = "{%s} : (%s)" % (" ".join(columns), match)
+    return match
+
+def search_catalog(query, status="available", columns=None, limit=25, offset=0, db_name=None):
+    """
+    Full-text catalog search over title, creator and type, best match first (BM25).
+    status=None searches every item; limit=None returns all matches.
+    """
+    match = _fts_match(query, columns)
+    if not match:
         return []
-    
+
+    sql = """
+        SELECT i.item_id, i.title, i.creator, i.type, i.status
+        FROM ItemsFTS f
+        JOIN Items i ON i.item_id = f.rowid
+        WHERE ItemsFTS MATCH ?
+    """
+    params = [match]
+    if status is not None:
+        sql += " AND i.status = ?"
+        params.append(status)
+    # title hits weigh more than creator hits, type is barely a signal
+    sql += " ORDER BY bm25(ItemsFTS, 10.0, 5.0, 1.0), i.item_id LIMIT ? OFFSET ?"
+    params.extend([-1 if limit is None else limit, offset])
+
     conn = get_db_connection(db_name)
-    try: 
-        rows = conn.execute(
-            """
-            SELECT item_id, title, creator FROM Items
-            WHERE title LIKE ? AND status = "available"
-            """, (f"%{title_query}%",)
-        ).fetchall()
+    try:
+        rows = conn.execute(sql, params).fetchall()
         return [dict(r) for r in rows]
     finally:
         conn.close()
 
+def search_available_items_by_title(title_query: str, db_name=None):
+    """Return available items whose title matches the query (prefix match on each word)"""
+    return search_catalog(title_query, status="available", columns=("title",), limit=None, db_name=db_name)
+
 def get_checked_out_items_for_patron(patron_id, db_name=None):
     "Return items checked out by current user"
     conn = get_db_connection(db_name)
@@ -765,9 +1556,9 @@ def get_checked_out_items_for_patron(patron_id, db_name=None):
         rows = conn.execute(
             """
             SELECT i.item_id, i.title, i.type
-            FROM BorrowingHistory bh
+            FROM OpenLoans bh
             JOIN Items i ON bh.item_id = i.item_id
-            WHERE bh.id = ? AND bh.returnDate IS NULL
+            WHERE bh.id = ?
             """,
             (patron_id,)
         ).fetchall()
@@ -797,14 +1588,20 @@ def get_all_borrowing_history(is_staff: bool, patron_id=None, db_name=None):
 def get_registrations_for_patron(patron_id, db_name=None):
     """
     Returns a patron's registrations with event details needed for the UI: 
-    registration_id, event_id, eventName, date, roomNum, audience
+    registration_id, event_id, eventName, date, roomNum, audience, status
+    and waitlist_position (1 = next to get a seat, None when registered)
     """
 
     conn = get_db_connection(db_name)
     try: 
         rows = conn.execute(
             """
-            SELECT er.registration_id, e.event_id, e.eventName, e.date, e.roomNum, e.audience
+            SELECT er.registration_id, e.event_id, e.eventName, e.date, e.roomNum, e.audience, er.status,
+                   CASE WHEN er.status = 'waitlisted' THEN (
+                       SELECT COUNT(*) FROM EventRegistrations w
+                       WHERE w.event_id = er.event_id AND w.status = 'waitlisted'
+                         AND w.registration_id <= er.registration_id)
+                   END AS waitlist_position
             FROM EventRegistrations er
             JOIN Events e ON er.event_id = e.event_id
             WHERE er.patron_id = ?
@@ -816,6 +1613,7 @@ def get_registrations_for_patron(patron_id, db_name=None):
     finally:
         conn.close()
 
+@_retry_busy
 def process_lost_item_payment(patron_id, item_id=None, db_name=None):
     """
     After payment, mark lost item(s) as returned and make them available again.
@@ -825,6 +1623,7 @@ def process_lost_item_payment(patron_id, item_id=None, db_name=None):
     """
     conn = get_db_connection(db_name)
     try:
+        conn.execute("BEGIN IMMEDIATE")
         return_date = datetime.now().strftime("%Y-%m-%d")
 
         if item_id is not None:
@@ -832,11 +1631,10 @@ def process_lost_item_payment(patron_id, item_id=None, db_name=None):
             loan = conn.execute(
                 """
                 SELECT 1
-                FROM BorrowingHistory bh
+                FROM OpenLoans bh
                 JOIN Items i ON i.item_id = bh.item_id
                 WHERE bh.id = ?
                   AND bh.item_id = ?
-                  AND bh.returnDate IS NULL
                   AND i.status = 'lost'
                 """,
                 (patron_id, item_id),
@@ -844,50 +1642,290 @@ def process_lost_item_payment(patron_id, item_id=None, db_name=None):
             if not loan:
                 raise ValueError("No active lost-item loan found for this patron and item.")
 
-            conn.execute(
-                """
-                UPDATE BorrowingHistory
-                SET returnDate = ?
-                WHERE id = ? AND item_id = ? AND returnDate IS NULL
-                """,
-                (return_date, patron_id, item_id),
-            )
+            _close_loans(conn, [(patron_id, item_id)], return_date)
             conn.execute(
                 "UPDATE Items SET status = 'available' WHERE item_id = ?",
                 (item_id,),
             )
+            _shelve_for_holds(conn, [item_id], return_date)
+            _refresh_balances(conn, [patron_id], return_date)
             conn.commit()
+            _invalidate_items([item_id], db_name)
             return 1
 
         # Otherwise: pay all lost items for this patron
-        conn.execute(
-            """
-            UPDATE BorrowingHistory
-            SET returnDate = ?
-            WHERE id = ?
-              AND returnDate IS NULL
-              AND item_id IN (SELECT item_id FROM Items WHERE status = 'lost')
-            """,
-            (return_date, patron_id),
-        )
-
-        cur = conn.execute(
+        paid_items = [row['item_id'] for row in conn.execute(
             """
             UPDATE Items
             SET status = 'available'
             WHERE status = 'lost'
-              AND item_id IN (
-                SELECT item_id FROM BorrowingHistory
-                WHERE id = ? AND returnDate = ?
-              )
+              AND item_id IN (SELECT item_id FROM OpenLoans WHERE id = ?)
+            RETURNING item_id
             """,
-            (patron_id, return_date),
-        )
+            (patron_id,),
+        ).fetchall()]
+        _close_loans(conn, [(patron_id, paid) for paid in paid_items], return_date)
+        _shelve_for_holds(conn, paid_items, return_date)
 
+        _refresh_balances(conn, [patron_id], return_date)
         conn.commit()
-        return cur.rowcount
+        _invalidate_items(paid_items, db_name)
+        return len(paid_items)
     except:
         conn.rollback()
         raise
     finally:
         conn.close()
+
+## SESSION AUTHORIZATION ##
+# One snapshot of a user's role and capabilities, loaded at login, so the GUI
+# doesn't query Staff on every button press. staff_version comes from the
+# TableVersions stamp that Staff triggers bump; a differing get_staff_version()
+# means the snapshot may be stale.
+
+ROLE_CAPABILITIES = {
+    "patron": ["volunteer_signup"],
+    "volunteer": ["staff_dashboard", "quit_volunteering"],
+    "staff": ["staff_dashboard", "manage_requests", "create_events", "import_catalog"],
+    "manager": ["staff_dashboard", "manage_requests", "create_events", "import_catalog", "add_staff_records"],
+}
+
+def _staff_role(position):
+    if position is None:
+        return "patron"
+    if position == "Volunteer":
+        return "volunteer"
+    if position == "Manager":
+        return "manager"
+    return "staff"
+
+def get_staff_version(db_name=None):
+    """Current version stamp of the Staff table"""
+    conn = get_db_connection(db_name)
+    try:
+        row = conn.execute("SELECT version FROM TableVersions WHERE name = 'Staff'").fetchone()
+        return row['version'] if row else 0
+    finally:
+        conn.close()
+
+def get_session_authorization(patron_id, db_name=None):
+    """
+    Authorization snapshot for a patron: {patron_id, is_staff, position, role,
+    capabilities, staff_version}, or None if the patron doesn't exist.
+    """
+    conn = get_db_connection(db_name)
+    try:
+        row = conn.execute(
+            """SELECT p.id, s.position,
+                (SELECT version FROM TableVersions WHERE name = 'Staff') AS staff_version
+            FROM Patron p
+            LEFT JOIN Staff s ON s.id = p.id
+            WHERE p.id = ?""",
+            (patron_id,)
+        ).fetchone()
+        if not row:
+            return None
+        role = _staff_role(row['position'])
+        return {
+            "patron_id": row['id'],
+            "is_staff": row['position'] is not None,
+            "position": row['position'],
+            "role": role,
+            "capabilities": list(ROLE_CAPABILITIES[role]),
+            "staff_version": row['staff_version'] or 0,
+        }
+    finally:
+        conn.close()
+
+## PAGINATED LIST FUNCTIONS ##
+# Keyset ("seek") pagination: each page continues after the sort key of the
+# last row of the previous page, so deep pages cost the same as the first one.
+# Pages are dicts: {"rows": [...], "next_cursor": str | None, "total": int | None}
+
+DEFAULT_PAGE_SIZE = 100
+
+def _encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def _decode_cursor(cursor):
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid page cursor") from e
+
+def _keyset_predicate(keys, values):
+    """WHERE fragment selecting rows strictly after `values` in `keys` order"""
+    if len({direction for _, direction in keys}) == 1:
+        # one direction: a row-value comparison lets SQLite seek on the index
+        op = ">" if keys[0][1] == "ASC" else "<"
+        exprs = ", ".join(expr for expr, _ in keys)
+        marks = ", ".join("?" for _ in keys)
+        return f"({exprs}) {op} ({marks})", list(values)
+
+    clauses, params = [], []
+    for i, (expr, direction) in enumerate(keys):
+        op = ">" if direction == "ASC" else "<"
+        parts = [f"{e} = ?" for e, _ in keys[:i]] + [f"{expr} {op} ?"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(values[:i + 1])
+    return "(" + " OR ".join(clauses) + ")", params
+
+def _where(conditions):
+    return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+def _keyset_page(select, from_, where, params, keys, page_size, cursor, with_total, db_name):
+    """
+    Run one page of `SELECT <select> <from_> WHERE <where>` ordered by `keys`
+    (list of (sql_expr, "ASC"|"DESC"); the last key must be unique). where
+    is the list of conditions every row must meet (params fill them), the
+    cursor condition is added to it.
+
+    from_ can also be a list of FROM clauses over tables with the same
+    columns (e.g. LOAN_SOURCES): each gets the conditions and they are
+    combined with UNION ALL, which SQLite merges from each table's index
+    instead of sorting the union. params then apply to every clause.
+    """
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+
+    sources = [from_] if isinstance(from_, str) else list(from_)
+    key_cols = ", ".join(f"{expr} AS _key{i}" for i, (expr, _) in enumerate(keys))
+    conditions, cursor_params = list(where), []
+    if cursor:
+        cursor_condition, cursor_params = _keyset_predicate(keys, _decode_cursor(cursor))
+        conditions.append(cursor_condition)
+
+    arms, page_params = [], []
+    for source in sources:
+        arms.append(f"SELECT {select}, {key_cols} {source}{_where(conditions)}")
+        page_params += list(params) + cursor_params
+    if len(arms) == 1:
+        order_by = ", ".join(f"{expr} {direction}" for expr, direction in keys)
+    else:
+        # a compound's ORDER BY can only name its result columns
+        order_by = ", ".join(f"_key{i} {direction}" for i, (_, direction) in enumerate(keys))
+    sql = " UNION ALL ".join(arms) + f" ORDER BY {order_by} LIMIT ?"
+    page_params.append(page_size + 1)
+
+    conn = get_db_connection(db_name)
+    try:
+        rows = [dict(r) for r in conn.execute(sql, page_params).fetchall()]
+        total = None
+        if with_total:
+            total = sum(conn.execute(f"SELECT COUNT(*) {source}{_where(where)}", params).fetchone()[0]
+                        for source in sources)
+    finally:
+        conn.close()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = _encode_cursor([rows[-1][f"_key{i}"] for i in range(len(keys))])
+    for row in rows:
+        for i in range(len(keys)):
+            del row[f"_key{i}"]
+    return {"rows": rows, "next_cursor": next_cursor, "total": total}
+
+def get_items_with_display_status_page(is_staff: bool, page_size=DEFAULT_PAGE_SIZE, cursor=None,
+                                       with_total=False, db_name=None):
+    """Paged get_items_with_display_status, ordered by item_id"""
+    if is_staff:
+        select = """i.*,
+            CASE
+                WHEN i.status = 'lost' THEN 'lost'
+                WHEN ol.id IS NOT NULL THEN 'checked_out'
+                ELSE i.status
+            END as display_status"""
+        where = []
+    else:
+        select = """i.*,
+            CASE
+                WHEN ol.id IS NOT NULL THEN 'checked_out'
+                ELSE i.status
+            END as display_status"""
+        where = ["i.status IN ('available', 'checked_out', 'on_hold')"]
+    from_ = """
+        FROM Items i
+        LEFT JOIN OpenLoans ol ON ol.item_id = i.item_id"""
+    return _keyset_page(select, from_, where, [], [("i.item_id", "ASC")],
+                        page_size, cursor, with_total, db_name)
+
+# The two halves of the loan history (BorrowingHistory is a view over them),
+# paged separately and merged: see _keyset_page. Neither has conditions of
+# its own, callers pass theirs (e.g. "bh.id = ?") as the page's where.
+LOAN_SOURCES = ("(SELECT *, NULL AS returnDate FROM OpenLoans)", "LoanArchive")
+LOAN_HISTORY_KEYS = [("bh.checkoutDate", "DESC"), ("bh.id", "DESC"), ("bh.item_id", "DESC")]
+
+def get_all_borrowing_history_page(is_staff: bool, patron_id=None, page_size=DEFAULT_PAGE_SIZE,
+                                   cursor=None, with_total=False, db_name=None):
+    """Paged get_all_borrowing_history, newest checkout first (non-staff: own history only)"""
+    where, params = [], []
+    if not is_staff:
+        where.append("bh.id = ?")
+        params.append(patron_id)
+    return _keyset_page(
+        """bh.id, bh.item_id, bh.checkoutDate, bh.returnDate, i.title, i.creator, i.type,
+            p.first_name || ' ' || p.last_name as patron_name, i.status""",
+        [f"""
+        FROM {source} bh
+        JOIN Items i ON bh.item_id = i.item_id
+        JOIN Patron p ON bh.id = p.id""" for source in LOAN_SOURCES],
+        where, params, LOAN_HISTORY_KEYS, page_size, cursor, with_total, db_name)
+
+def get_borrowing_history_page(patron_id=None, page_size=DEFAULT_PAGE_SIZE, cursor=None,
+                               with_total=False, db_name=None):
+    """Paged get_borrowing_history, newest checkout first"""
+    if patron_id:
+        return _keyset_page(
+            "i.title, i.creator, i.type, bh.checkoutDate, bh.returnDate",
+            [f"""
+            FROM {source} bh
+            JOIN Items i ON bh.item_id = i.item_id""" for source in LOAN_SOURCES],
+            ["bh.id = ?"], [patron_id], LOAN_HISTORY_KEYS, page_size, cursor, with_total, db_name)
+    return _keyset_page(
+        """bh.id, bh.item_id, bh.checkoutDate, bh.returnDate, i.title, i.type,
+            p.first_name || ' ' || p.last_name as patron_name""",
+        [f"""
+        FROM {source} bh
+        JOIN Items i ON bh.item_id = i.item_id
+        JOIN Patron p ON bh.id = p.id""" for source in LOAN_SOURCES],
+        [], [], LOAN_HISTORY_KEYS, page_size, cursor, with_total, db_name)
+
+# same order as get_upcoming_events, idx_events_schedule serves both directions
+EVENT_KEYS_SOONEST = [("e.date", "ASC"), ("e.start_time", "ASC"), ("e.event_id", "ASC")]
+EVENT_KEYS_NEWEST = [(expr, "DESC") for expr, _ in EVENT_KEYS_SOONEST]
+
+def get_upcoming_events_page(include_past=False, page_size=DEFAULT_PAGE_SIZE, cursor=None,
+                             with_total=False, db_name=None):
+    """Paged get_upcoming_events (staff: all events newest first, patrons: upcoming soonest first)"""
+    if include_past:
+        return _keyset_page(
+            """e.*,
+                CASE WHEN e.date < date('now', 'localtime') THEN 'No Longer Available'
+                     ELSE 'Upcoming'
+                END as event_status""",
+            "FROM Events e", [], [], EVENT_KEYS_NEWEST,
+            page_size, cursor, with_total, db_name)
+    today = datetime.now().strftime('%Y-%m-%d')
+    return _keyset_page(
+        "e.*", "FROM Events e", ["e.date >= ?"], [today],
+        EVENT_KEYS_SOONEST,
+        page_size, cursor, with_total, db_name)
+
+def show_acquisition_requests_page(page_size=DEFAULT_PAGE_SIZE, cursor=None, with_total=False, db_name=None):
+    """Paged show_acquisition_requests: pending first, then newest request first"""
+    return _keyset_page(
+        """ar.request_id, p.first_name, p.last_name, ar.title,
+            ar.creator, ar.item_type, ar.request_status""",
+        """
+        FROM AcquisitionRequest ar
+        JOIN Patron p ON ar.requested_by = p.id""",
+        [], [],
+        [("CASE WHEN ar.request_status = 'Pending' THEN 0 ELSE 1 END", "ASC"),
+         ("ar.request_id", "DESC")],
+        page_size, cursor, with_total, db_name)
+
+
+## INSTRUMENTATION ##
+# every public function above records its latency (see database/instrumentation.py)
+instrument_functions(globals(), __name__)
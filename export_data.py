@@ -0,0 +1,46 @@
+"""
+Export borrowing history, events or acquisition requests from the command line.
+
+    python export_data.py borrowing_history audit_2024.csv --from 2024-01-01 --to 2024-12-31
+    python export_data.py events events.jsonl
+"""
+import argparse
+import sys
+
+from database import instrumentation
+from database.connection import close_all_pools
+from database.exporters import BATCH_SIZE, DATASETS, WRITERS, export
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a library dataset to CSV, JSONL or Parquet")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("path", help="output file")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="default: from the file extension")
+    parser.add_argument("--from", dest="start_date", help="first date to include (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", help="last date to include (YYYY-MM-DD)")
+    parser.add_argument("--db", help="database file (default: the application database)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+    # in-process metrics die with the command, and a full-history scan would be logged as "slow"
+    instrumentation.ENABLED = False
+
+    def progress(rows):
+        print(f"\r{rows} rows", end="", file=sys.stderr, flush=True)
+
+    try:
+        report = export(args.dataset, args.path, format=args.format, start_date=args.start_date,
+                        end_date=args.end_date, batch_size=args.batch_size, progress=progress,
+                        db_name=args.db)
+    except (OSError, ValueError) as e:
+        print(f"\nExport failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        close_all_pools()
+
+    print(file=sys.stderr)
+    print(f"Exported {report['rows']} rows to {report['path']} in {report['elapsed']:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
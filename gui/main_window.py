@@ -3,16 +3,38 @@ from datetime import datetime
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                             QLabel, QHeaderView, QLineEdit, QPushButton, QStackedWidget, QMessageBox,
                             QTableWidget, QTableWidgetItem, QComboBox, QDateEdit, QDialog, 
-                            QGridLayout, QRadioButton, QButtonGroup, QStackedWidget, QTextEdit)
-from PyQt5.QtCore import Qt, QDate
+                            QGridLayout, QRadioButton, QButtonGroup, QStackedWidget, QTextEdit,
+                            QFileDialog, QCheckBox, QSpinBox, QTimeEdit)
+from PyQt5.QtCore import Qt, QDate, QTime, QModelIndex, QTimer
 from PyQt5.QtGui import QDoubleValidator
 from PyQt5.QtGui import QFont, QColor
 from pathlib import Path
 
-from database import services
+from database import services, instrumentation, catalog_import, exporters, analytics
+from database.cache import get_cache_stats
+from database.connection import get_pool_stats
+from gui.workers import TaskRunner
+from gui.session import Session
+from gui.table_models import RecordTableModel, StatusDelegate, ButtonDelegate, create_results_view
 
 LOAN_PERIOD_DAYS = 28
 GRACE_PERIOD_DAYS = 14
+PAGE_SIZE = 200  # rows fetched per page for long lists (loaded as the table scrolls)
+OVERDUE_SWEEP_INTERVAL = 15 * 60  # seconds between background overdue/lost sweeps
+SESSION_CHECK_INTERVAL = 60  # seconds between checks of the Staff version stamp
+PATRON_BALANCE_INTERVAL = 24 * 60 * 60  # recompute of all balances (days overdue), writes refresh their patrons
+
+# Status cell colors for the result views: {status: (background, foreground)}, None = any other status
+ITEM_STATUS_COLORS = {
+    "available": (QColor(200, 255, 200), QColor(0, 100, 0)),    # Light green
+    "checked_out": (QColor(255, 229, 204), QColor(153, 76, 0)),  # Light orange
+    "on_hold": (QColor(204, 229, 255), QColor(0, 51, 153)),      # Light blue
+    "lost": (QColor(255, 204, 204), None),                       # Light red
+}
+EVENT_STATUS_COLORS = {
+    "No Longer Available": (QColor(150, 150, 150), QColor(250, 250, 250)),
+    None: (QColor(200, 255, 200), QColor(0, 100, 0)),
+}
 
 class LibraryApp(QMainWindow):
     def __init__(self):
@@ -23,7 +45,25 @@ class LibraryApp(QMainWindow):
         # Session state
         self.current_user = None
         self.is_staff = False
+        self.session = None  # authorization snapshot taken at login, see gui/session.py
         self.db_name = "database/library.db"
+        self.paged_view = None  # state of the paged list currently shown, see show_paged
+
+        # Service calls run on worker threads so slow queries don't freeze the window
+        self.tasks = TaskRunner(self)
+        self.tasks.busy_changed.connect(self.set_loading)
+
+        # Overdue/lost sweep runs in the background on a timer (and once at start-up)
+        # instead of on every fines lookup
+        self.sweep_timer = QTimer(self)
+        self.sweep_timer.timeout.connect(self.run_scheduled_sweep)
+        self.sweep_timer.start(OVERDUE_SWEEP_INTERVAL * 1000)
+        QTimer.singleShot(0, self.run_scheduled_sweep)
+
+        # Re-load the session's roles if Staff changed (e.g. from another terminal)
+        self.session_timer = QTimer(self)
+        self.session_timer.timeout.connect(self.check_session)
+        self.session_timer.start(SESSION_CHECK_INTERVAL * 1000)
         
         # Create stacked widget for different views
         self.stacked_widget = QStackedWidget()
@@ -34,6 +74,12 @@ class LibraryApp(QMainWindow):
         self.patron_dashboard = self.create_patron_dashboard()
         self.staff_dashboard = self.create_staff_dashboard()
         self.register_screen = self.create_register_screen()
+
+        # Cell painters shared by the model-based result views
+        self.item_status_delegate = StatusDelegate(ITEM_STATUS_COLORS, self)
+        self.event_status_delegate = StatusDelegate(EVENT_STATUS_COLORS, self)
+        self.register_delegate = ButtonDelegate("Register", "#9ac953", self)
+        self.register_delegate.clicked.connect(self.register_for_event_row)
         
         # Add screens to stacked widget
         self.stacked_widget.addWidget(self.login_screen)
@@ -65,7 +111,7 @@ class LibraryApp(QMainWindow):
                 }
                 
                 /* Text */
-                QLabel, QLineEdit, QComboBox, QTableWidget, QRadioButton {
+                QLabel, QLineEdit, QComboBox, QTableView, QRadioButton {
                     color: #333333;
                 }
                 
@@ -86,7 +132,7 @@ class LibraryApp(QMainWindow):
                 }
                 
                 /* Tables */
-                QTableWidget {
+                QTableView {
                     background-color: white;
                     border-radius: 4px;
                     gridline-color: #e0e0e0;
@@ -128,7 +174,7 @@ class LibraryApp(QMainWindow):
                 }                
                 
                 /* Text */
-                QLabel, QLineEdit, QComboBox, QTableWidget, QRadioButton {
+                QLabel, QLineEdit, QComboBox, QTableView, QRadioButton {
                     color: #e0e0e0;
                 }
                 
@@ -149,7 +195,7 @@ class LibraryApp(QMainWindow):
                 }
                 
                 /* Tables */
-                QTableWidget {
+                QTableView {
                     background-color: #2a2a3a;
                     border-radius: 4px;
                     gridline-color: #444444;
@@ -289,6 +335,7 @@ class LibraryApp(QMainWindow):
             ("🕒 My History", self.show_patron_history),
             ("📅 Events", self.show_upcoming_events),
             ("📋 My Registrations", self.show_my_registrations),
+            ("📌 My Holds", self.show_my_holds),
             ("🎁 Donate Item", self.show_donate_dialog),
             ("💳 Pay Fines", self.show_pay_fines_dialog),
             ("📜 Request Item", self.show_request_dialog),
@@ -307,10 +354,15 @@ class LibraryApp(QMainWindow):
         self.results_table.verticalHeader().setVisible(False)
         self.results_table.setEditTriggers(QTableWidget.NoEditTriggers) # This is to prevent accidental editing of 
         # tables/data upon viewing (Though it does not directly affect the database, this is for convienence)
+        self.results_table.verticalScrollBar().valueChanged.connect(self.load_more_on_scroll)
+
+        # Model-based view for long read-only lists, shown instead of results_table
+        self.results_view = create_results_view()
         
         layout.addLayout(header)
         layout.addLayout(btn_grid)
         layout.addWidget(self.results_table)
+        layout.addWidget(self.results_view)
         
         widget.setLayout(layout)
         return widget
@@ -344,12 +396,16 @@ class LibraryApp(QMainWindow):
             ("🕒 Patron History", self.show_patron_history),
             ("📅 Events", self.show_upcoming_events),
             ("➕ Add Item", self.show_add_item_dialog),
+            ("📥 Import Catalog", self.import_catalog_file),
             ("📋 Manage Requests", self.show_requests),
             ("🔍 Check Overdue Items", self.show_overdue_items), # replace handle_overdue_check to be able to view all overdue items
             ("🎉 Create Event", self.show_create_event_dialog),
             ("📝 Add Staff Record", self.show_add_staff_record_dialog),
-            ("🚪 Request Leave", self.request_leave) # change to be a quit / request leave button for all staff
+            ("🚪 Request Leave", self.request_leave), # change to be a quit / request leave button for all staff
             # replace quit_volunteering function --> request_leave
+            ("📈 Performance", self.show_performance_dialog),
+            ("📤 Export Data", self.show_export_dialog),
+            ("📊 Analytics", self.show_analytics_dialog),
         ]
 
         
@@ -365,10 +421,14 @@ class LibraryApp(QMainWindow):
         self.staff_results_table.verticalHeader().setVisible(False)
         self.staff_results_table.setEditTriggers(QTableWidget.NoEditTriggers) # This is to prevent accidental editing of 
         # tables/data upon viewing (Though it does not directly affect the database, this is for convienence)
+        self.staff_results_table.verticalScrollBar().valueChanged.connect(self.load_more_on_scroll)
+
+        self.staff_results_view = create_results_view()
         
         layout.addLayout(header)
         layout.addLayout(btn_grid)
         layout.addWidget(self.staff_results_table)
+        layout.addWidget(self.staff_results_view)
         
         widget.setLayout(layout)
         return widget
@@ -384,30 +444,37 @@ class LibraryApp(QMainWindow):
             QMessageBox.warning(self, "Error", "Please enter your ID or email")
             return
         
-        try:
+        def login(identifier):
             patron = services.find_patron_with_staff(identifier, db_name=self.db_name)
+            if not patron:
+                return None, None
+            return patron, services.get_session_authorization(patron['id'], db_name=self.db_name)
+
+        self.run_task(
+            "login", login, identifier,
+            on_success=self.complete_login, error_message="Login failed",
+        )
+
+    def complete_login(self, result):
+        patron, authorization = result
+        if patron:
+            self.current_user = {
+                'id': patron['id'],
+                'first_name': patron['first_name'],
+                'last_name': patron['last_name']
+            }
+            self.session = Session(authorization)
+            self.is_staff = self.session.is_staff
             
-            if patron:
-                self.current_user = {
-                    'id': patron['id'],
-                    'first_name': patron['first_name'],
-                    'last_name': patron['last_name']
-                }
-                self.is_staff = bool(patron['is_staff'])
-                
-                if self.is_staff:
-                    self.staff_greeting.setText(f"Staff: {patron['first_name']} {patron['last_name']}")
-                    self.stacked_widget.setCurrentWidget(self.staff_dashboard)
-                else:
-                    self.patron_greeting.setText(f"Welcome, {patron['first_name']}!")
-                    self.stacked_widget.setCurrentWidget(self.patron_dashboard)
-                
+            if self.is_staff:
+                self.staff_greeting.setText(f"Staff: {patron['first_name']} {patron['last_name']}")
+                self.stacked_widget.setCurrentWidget(self.staff_dashboard)
             else:
-                QMessageBox.warning(self, "Error", "User not found")
-        except ValueError:
-            QMessageBox.warning(self, "Error", "Invalid ID format")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Login failed: {str(e)}")
+                self.patron_greeting.setText(f"Welcome, {patron['first_name']}!")
+                self.stacked_widget.setCurrentWidget(self.patron_dashboard)
+            
+        else:
+            QMessageBox.warning(self, "Error", "User not found")
     
     def handle_registration(self):
         """Registration Window handler"""
@@ -419,8 +486,12 @@ class LibraryApp(QMainWindow):
             QMessageBox.warning(self, "Error", "All fields are required")
             return
         
-        result = services.add_patron(first, last, email, db_name=self.db_name)
-        
+        self.run_task(
+            "register", services.add_patron, first, last, email, db_name=self.db_name,
+            on_success=self.complete_registration, error_message="Registration failed",
+        )
+
+    def complete_registration(self, result):
         if result["status"] == "success":
             QMessageBox.information(
                 self, 
@@ -442,8 +513,7 @@ class LibraryApp(QMainWindow):
         ) == QMessageBox.Yes:
             return
             
-        try:
-            services.cancel_event_registration(registration_id, db_name=self.db_name)
+        def cancelled(_):
             QMessageBox.information(self, "Cancelled", "Registration cancelled successfully")
 
             # refresh whichever view is currently showing
@@ -451,13 +521,39 @@ class LibraryApp(QMainWindow):
                 self.show_my_registrations()
             else:
                 self.show_upcoming_events()
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to cancel registration: {str(e)}")
+
+        self.run_task("cancel_registration", services.cancel_event_registration, registration_id,
+                      db_name=self.db_name, on_success=cancelled, error_message="Failed to cancel registration")
     
+    def check_session(self):
+        """Timer job: refresh the authorization snapshot when the Staff version stamp moved"""
+        if self.session is None:
+            return
+        session = self.session
+
+        def reload(version):
+            if self.session is session and session.is_stale(version):
+                self.tasks.submit("session", services.get_session_authorization, session.patron_id,
+                                  db_name=self.db_name, on_success=self.update_session)
+
+        self.tasks.submit("session", services.get_staff_version, db_name=self.db_name, on_success=reload)
+
+    def update_session(self, authorization):
+        if self.session is None or authorization is None:
+            return
+        self.session = Session(authorization)
+        if self.is_staff and not self.session.is_staff:
+            QMessageBox.information(self, "Session", "Your staff access has changed. Please log in again.")
+            self.handle_logout()
+
     def handle_logout(self):
         """Session logout handler"""
         self.current_user = None
         self.is_staff = False
+        self.session = None
+        self.tasks.cancel("session")
+        self.paged_view = None
+        self.tasks.cancel("results")
         self.stacked_widget.setCurrentWidget(self.login_screen)
         self.login_id_input.clear()
         # make sure to clear tables from previously logged in Patron
@@ -466,53 +562,71 @@ class LibraryApp(QMainWindow):
 
         self.staff_results_table.clearContents()
         self.staff_results_table.setRowCount(0)
+
+        for table, view in ((self.results_table, self.results_view),
+                            (self.staff_results_table, self.staff_results_view)):
+            self.reset_view(view)
+            table.show()
     
     # Display overdue items
     def handle_overdue_check(self):
         """Check for overdue items and update status"""
-        lost_items = services.check_overdue_items(self.db_name)
-        if lost_items:
-            msg = f"Check complete! {len(lost_items)} item(s) marked as lost."
-        else:
-            msg = "No New overdue items found."
-        QMessageBox.information(self, "Overdue Check", msg)
+        def report(result):
+            lost_items = result["marked_lost"]
+            if lost_items:
+                msg = f"Check complete! {len(lost_items)} item(s) marked as lost."
+            else:
+                msg = "No New overdue items found."
+            QMessageBox.information(self, "Overdue Check", msg)
+
+        self.run_task("overdue_check", services.run_overdue_sweep, full=True, db_name=self.db_name,
+                      on_success=report, error_message="Overdue check failed")
+
+    def run_scheduled_sweep(self):
+        """Timer job: incremental overdue sweep, skipped if another terminal just ran one"""
+        self.tasks.submit("overdue_sweep", services.run_overdue_sweep,
+                          min_interval=OVERDUE_SWEEP_INTERVAL, db_name=self.db_name)
+        self.tasks.submit("patron_balances", services.compute_patron_balances,
+                          min_interval=PATRON_BALANCE_INTERVAL, db_name=self.db_name)
+        self.tasks.submit("expire_holds", services.expire_holds, db_name=self.db_name)
     
     def show_overdue_items(self):
-        try:
-            today = datetime.now().strftime("%Y-%m-%d")
+        if not self.is_staff:
+            QMessageBox.information(self, "Overdue Items", "Staff only view available for patrons yet.")
+            return
 
-            if self.is_staff:
-                items = services.get_overdue_items(today=today, db_name=self.db_name)
-
-                table = self.staff_results_table
-                table.clearContents()
-                table.setRowCount(len(items))
-                table.setColumnCount(8)
-                table.setHorizontalHeaderLabels([
-                    "Item ID", "Title", "Creator", "Type", "Status",
-                    "Patron ID", "Name", "Due Date"
-                ])
-            
-                for row, item in enumerate(items):
-                    table.setItem(row, 0, QTableWidgetItem(str(item["item_id"])))
-                    table.setItem(row, 1, QTableWidgetItem(item["title"]))
-                    table.setItem(row, 2, QTableWidgetItem(item["creator"]))
-                    table.setItem(row, 3, QTableWidgetItem(item["type"]))
-                    table.setItem(row, 4, QTableWidgetItem(item["status"]))
-                    table.setItem(row, 5, QTableWidgetItem(str(item["patron_id"])))
-                    table.setItem(row, 6, QTableWidgetItem(f"{item['first_name']} {item['last_name']}"))
-                    table.setItem(row, 7, QTableWidgetItem(item["due_date"]))
+        today = datetime.now().strftime("%Y-%m-%d")
+        self.paged_view = None
+        self.run_task(
+            "results", services.get_overdue_items, today=today, db_name=self.db_name,
+            on_success=self.display_overdue_items, error_message="Failed to load overdue items",
+        )
 
-                table.resizeColumnsToContents()
-                table.horizontalHeader().setStretchLastSection(False)
+    def display_overdue_items(self, items):
+        table = self.use_table_widget()
+        table.clearContents()
+        table.setRowCount(len(items))
+        table.setColumnCount(8)
+        table.setHorizontalHeaderLabels([
+            "Item ID", "Title", "Creator", "Type", "Status",
+            "Patron ID", "Name", "Due Date"
+        ])
+    
+        for row, item in enumerate(items):
+            table.setItem(row, 0, QTableWidgetItem(str(item["item_id"])))
+            table.setItem(row, 1, QTableWidgetItem(item["title"]))
+            table.setItem(row, 2, QTableWidgetItem(item["creator"]))
+            table.setItem(row, 3, QTableWidgetItem(item["type"]))
+            table.setItem(row, 4, QTableWidgetItem(item["status"]))
+            table.setItem(row, 5, QTableWidgetItem(str(item["patron_id"])))
+            table.setItem(row, 6, QTableWidgetItem(f"{item['first_name']} {item['last_name']}"))
+            table.setItem(row, 7, QTableWidgetItem(item["due_date"]))
 
-            if len(items) == 0:
-                QMessageBox.information(self, "Overdue Items", "No overdue items found.")
+        table.resizeColumnsToContents()
+        table.horizontalHeader().setStretchLastSection(False)
 
-            else:
-                QMessageBox.information(self, "Overdue Items", "Staff only view available for patrons yet.")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to load overdue items: {str(e)}")
+        if len(items) == 0:
+            QMessageBox.information(self, "Overdue Items", "No overdue items found.")
     
 
 
@@ -532,22 +646,21 @@ class LibraryApp(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
-            try:
-                services.add_volunteer(self.current_user['id'], db_name=self.db_name)
+            def joined(_):
                 QMessageBox.information(self, "Welcome!",
                                     "You're now a volunteer staff member!\n"
                                     "Please log in again to access volunteer features.")
                 self.handle_logout()  # Force logout to help with session maintenance and unintentional back tracking
-            except Exception as e:
-                QMessageBox.critical(self, "Error", 
-                                f"Failed to register: {str(e)}")
+
+            self.run_task("volunteer", services.add_volunteer, self.current_user['id'], db_name=self.db_name,
+                          on_success=joined, error_message="Failed to register")
                 
    
     # NEW FUNCTION --> handle staff leave distinctly
     def request_leave(self):
         """Any staff can request to leave. Volunteers can immediately quit."""
-        if not services.is_volunteer(self.current_user['id'], db_name=self.db_name):
-            if services.is_manager(self.current_user['id'], db_name=self.db_name):
+        if not self.session.can("quit_volunteering"):
+            if self.session.is_manager:
                 try:
                     QMessageBox.information(self, "Leave Request", "Please speak to the Department Head to terminate your position.")
                 except Exception as e:
@@ -565,22 +678,31 @@ class LibraryApp(QMainWindow):
             QMessageBox.Yes | QMessageBox.No
             )
             if reply == QMessageBox.Yes:
-                try:
-                    services.remove_volunteer(self.current_user['id'], db_name=self.db_name)
+                def left(_):
                     QMessageBox.information(self, "Thank You", 
                                     "We appreciate your volunteer service!\n"
                                     "Please log in again.")
                     self.handle_logout() # Force logout to help with session maintenance and unintentional back tracking
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to update status: {str(e)}")
+
+                self.run_task("volunteer", services.remove_volunteer, self.current_user['id'], db_name=self.db_name,
+                              on_success=left, error_message="Failed to update status")
                 
     def register_for_event(self, event_id):
-        try:
-            if services.register_for_event(self.current_user['id'], event_id, db_name=self.db_name):
+        def registered(status):
+            if status == "waitlisted":
+                QMessageBox.information(self, "Waitlisted",
+                                        "This event is full, you are on the waitlist.\n"
+                                        "You will get a seat automatically if someone cancels.")
+            else:
                 QMessageBox.information(self, "Success", "Registration confirmed!")
-                self.show_upcoming_events()  # Refresh view
-        except ValueError as e:
-            QMessageBox.warning(self, "Error", str(e))
+            self.show_upcoming_events()  # Refresh view
+
+        self.run_task("register_event", services.register_for_event, self.current_user['id'], event_id,
+                      db_name=self.db_name, on_success=registered)
+
+    def register_for_event_row(self, row):
+        """Register button of the patron events view"""
+        self.register_for_event(self.results_view.model().key(row))
     
     # ----------------------
     # Patron Functionality
@@ -588,41 +710,23 @@ class LibraryApp(QMainWindow):
     
     def show_available_items(self):
         """Show items with status 'Available' and 'Checked Out' for both Patron and Staff and 'Lost' for staff"""
-        
-        try:
-            items = services.get_items_with_display_status(self.is_staff, db_name=self.db_name)
-            # Display formatting
-            table = self.staff_results_table if self.is_staff else self.results_table
-            table.setRowCount(len(items))
-            table.setColumnCount(5)
-            table.setHorizontalHeaderLabels(["ID", "Title", "Creator", "Type", "Status"])
-            
-            for row, item in enumerate(items):
-                status = item['display_status']
-                
-                table.setItem(row, 0, QTableWidgetItem(str(item['item_id'])))
-                table.setItem(row, 1, QTableWidgetItem(item['title']))
-                table.setItem(row, 2, QTableWidgetItem(item['creator']))
-                table.setItem(row, 3, QTableWidgetItem(item['type']))
-                
-                # Color coding
-                status_item = QTableWidgetItem(status.capitalize())
-                if status == 'available':
-                    status_item.setBackground(QColor(200, 255, 200)) # Light green
-                    status_item.setForeground(QColor(0, 100, 0))
-                elif status == 'checked_out':
-                    status_item.setBackground(QColor(255, 229, 204)) # Light orange
-                    status_item.setForeground(QColor(153, 76, 0)) 
-                elif status == 'lost':
-                    status_item.setBackground(QColor(255, 204, 204)) # Light red
-                
-                table.setItem(row, 4, status_item)
-            
-            # Auto-resize columns
-            table.resizeColumnsToContents()
-            
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to load items: {str(e)}")
+        self.show_model(
+            self.item_columns(),
+            fetch_page=lambda cursor: services.get_items_with_display_status_page(
+                self.is_staff, page_size=PAGE_SIZE, cursor=cursor, db_name=self.db_name),
+            status_fn=lambda item: item['display_status'],
+            delegates={4: self.item_status_delegate},
+            error_message="Failed to load items",
+        )
+
+    def item_columns(self):
+        return [
+            ("ID", lambda item: str(item['item_id'])),
+            ("Title", lambda item: item['title']),
+            ("Creator", lambda item: item['creator']),
+            ("Type", lambda item: item['type']),
+            ("Status", lambda item: item['display_status'].capitalize()),
+        ]
     
     # Patron can search by title or item ID to borrow a specific item
     def show_borrow_dialog(self):
@@ -654,9 +758,7 @@ class LibraryApp(QMainWindow):
         combo_panel = QWidget()
         combo_layout = QVBoxLayout(combo_panel)
         self.item_combo = QComboBox()
-        items = services.get_available_items(db_name=self.db_name)
-        for item in items:
-            self.item_combo.addItem(f"{item['title']} (ID: {item['item_id']})", item['item_id'])
+        self.item_combo.setEnabled(False)  # filled once the item list has loaded
         combo_layout.addWidget(self.item_combo)
 
         # ID input panel
@@ -670,7 +772,7 @@ class LibraryApp(QMainWindow):
         title_panel = QWidget()
         title_layout = QVBoxLayout(title_panel)
         self.title_input = QLineEdit()
-        self.title_input.setPlaceholderText("Enter title to search")
+        self.title_input.setPlaceholderText("Enter title, author or type to search")
         
         search_button = QPushButton("Search")
         self.title_results = QComboBox()  # Dropdown to display search results
@@ -692,6 +794,8 @@ class LibraryApp(QMainWindow):
         # Button row
         btn_row = QHBoxLayout()
         borrow_btn = QPushButton("Borrow")
+        hold_btn = QPushButton("Place Hold")
+        hold_btn.setToolTip("Join the waiting list for an item that is checked out")
         cancel_btn = QPushButton("Cancel")
 
         # Connections
@@ -700,9 +804,11 @@ class LibraryApp(QMainWindow):
         rb_title.toggled.connect(lambda: self.borrow_stack.setCurrentIndex(2))
         cancel_btn.clicked.connect(dialog.close)
         borrow_btn.clicked.connect(lambda: self.process_borrow(dialog))
+        hold_btn.clicked.connect(lambda: self.process_hold(dialog))
 
         # Layout
         btn_row.addWidget(cancel_btn)
+        btn_row.addWidget(hold_btn)
         btn_row.addWidget(borrow_btn)
 
         layout.addWidget(QLabel("Select borrowing method:"))
@@ -712,7 +818,15 @@ class LibraryApp(QMainWindow):
         layout.addWidget(self.borrow_stack)
         layout.addLayout(btn_row)
 
+        self.run_task("borrow_items", services.get_available_items, db_name=self.db_name,
+                      on_success=self.fill_borrow_combo, error_message="Failed to load items")
         dialog.exec_()
+        self.tasks.cancel("borrow_items")
+
+    def fill_borrow_combo(self, items):
+        for item in items:
+            self.item_combo.addItem(f"{item['title']} (ID: {item['item_id']})", item['item_id'])
+        self.item_combo.setEnabled(True)
 
     def search_by_title(self):
         """Fetch items matching the entered title"""
@@ -721,70 +835,85 @@ class LibraryApp(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please enter a title to search.")
             return
 
-        try: 
-            results = services.search_available_items_by_title(title_query, db_name=self.db_name)
-            self.title_results.clear()
-            if results:
-                for item in results:
-                    display_text = f"{item['title']} by {item['creator']} (ID: {item['item_id']})"
-                    self.title_results.addItem(display_text, item["item_id"])
-                self.title_results.setEnabled(True)
-            else:
-                self.title_results.addItem("No results found")
-                self.title_results.setEnabled(False)
-        except Exception as e: 
-            QMessageBox.warning(self, "Error", f"Search failed: {str(e)}")
+        self.run_task("search", services.search_catalog, title_query, limit=50, db_name=self.db_name,
+                      on_success=self.fill_title_results, error_message="Search failed")
 
-    def process_borrow(self, dialog):
-        """Handle borrowing through different methods"""
+    def fill_title_results(self, results):
+        self.title_results.clear()
+        if results:
+            for item in results:
+                display_text = f"{item['title']} by {item['creator']} (ID: {item['item_id']})"
+                self.title_results.addItem(display_text, item["item_id"])
+            self.title_results.setEnabled(True)
+        else:
+            self.title_results.addItem("No results found")
+            self.title_results.setEnabled(False)
+
+    def selected_borrow_item(self, dialog):
+        """Item ID picked in the borrow dialog by whichever method is active, None if invalid"""
         if self.borrow_stack.currentIndex() == 0:  # Combo box selected
-            item_id = self.item_combo.currentData()
+            return self.item_combo.currentData()
         
         elif self.borrow_stack.currentIndex() == 1:  # ID input
             try:
-                item_id = int(self.id_input.text())
-                if not services.get_item(item_id, db_name=self.db_name):  # Ensure the item exists
-                    QMessageBox.warning(dialog, "Error", "Invalid item ID")
-                    return
+                return int(self.id_input.text())
             except ValueError:
                 QMessageBox.warning(dialog, "Error", "Please enter a valid numeric ID")
-                return
+                return None
         
         elif self.borrow_stack.currentIndex() == 2:  # Search by title selected
             item_id = self.title_results.currentData()  # Retrieve selected item's ID
             if item_id is None:
                 QMessageBox.warning(dialog, "Error", "Please select a valid item")
-                return
+            return item_id
 
-        try:
-            due_date = services.borrow_item(self.current_user['id'], item_id, db_name=self.db_name)
+    def process_borrow(self, dialog):
+        """Handle borrowing through different methods"""
+        item_id = self.selected_borrow_item(dialog)
+        if item_id is None:
+            return
+
+        def borrowed(due_date):
             QMessageBox.information(dialog, "Success", f"Item borrowed! Due: {due_date}")
             dialog.close()
-        except ValueError as e:
-            QMessageBox.warning(dialog, "Error", str(e))
+
+        self.run_task("borrow", services.borrow_item, self.current_user['id'], item_id, db_name=self.db_name,
+                      on_success=borrowed, error_parent=dialog)
+
+    def process_hold(self, dialog):
+        """Queue for the selected item instead of borrowing it"""
+        item_id = self.selected_borrow_item(dialog)
+        if item_id is None:
+            return
+
+        def placed(hold):
+            QMessageBox.information(
+                dialog, "Hold Placed",
+                f"You are number {hold['position']} in line. The item will be kept for you "
+                f"for {services.HOLD_SHELF_DAYS} days once it is returned."
+            )
+            dialog.close()
+
+        self.run_task("hold", services.place_hold, self.current_user['id'], item_id, db_name=self.db_name,
+                      on_success=placed, error_parent=dialog)
 
     
     def show_return_dialog(self):
         """Similar to borrow dialog but shows currently checked out items"""
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Return Item")
-        
-        layout = QVBoxLayout()
-        try: 
-            items = services.get_checked_out_items_for_patron(
-                self.current_user["id"], 
-                db_name=self.db_name
-            )
-        except Exception as e: 
-            QMessageBox.warning(self, "Error", f"Failed to load items: {str(e)}")
-            dialog.close()
-            return
-        
+        self.run_task(
+            "return_items", services.get_checked_out_items_for_patron, self.current_user["id"],
+            db_name=self.db_name, on_success=self.open_return_dialog, error_message="Failed to load items",
+        )
+
+    def open_return_dialog(self, items):
         if not items:
             QMessageBox.information(self, "Info", "You have no items to return")
-            dialog.close()
             return
         
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Return Item")
+        
+        layout = QVBoxLayout()
         item_combo = QComboBox()
         for item in items:
             item_combo.addItem(f"{item['title']} ({item['type']})", item['item_id'])
@@ -800,8 +929,9 @@ class LibraryApp(QMainWindow):
         dialog.exec_()
     
     def return_selected_item(self, item_id, dialog):
-        try:
-            result = services.return_item(self.current_user["id"], item_id, db_name=self.db_name)
+        def returned(result):
+            dialog.close()
+            self.show_available_items()
 
             if result.get("status") == "lost":
                 cost = result["replacement_cost"]
@@ -814,14 +944,11 @@ class LibraryApp(QMainWindow):
                 )
 
                 if reply == QMessageBox.Yes:
-                    services.process_lost_item_payment(
-                        self.current_user["id"],
-                        item_id=item_id,
-                        db_name=self.db_name
-                    )
-                    QMessageBox.information(
-                        self, "Success",
-                        f"Payment processed and item #{item_id} returned!"
+                    self.run_task(
+                        "payment", services.process_lost_item_payment, self.current_user["id"],
+                        item_id=item_id, db_name=self.db_name, error_message="Payment failed",
+                        on_success=lambda _: QMessageBox.information(
+                            self, "Success", f"Payment processed and item #{item_id} returned!"),
                     )
                 else:
                     QMessageBox.information(self, "Not Paid", "You can pay the fine later from the fines/payment option.")
@@ -834,59 +961,61 @@ class LibraryApp(QMainWindow):
                 )
             else:
                 QMessageBox.information(self, "Success", "Item returned successfully!")
+            if "on_hold_for" in result:
+                QMessageBox.information(self, "On Hold",
+                                        "Another patron is waiting for this item, please leave it at the desk.")
 
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Return failed: {str(e)}")
-
-        finally:
+        def failed(e):
             dialog.close()
+            QMessageBox.warning(self, "Error", f"Return failed: {str(e)}")
             self.show_available_items()
 
+        self.tasks.submit("return", services.return_item, self.current_user["id"], item_id, db_name=self.db_name,
+                          on_success=returned, on_error=failed)
+
 
     
     def show_patron_history(self):
         """Show borrowing history - all patrons for staff, current patron for regular users"""
-        
         if self.is_staff:
-        # Staff sees complete history with patron names
-            history = services.get_all_borrowing_history(self.is_staff, db_name=self.db_name)
-                    
-            # Update table headers for staff view
-            headers = ["Patron", "Title", "Creator", "Type", "Checkout", "Return", "Status"]
-            self.display_history(history, headers)
+            # Staff sees complete history with patron names
+            fetch_page = lambda cursor: services.get_all_borrowing_history_page(
+                self.is_staff, page_size=PAGE_SIZE, cursor=cursor, db_name=self.db_name)
         else:
             # Regular user sees only their own history
-            history = services.get_borrowing_history(self.current_user['id'], db_name=self.db_name)
-            headers = ["Title", "Creator", "Type", "Checkout", "Return"]
-            self.display_history(history, headers)
+            fetch_page = lambda cursor: services.get_borrowing_history_page(
+                self.current_user['id'], page_size=PAGE_SIZE, cursor=cursor, db_name=self.db_name)
+        self.show_model(self.history_columns(), fetch_page=fetch_page,
+                        error_message="Failed to load history")
 
     
     def show_upcoming_events(self):
-        try:
-            events = services.get_upcoming_events(
-                include_past=self.is_staff, 
-                db_name=self.db_name
-            )
-            self.display_events(events)
-        except Exception as e: 
-            QMessageBox.warning(self, "Error", f"Failed to load events: {str(e)}")
+        self.show_model(
+            self.event_columns(),
+            fetch_page=lambda cursor: services.get_upcoming_events_page(
+                include_past=self.is_staff, page_size=PAGE_SIZE, cursor=cursor, db_name=self.db_name),
+            **self.event_view_options(),
+            error_message="Failed to load events",
+        )
     
     # main_window.py  
     def show_my_registrations(self):
         """Show current patron's event registrations"""
+        self.paged_view = None
+        # Get all registrations for current patron
+        self.run_task(
+            "results", services.get_registrations_for_patron, self.current_user["id"], db_name=self.db_name,
+            on_success=self.display_registrations, error_message="Failed to load registrations",
+        )
+
+    def display_registrations(self, registrations):
         try:
+            self.use_table_widget()
             self.results_table.setRowCount(0)
-            
-            # Get all registrations for current patron
-            registrations = services.get_registrations_for_patron(
-                self.current_user["id"], 
-                db_name=self.db_name
-            )
-            
             self.results_table.setRowCount(len(registrations))
-            self.results_table.setColumnCount(5)
+            self.results_table.setColumnCount(6)
             self.results_table.setHorizontalHeaderLabels(
-                ["Event", "Date", "Room", "Audience", "Cancel"]
+                ["Event", "Date", "Room", "Audience", "Status", "Cancel"]
             )
             
             today = datetime.today().date()  # Get today's date
@@ -899,6 +1028,10 @@ class LibraryApp(QMainWindow):
                 self.results_table.setItem(row, 1, QTableWidgetItem(reg['date']))
                 self.results_table.setItem(row, 2, QTableWidgetItem(reg['roomNum']))
                 self.results_table.setItem(row, 3, QTableWidgetItem(reg.get('audience', 'All')))
+                status = "Registered"
+                if reg['status'] == 'waitlisted':
+                    status = f"Waitlist, number {reg['waitlist_position']}"
+                self.results_table.setItem(row, 4, QTableWidgetItem(status))
                 
                 # Convert event date to datetime object for comparison
                 event_date = datetime.strptime(reg['date'], "%Y-%m-%d").date()
@@ -913,7 +1046,7 @@ class LibraryApp(QMainWindow):
                         QPushButton:hover {background-color: #de6a6a;}
                         QPushButton:pressed {background-color: #633e3e;}
                     """)
-                    self.results_table.setCellWidget(row, 4, cancel_btn)
+                    self.results_table.setCellWidget(row, 5, cancel_btn)
             
             # Adjust column widths -- RESPONSIVE 
             self.results_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
@@ -922,11 +1055,61 @@ class LibraryApp(QMainWindow):
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to load registrations: {str(e)}")
 
+    def show_my_holds(self):
+        """Show current patron's holds: place in line, or pick-up deadline once ready"""
+        self.paged_view = None
+        self.run_task(
+            "results", services.get_patron_holds, self.current_user["id"], db_name=self.db_name,
+            on_success=self.display_holds, error_message="Failed to load holds",
+        )
+
+    def display_holds(self, holds):
+        self.use_table_widget()
+        self.results_table.setRowCount(0)
+        self.results_table.setRowCount(len(holds))
+        self.results_table.setColumnCount(5)
+        self.results_table.setHorizontalHeaderLabels(["Title", "Creator", "Type", "Status", "Cancel"])
+
+        for row, hold in enumerate(holds):
+            if hold['status'] == 'ready':
+                status = f"Ready, pick up by {hold['expires']}"
+            else:
+                status = f"Waiting, number {hold['position']} in line"
+            self.results_table.setItem(row, 0, QTableWidgetItem(hold['title']))
+            self.results_table.setItem(row, 1, QTableWidgetItem(hold['creator']))
+            self.results_table.setItem(row, 2, QTableWidgetItem(hold['type']))
+            self.results_table.setItem(row, 3, QTableWidgetItem(status))
+
+            cancel_btn = QPushButton("Cancel")
+            cancel_btn.clicked.connect(lambda _, hid=hold['hold_id']: self.cancel_hold(hid))
+            self.results_table.setCellWidget(row, 4, cancel_btn)
+
+        self.results_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.results_table.resizeColumnsToContents()
+
+    def cancel_hold(self, hold_id):
+        if QMessageBox.question(
+            self, "Cancel Hold", "Are you sure you want to cancel this hold?",
+            QMessageBox.Yes | QMessageBox.No
+        ) != QMessageBox.Yes:
+            return
+
+        self.run_task("cancel_hold", services.cancel_hold, hold_id, self.current_user["id"], db_name=self.db_name,
+                      on_success=lambda _: self.show_my_holds(), error_message="Failed to cancel hold")
+
     def show_pay_fines_dialog(self):
         """Show fines payment dialog"""
-        services.check_overdue_items(db_name=self.db_name)
-        fines = services.get_patron_fines(self.current_user['id'], db_name=self.db_name)
-        
+        def load_fines(patron_id):
+            # only sweeps if the scheduled sweep is overdue, and then only the
+            # loans that crossed the cutoff since the last one
+            services.run_overdue_sweep(min_interval=OVERDUE_SWEEP_INTERVAL, db_name=self.db_name)
+            return services.get_patron_balance(patron_id, db_name=self.db_name)
+
+        self.run_task("fines", load_fines, self.current_user['id'],
+                      on_success=self.open_fines_dialog, error_message="Failed to load fines")
+
+    def open_fines_dialog(self, balance):
+        fines = balance['lost_fines']
         if fines <= 0:
             QMessageBox.information(self, "No Fines", "You have no outstanding fines!")
             return
@@ -936,6 +1119,7 @@ class LibraryApp(QMainWindow):
         layout = QVBoxLayout()
         
         layout.addWidget(QLabel(f"Total Fines: ${fines:.2f}"))
+        layout.addWidget(QLabel(f"Lost items: {balance['lost_items']}"))
         
         pay_btn = QPushButton("Confirm Payment")
         pay_btn.clicked.connect(lambda: self.process_payment(fines, dialog))
@@ -948,13 +1132,7 @@ class LibraryApp(QMainWindow):
     # After paying payment, item is available again 
     def process_payment(self, amount, dialog=None, item_id=None):
         
-        try:
-            updated = services.process_lost_item_payment(
-                self.current_user["id"],
-                item_id=item_id,
-                db_name=self.db_name
-            )
-            
+        def paid(updated):
             message = (f"Payment of ${amount:.2f} processed!\n"
                     f"Item #{item_id} is now available." if item_id 
                     else "All fines paid!")
@@ -963,9 +1141,9 @@ class LibraryApp(QMainWindow):
             if dialog:
                 dialog.close()
             self.show_available_items()
-            
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Payment failed: {str(e)}")
+
+        self.run_task("payment", services.process_lost_item_payment, self.current_user["id"],
+                      item_id=item_id, db_name=self.db_name, on_success=paid, error_message="Payment failed")
 
     # Prompt for Patrons to donate items to library
     def show_donate_dialog(self):
@@ -1003,13 +1181,13 @@ class LibraryApp(QMainWindow):
             QMessageBox.warning(dialog, "Error", "Title is required")
             return
             
-        try:
-            # Add with $0 replacement cost for donations
-            services.add_item(title, creator, item_type, 0.00, db_name=self.db_name)
+        def donated(_):
             QMessageBox.information(dialog, "Thank You", "Item donated successfully!")
             dialog.close()
-        except Exception as e:
-            QMessageBox.warning(dialog, "Error", f"Donation failed: {str(e)}")
+
+        # Add with $0 replacement cost for donations
+        self.run_task("add_item", services.add_item, title, creator, item_type, 0.00, db_name=self.db_name,
+                      on_success=donated, error_message="Donation failed", error_parent=dialog)
 
     # Submit acquisition request
     def show_request_dialog(self):
@@ -1048,18 +1226,19 @@ class LibraryApp(QMainWindow):
             QMessageBox.warning(dialog, "Error", "Title and Type are required")
             return
         
-        try:
-            services.submit_acquisition_request(
-                self.current_user['id'],
-                item_type,
-                creator,
-                title,
-                db_name=self.db_name
-            )
+        def submitted(_):
             QMessageBox.information(dialog, "Success", "Request submitted successfully!")
             dialog.close()
-        except Exception as e:
-            QMessageBox.warning(dialog, "Error", f"Failed to submit request: {str(e)}")
+
+        self.run_task(
+            "acquisition_request", services.submit_acquisition_request,
+            self.current_user['id'],
+            item_type,
+            creator,
+            title,
+            db_name=self.db_name,
+            on_success=submitted, error_message="Failed to submit request", error_parent=dialog,
+        )
 
     # Ask a Librarian for help
     def show_staff_help_dialog(self):
@@ -1103,37 +1282,42 @@ class LibraryApp(QMainWindow):
         
         dialog.setLayout(layout)
         dialog.exec_()
+        self.tasks.cancel("help")
 
     def populate_help_table(self, item_type, table_widget):
         """Populate table with items of selected type, used for staff help prompt"""
-        try:
-            items = services.get_items_by_type_for_help(item_type, db_name=self.db_name)
-
-            table_widget.setRowCount(len(items))
-            table_widget.setColumnCount(4)
-            table_widget.setHorizontalHeaderLabels(["ID", "Title", "Creator", "Status"])
+        self.run_task(
+            "help", services.get_items_by_type_for_help, item_type, db_name=self.db_name,
+            on_success=lambda items: self.fill_help_table(items, table_widget),
+            error_message="Failed to load items",
+        )
 
-            for row, item in enumerate(items):
-                table_widget.setItem(row, 0, QTableWidgetItem(str(item["item_id"])))
-                table_widget.setItem(row, 1, QTableWidgetItem(item["title"]))
-                table_widget.setItem(row, 2, QTableWidgetItem(item["creator"]))
+    def fill_help_table(self, items, table_widget):
+        table_widget.setRowCount(len(items))
+        table_widget.setColumnCount(4)
+        table_widget.setHorizontalHeaderLabels(["ID", "Title", "Creator", "Status"])
 
-                status = item["display_status"]
-                status_item = QTableWidgetItem(status)
+        for row, item in enumerate(items):
+            table_widget.setItem(row, 0, QTableWidgetItem(str(item["item_id"])))
+            table_widget.setItem(row, 1, QTableWidgetItem(item["title"]))
+            table_widget.setItem(row, 2, QTableWidgetItem(item["creator"]))
 
-                if status == "available":
-                    status_item.setBackground(QColor(144, 238, 144))
-                    status_item.setForeground(QColor(0, 100, 0))
-                elif status == "checked_out":
-                    status_item.setBackground(QColor(255, 165, 0))
-                    status_item.setForeground(QColor(153, 76, 0))
+            status = item["display_status"]
+            status_item = QTableWidgetItem(status)
 
-                table_widget.setItem(row, 3, status_item)
+            if status == "available":
+                status_item.setBackground(QColor(144, 238, 144))
+                status_item.setForeground(QColor(0, 100, 0))
+            elif status == "checked_out":
+                status_item.setBackground(QColor(255, 165, 0))
+                status_item.setForeground(QColor(153, 76, 0))
+            elif status == "on_hold":
+                status_item.setBackground(QColor(173, 216, 230))
+                status_item.setForeground(QColor(0, 51, 153))
 
-            table_widget.resizeColumnsToContents()
+            table_widget.setItem(row, 3, status_item)
 
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to load items: {str(e)}")
+        table_widget.resizeColumnsToContents()
 
         
     # ----------------------
@@ -1191,20 +1375,42 @@ class LibraryApp(QMainWindow):
             QMessageBox.warning(self, "Error", "Cost must be positive")
             return
             
-        try:
-            item_id = services.add_item(title, creator, item_type, cost, db_name=self.db_name)
+        def added(item_id):
             QMessageBox.information(self, "Success", f"Item added successfully! ID: {item_id}")
             dialog.close()
             self.show_available_items()  # Refresh the list
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to add item: {str(e)}")
+
+        self.run_task("add_item", services.add_item, title, creator, item_type, cost, db_name=self.db_name,
+                      on_success=added, error_message="Failed to add item")
     
+    def import_catalog_file(self):
+        """Bulk-load a CSV / JSONL / MARC-lite file of new items"""
+        if not self.session.can("import_catalog"):
+            QMessageBox.warning(self, "Access Denied", "Volunteers cannot import catalog records.")
+            return
+
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Catalog", "", "Catalog files (*.csv *.jsonl *.ndjson *.mrk);;All files (*)")
+        if not path:
+            return
+
+        def imported(report):
+            text = f"Imported {report['imported']} of {report['read']} records in {report['elapsed']:.1f} s."
+            if report["skipped"]:
+                errors = "\n".join(f"line {line}: {message}" for line, message in report["errors"][:10])
+                text += f"\n\n{report['skipped']} invalid records were skipped:\n{errors}"
+            QMessageBox.information(self, "Import Catalog", text)
+            self.show_available_items()
+
+        self.run_task("import_catalog", catalog_import.import_catalog, path, db_name=self.db_name,
+                      on_success=imported, error_message="Import failed")
+
     def show_requests(self):
         if not self.is_staff:
             QMessageBox.warning(self, "Access Denied", "Only staff can manage requests")
             return
         
-        if services.is_volunteer(self.current_user['id'], db_name=self.db_name):
+        if not self.session.can("manage_requests"):
             QMessageBox.warning(
                 self, 
                 "Access Denied", 
@@ -1213,100 +1419,88 @@ class LibraryApp(QMainWindow):
             )
             return
         
-        try:
-            requests = services.show_acquisition_requests(db_name=self.db_name)
+        self.show_paged(
+            ["ID", "Patron", "Title", "Creator", "Type", "Status", "Actions"],
+            lambda cursor: services.show_acquisition_requests_page(
+                page_size=PAGE_SIZE, cursor=cursor, db_name=self.db_name),
+            self.fill_request_row,
+            error_message="Failed to load request",
+        )
+
+    def fill_request_row(self, table, row, req):
+        creator = req['creator'] if 'creator' in req.keys() and req['creator'] else 'N/A'
+        
+        # Column order matches headers:
+        table.setItem(row, 0, QTableWidgetItem(str(req['request_id'])))
+        table.setItem(row, 1, QTableWidgetItem(f"{req['first_name']} {req['last_name']}"))
+        table.setItem(row, 2, QTableWidgetItem(req['title']))
+        table.setItem(row, 3, QTableWidgetItem(creator))
+        table.setItem(row, 4, QTableWidgetItem(req['item_type']))
+        
+        # Status with color coding :D
+        status_item = QTableWidgetItem(req['request_status'])
+        if req['request_status'] == 'approved':
+            status_item.setBackground(QColor(144, 238, 144))
+            status_item.setForeground(QColor(0, 100, 0))
+        elif req['request_status'] == 'denied':
+            status_item.setBackground(QColor(255, 111, 111))
+            status_item.setForeground(QColor(55, 0, 0))
+        table.setItem(row, 5, status_item)
+        
+        # Action buttons for pending requests
+        if req['request_status'] == 'Pending':
+            btn_layout = QHBoxLayout()
+            btn_widget = QWidget()
+            
+            approve_btn = QPushButton("✓")
+            approve_btn.setStyleSheet("""
+                QPushButton {
+                    background-color: #00BC00;
+                    color: white;
+                    border-radius: 4px;
+                    min-width: 30px;
+                    max-width: 30px;
+                }
+            """)
+            approve_btn.clicked.connect(lambda _, r=req['request_id']: self.update_request_status(r, 'approved'))
             
-            self.staff_results_table.clearContents()
-            self.staff_results_table.setRowCount(len(requests))
-            self.staff_results_table.setColumnCount(7)
-            # Reordered headers
-            headers = ["ID", "Patron", "Title", "Creator", "Type", "Status", "Actions"]
-            self.staff_results_table.setHorizontalHeaderLabels(headers)
+            deny_btn = QPushButton("✗")
+            deny_btn.setStyleSheet("""
+                QPushButton {
+                    background-color: #7C2323;
+                    color: white;
+                    border-radius: 4px;
+                    min-width: 30px;
+                    max-width: 30px;
+                }
+            """)
+            deny_btn.clicked.connect(lambda _, r=req['request_id']: self.update_request_status(r, 'denied'))
             
-            for row, req in enumerate(requests):
-                creator = req['creator'] if 'creator' in req.keys() and req['creator'] else 'N/A'
-                
-                # Column order matches headers:
-                self.staff_results_table.setItem(row, 0, QTableWidgetItem(str(req['request_id'])))
-                self.staff_results_table.setItem(row, 1, QTableWidgetItem(f"{req['first_name']} {req['last_name']}"))
-                self.staff_results_table.setItem(row, 2, QTableWidgetItem(req['title']))
-                self.staff_results_table.setItem(row, 3, QTableWidgetItem(creator))
-                self.staff_results_table.setItem(row, 4, QTableWidgetItem(req['item_type']))
-                
-                # Status with color coding :D
-                status_item = QTableWidgetItem(req['request_status'])
-                if req['request_status'] == 'approved':
-                    status_item.setBackground(QColor(144, 238, 144))
-                    status_item.setForeground(QColor(0, 100, 0))
-                elif req['request_status'] == 'denied':
-                    status_item.setBackground(QColor(255, 111, 111))
-                    status_item.setForeground(QColor(55, 0, 0))
-                self.staff_results_table.setItem(row, 5, status_item)
-                
-                # Action buttons for pending requests
-                if req['request_status'] == 'Pending':
-                    btn_layout = QHBoxLayout()
-                    btn_widget = QWidget()
-                    
-                    approve_btn = QPushButton("✓")
-                    approve_btn.setStyleSheet("""
-                        QPushButton {
-                            background-color: #00BC00;
-                            color: white;
-                            border-radius: 4px;
-                            min-width: 30px;
-                            max-width: 30px;
-                        }
-                    """)
-                    approve_btn.clicked.connect(lambda _, r=req['request_id']: self.update_request_status(r, 'approved'))
-                    
-                    deny_btn = QPushButton("✗")
-                    deny_btn.setStyleSheet("""
-                        QPushButton {
-                            background-color: #7C2323;
-                            color: white;
-                            border-radius: 4px;
-                            min-width: 30px;
-                            max-width: 30px;
-                        }
-                    """)
-                    deny_btn.clicked.connect(lambda _, r=req['request_id']: self.update_request_status(r, 'denied'))
-                    
-                    btn_layout.addWidget(approve_btn)
-                    btn_layout.addWidget(deny_btn)
-                    btn_layout.setContentsMargins(0, 0, 0, 0)
-                    btn_widget.setLayout(btn_layout)
-                    
-                    self.staff_results_table.setCellWidget(row, 6, btn_widget)
-                else:
-                    self.staff_results_table.setItem(row, 6, QTableWidgetItem(""))
-        except Exception as e: 
-            QMessageBox.warning(self, "Error", f"Failed to load request: {str(e)}")
-                    
-        finally:
-            self.staff_results_table.resizeColumnsToContents()
+            btn_layout.addWidget(approve_btn)
+            btn_layout.addWidget(deny_btn)
+            btn_layout.setContentsMargins(0, 0, 0, 0)
+            btn_widget.setLayout(btn_layout)
+            
+            table.setCellWidget(row, 6, btn_widget)
+        else:
+            table.setItem(row, 6, QTableWidgetItem(""))
 
 
     def approve_request(self, request_id):
-        try:
-            if not self.is_staff:
-                raise ValueError("Only staff can approve requests")
-            
-            services.approve_acquisition_request(request_id, self.current_user['id'], db_name=self.db_name)
+        if not self.is_staff:
+            QMessageBox.warning(self, "Error", "Approval failed: Only staff can approve requests")
+            return
+
+        def approved(_):
             QMessageBox.information(self, "Approved", "Request approved successfully!")
             self.show_requests()  # Refresh view
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Approval failed: {str(e)}")
+
+        self.run_task("request_status", services.approve_acquisition_request, request_id, self.current_user['id'],
+                      db_name=self.db_name, on_success=approved, error_message="Approval failed")
 
     def update_request_status(self, request_id, new_status):
         """Updates status of Acquisition Requests"""
-        try:
-            result = services.update_acquisition_request_status(
-                request_id,
-                new_status,
-                db_name=self.db_name
-            )
-
+        def updated(result):
             if not result["updated"]:
                 if result["reason"] == "not_found":
                     QMessageBox.warning(self, "Error", "Request not found")
@@ -1317,8 +1511,13 @@ class LibraryApp(QMainWindow):
             QMessageBox.information(self, "Success", f"Request {new_status} successfully!")
             self.show_requests()
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to update request: {str(e)}")
+        self.run_task(
+            "request_status", services.update_acquisition_request_status,
+            request_id,
+            new_status,
+            db_name=self.db_name,
+            on_success=updated, error_message="Failed to update request",
+        )
 
 
     # Volunteers are not allowed to create an event, only regular staff are
@@ -1326,7 +1525,7 @@ class LibraryApp(QMainWindow):
         """Event creation Prompt"""
 
         # Handle volunteers - not allowed to make an event
-        if services.is_volunteer(self.current_user['id'], db_name=self.db_name):
+        if not self.session.can("create_events"):
             QMessageBox.warning(
                 self, 
                 "Access Denied",
@@ -1346,46 +1545,88 @@ class LibraryApp(QMainWindow):
         date_input.setDate(QDate.currentDate())
         date_input.setMinimumDate(QDate.currentDate())
         date_input.setCalendarPopup(True)
-        room_input = QLineEdit(placeholderText="Room Number")
+        start_input = QTimeEdit(QTime(10, 0))
+        end_input = QTimeEdit(QTime(12, 0))
+        for time_input in (start_input, end_input):
+            time_input.setDisplayFormat("HH:mm")
+        # free text, or pick one of the rooms free at that time
+        room_input = QComboBox()
+        room_input.setEditable(True)
+        room_input.lineEdit().setPlaceholderText("Room Number")
+        free_rooms_btn = QPushButton("Find Free Rooms")
         audience_input = QLineEdit(placeholderText="Target audience")
+        capacity_input = QSpinBox()
+        capacity_input.setRange(0, 10000)
+        capacity_input.setSpecialValueText("No limit")  # shown for 0
+
+        slot = lambda: (date_input.date().toString('yyyy-MM-dd'),
+                        start_input.time().toString('HH:mm'), end_input.time().toString('HH:mm'))
+
+        def show_free_rooms(rooms):
+            room_input.clear()
+            for row, room in enumerate(rooms):
+                room_input.addItem(room['roomNum'])
+                if room['seats']:
+                    room_input.setItemData(row, f"{room['seats']} seats", Qt.ToolTipRole)
+            if not rooms:
+                QMessageBox.information(dialog, "No Free Rooms", "Every known room is booked at that time.")
+
+        free_rooms_btn.clicked.connect(lambda: self.run_task(
+            "free_rooms", services.get_free_rooms, *slot(), capacity_input.value() or None, db_name=self.db_name,
+            on_success=show_free_rooms, error_parent=dialog))
         
         create_btn = QPushButton("Create Event")
         create_btn.clicked.connect(lambda: self.create_new_event(
             name_input.text(),
-            date_input.date().toString('yyyy-MM-dd'),
-            room_input.text(),
+            slot()[0],
+            room_input.currentText().strip(),
             audience_input.text(),
-            dialog
+            dialog,
+            capacity_input.value() or None,
+            *slot()[1:]
         ))
         
         layout.addWidget(QLabel("Event Name:"))
         layout.addWidget(name_input)
         layout.addWidget(QLabel("Date:"))
         layout.addWidget(date_input)
+        times_row = QHBoxLayout()
+        times_row.addWidget(QLabel("From:"))
+        times_row.addWidget(start_input)
+        times_row.addWidget(QLabel("To:"))
+        times_row.addWidget(end_input)
+        layout.addLayout(times_row)
         layout.addWidget(QLabel("Room Number:"))
-        layout.addWidget(room_input)
+        room_row = QHBoxLayout()
+        room_row.addWidget(room_input, 1)
+        room_row.addWidget(free_rooms_btn)
+        layout.addLayout(room_row)
         layout.addWidget(QLabel("Audience:"))
         layout.addWidget(audience_input)
+        layout.addWidget(QLabel("Seats:"))
+        layout.addWidget(capacity_input)
         layout.addWidget(create_btn)
         
         dialog.setLayout(layout)
         dialog.exec_()
     
-    def create_new_event(self, name, date, room, audience, dialog):
+    def create_new_event(self, name, date, room, audience, dialog, capacity=None, start_time="00:00",
+                         end_time="24:00"):
         """Creating Event functionality (Used for Create event prompt)"""
         if not all([name, date, room]):
             QMessageBox.warning(self, "Error", "All fields are required")
             return
         
-        try:
-            event_id = services.create_event(self.current_user['id'], name, date, room, audience, db_name=self.db_name)
+        def created(event_id):
             QMessageBox.information(self, "Success", f"Event created successfully! ID: {event_id}")
             dialog.close()
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to create event: {str(e)}")
+
+        self.run_task("create_event", services.create_event, self.current_user['id'], name, date, room, audience,
+                      capacity, start_time, end_time, db_name=self.db_name, on_success=created,
+                      error_message="Failed to create event", error_parent=dialog)
 
     def show_add_staff_record_dialog(self):
-        if not services.is_manager(self.current_user["id"], db_name=self.db_name):
+        if not self.session.can("add_staff_records"):
             QMessageBox.warning(self, "Access Denied",
                                 "You cannot add staff records.\nOnly managers have this privilege.")
             return
@@ -1400,14 +1641,16 @@ class LibraryApp(QMainWindow):
         self.staff_combo = QComboBox()
 
         # populate with staff 
-        try:
-            staff_members = services.get_all_staff_members(db_name=self.db_name)
+        def fill_staff(staff_members):
             for staff in staff_members:
                 self.staff_combo.addItem(f"{staff['first_name']} {staff['last_name']}", staff["id"])
-        except Exception as e:
+
+        def staff_failed(e):
             QMessageBox.warning(self, "Error", f"Failed to load staff list: {str(e)}")
             dialog.close()
-            return
+
+        self.tasks.submit("staff_list", services.get_all_staff_members, db_name=self.db_name,
+                          on_success=fill_staff, on_error=staff_failed)
 
         # Record type
         type_label = QLabel("Record Type:")
@@ -1440,6 +1683,7 @@ class LibraryApp(QMainWindow):
         
         dialog.setLayout(layout)
         dialog.exec_()
+        self.tasks.cancel("staff_list")
 
     def process_staff_record(self, dialog):
         """Updating Staff Record Table functionality (Used for Add staff record prompt)"""
@@ -1451,130 +1695,423 @@ class LibraryApp(QMainWindow):
             QMessageBox.warning(dialog, "Error", "Please enter record details")
             return
         
-        try:
-            services.add_staff_record(
-                staff_id=staff_id,
-                record_type=record_type,
-                details=details,
-                db_name=self.db_name
-            )
+        def added(_):
             QMessageBox.information(dialog, "Success", "Staff record added successfully!")
             dialog.close()
-        except Exception as e:
-            QMessageBox.critical(dialog, "Error", f"Failed to add record: {str(e)}")
+
+        self.run_task(
+            "staff_record", services.add_staff_record,
+            staff_id=staff_id,
+            record_type=record_type,
+            details=details,
+            db_name=self.db_name,
+            on_success=added, error_message="Failed to add record", error_parent=dialog,
+        )
     
+    def show_performance_dialog(self):
+        """Service call latencies and slow queries recorded by this terminal"""
+        metrics = instrumentation.get_metrics()
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Performance")
+        dialog.resize(900, 600)
+        layout = QVBoxLayout()
+
+        pool = get_pool_stats(self.db_name)
+        caches = get_cache_stats()
+        cache_hits = sum(c["hits"] for c in caches.values())
+        cache_lookups = cache_hits + sum(c["misses"] for c in caches.values())
+        layout.addWidget(QLabel(
+            f"Connections: {pool['hits']} pooled / {pool['opened']} opened "
+            f"(avg open {pool['open_time_avg'] * 1000:.2f} ms)    "
+            f"Cache: {cache_hits}/{cache_lookups} hits"
+        ))
+
+        # Slowest service calls first
+        layout.addWidget(QLabel("Service calls"))
+        functions = sorted(metrics["functions"].items(), key=lambda kv: kv[1]["total_ms"], reverse=True)
+        calls = QTableWidget(len(functions), 7)
+        calls.setHorizontalHeaderLabels(["Function", "Calls", "Errors", "Avg ms", "p95 ms", "Max ms", "Rows"])
+        calls.verticalHeader().setVisible(False)
+        calls.setEditTriggers(QTableWidget.NoEditTriggers)
+        for row, (name, stats) in enumerate(functions):
+            p95 = stats["p95_ms"]
+            values = [name, stats["count"], stats["errors"], f"{stats['avg_ms']:.2f}",
+                      f"≤{p95:g}" if p95 is not None else "slow", f"{stats['max_ms']:.2f}", stats["rows"]]
+            for column, value in enumerate(values):
+                calls.setItem(row, column, QTableWidgetItem(str(value)))
+        calls.resizeColumnsToContents()
+        layout.addWidget(calls)
+
+        layout.addWidget(QLabel(f"Slow queries (≥ {instrumentation.SLOW_QUERY_MS:g} ms)"))
+        slow = list(reversed(metrics["slow_queries"]))
+        slow_table = QTableWidget(len(slow), 4)
+        slow_table.setHorizontalHeaderLabels(["Time", "ms", "SQL", "Plan"])
+        slow_table.verticalHeader().setVisible(False)
+        slow_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        for row, query in enumerate(slow):
+            values = [query["at"], f"{query['elapsed_ms']:.1f}", query["sql"], "; ".join(query["plan"])]
+            for column, value in enumerate(values):
+                slow_table.setItem(row, column, QTableWidgetItem(value))
+        slow_table.resizeColumnsToContents()
+        layout.addWidget(slow_table)
+
+        def export():
+            path, _ = QFileDialog.getSaveFileName(dialog, "Export Metrics", "metrics.json", "JSON (*.json)")
+            if path:
+                try:
+                    instrumentation.export_metrics(path)
+                except OSError as e:
+                    QMessageBox.warning(dialog, "Error", f"Export failed: {str(e)}")
+
+        btn_layout = QHBoxLayout()
+        export_btn = QPushButton("Export JSON")
+        export_btn.clicked.connect(export)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(dialog.close)
+        btn_layout.addWidget(export_btn)
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+
+        dialog.setLayout(layout)
+        dialog.exec_()
+
+    def show_analytics_dialog(self):
+        self.run_task("analytics", analytics.get_analytics_summary, db_name=self.db_name,
+                      on_success=self.display_analytics, error_message="Failed to load analytics")
+
+    def display_analytics(self, summary):
+        """Circulation overview from the analytics rollups"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Analytics")
+        dialog.resize(800, 650)
+        layout = QVBoxLayout()
+
+        def add_table(title, headers, rows):
+            layout.addWidget(QLabel(title))
+            table = QTableWidget(len(rows), len(headers))
+            table.setHorizontalHeaderLabels(headers)
+            table.verticalHeader().setVisible(False)
+            table.setEditTriggers(QTableWidget.NoEditTriggers)
+            for row, values in enumerate(rows):
+                for column, value in enumerate(values):
+                    table.setItem(row, column, QTableWidgetItem(str(value)))
+            table.resizeColumnsToContents()
+            layout.addWidget(table)
+
+        def percent(rate):
+            return f"{rate * 100:.1f}%" if rate is not None else "-"
+
+        layout.addWidget(QLabel(
+            f"{summary['start_date']} to {summary['end_date']}: {summary['checkouts']} checkouts, "
+            f"{summary['returns']} returns, {percent(summary['overdue_rate'])} returned late"
+        ))
+        add_table("By item type", ["Type", "Checkouts", "Returns", "Late", "Late %"],
+                  [(r['item_type'], r['checkouts'], r['returns'], r['late_returns'], percent(r['overdue_rate']))
+                   for r in summary['by_type']])
+        add_table("Most borrowed items", ["ID", "Title", "Creator", "Type", "Checkouts", "Last Checkout"],
+                  [(r['item_id'], r['title'], r['creator'], r['type'], r['checkouts'], r['last_checkout'])
+                   for r in summary['popular_items']])
+
+        activity = summary['patron_activity']
+        add_table("Patrons by last checkout", ["Last Checkout", "Patrons"],
+                  [(b['bucket'], b['patrons']) for b in activity['buckets']])
+        layout.addWidget(QLabel(
+            f"{activity['patrons']} patrons have borrowed: {activity['with_open_loans']} with open loans, "
+            f"{activity['with_late_returns']} with a late return"
+        ))
+
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(dialog.close)
+        layout.addWidget(close_btn)
+        dialog.setLayout(layout)
+        dialog.exec_()
+
+    def show_export_dialog(self):
+        """Stream borrowing history, events or acquisition requests to a file"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Export Data")
+        dialog.setMinimumWidth(400)
+        layout = QVBoxLayout()
+
+        datasets = {"Borrowing History": "borrowing_history", "Events": "events",
+                    "Acquisition Requests": "acquisition_requests"}
+        dataset_combo = QComboBox()
+        dataset_combo.addItems(list(datasets))
+        format_combo = QComboBox()
+        format_combo.addItems(["CSV (*.csv)", "JSON Lines (*.jsonl)", "Parquet (*.parquet)"])
+
+        all_dates = QCheckBox("All dates")
+        start_date = QDateEdit()
+        start_date.setDate(QDate.currentDate().addYears(-1))
+        start_date.setCalendarPopup(True)
+        end_date = QDateEdit()
+        end_date.setDate(QDate.currentDate())
+        end_date.setCalendarPopup(True)
+
+        def update_dates():
+            # acquisition requests carry no date
+            dated = exporters.DATASETS[datasets[dataset_combo.currentText()]]["date_column"] is not None
+            all_dates.setEnabled(dated)
+            start_date.setEnabled(dated and not all_dates.isChecked())
+            end_date.setEnabled(dated and not all_dates.isChecked())
+        dataset_combo.currentIndexChanged.connect(update_dates)
+        all_dates.toggled.connect(update_dates)
+
+        layout.addWidget(QLabel("Dataset:"))
+        layout.addWidget(dataset_combo)
+        layout.addWidget(QLabel("Format:"))
+        layout.addWidget(format_combo)
+        layout.addWidget(all_dates)
+        layout.addWidget(QLabel("From:"))
+        layout.addWidget(start_date)
+        layout.addWidget(QLabel("To:"))
+        layout.addWidget(end_date)
+
+        def export():
+            dataset = datasets[dataset_combo.currentText()]
+            file_filter = format_combo.currentText()
+            extension = file_filter[file_filter.index("*.") + 1:-1]
+            path, _ = QFileDialog.getSaveFileName(dialog, "Export Data", dataset + extension, file_filter)
+            if not path:
+                return
+            if not path.endswith(extension):
+                path += extension
+            dated = start_date.isEnabled()
+            start = start_date.date().toString("yyyy-MM-dd") if dated else None
+            end = end_date.date().toString("yyyy-MM-dd") if dated else None
+
+            def exported(report):
+                QMessageBox.information(self, "Export Data",
+                                        f"Exported {report['rows']} rows to {report['path']}")
+                dialog.close()
+
+            self.run_task("export", exporters.export, dataset, path, start_date=start, end_date=end,
+                          db_name=self.db_name, on_success=exported, error_message="Export failed",
+                          error_parent=dialog)
+
+        btn_layout = QHBoxLayout()
+        export_btn = QPushButton("Export")
+        export_btn.clicked.connect(export)
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(dialog.close)
+        btn_layout.addWidget(export_btn)
+        btn_layout.addWidget(cancel_btn)
+        layout.addLayout(btn_layout)
+
+        update_dates()
+        dialog.setLayout(layout)
+        dialog.exec_()
+
     # ----------------------
     # Display Helpers
     # ----------------------
     
+    def run_task(self, key, fn, *args, on_success=None, error_message=None, error_parent=None, **kwargs):
+        """
+        Run a service call on the task runner. Failures are shown as a warning,
+        prefixed with error_message if given (ValueErrors from services are
+        already user-facing, so by default their text is shown as is).
+        """
+        def on_error(e):
+            text = f"{error_message}: {str(e)}" if error_message else str(e)
+            QMessageBox.warning(error_parent or self, "Error", text)
+
+        return self.tasks.submit(key, fn, *args, on_success=on_success, on_error=on_error, **kwargs)
+
+    def set_loading(self, busy):
+        """Loading indicator while any background task is running"""
+        if busy:
+            self.statusBar().showMessage("Loading...")
+            QApplication.setOverrideCursor(Qt.BusyCursor)
+        else:
+            self.statusBar().clearMessage()
+            QApplication.restoreOverrideCursor()
+
+    def show_paged(self, headers, fetch_page, fill_row, error_message="Failed to load"):
+        """
+        Show a keyset-paginated list in the dashboard's QTableWidget, for lists
+        that need per-row widgets (read-only lists go through show_model).
+        Only the first page is loaded here, load_more_on_scroll() appends the
+        next one near the bottom. fetch_page(cursor) returns a services page
+        dict, fill_row(table, row, record) renders one record.
+        """
+        table = self.use_table_widget()
+        table.clearContents()
+        table.setRowCount(0)
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+
+        self.paged_view = {"table": table, "fetch_page": fetch_page, "fill_row": fill_row,
+                           "cursor": None, "done": False, "loading": False,
+                           "error_message": error_message}
+        self.load_next_page()
+
+    def load_next_page(self):
+        """Fetch the next page of the current paged list in the background and append it"""
+        view = self.paged_view
+        if not view or view["done"] or view["loading"]:
+            return
+        view["loading"] = True
+        first_page = view["cursor"] is None
+
+        def append(page):
+            view["loading"] = False
+            if self.paged_view is not view:
+                return
+            table = view["table"]
+            start = table.rowCount()
+            table.setRowCount(start + len(page["rows"]))
+            for offset, record in enumerate(page["rows"]):
+                view["fill_row"](table, start + offset, record)
+
+            view["cursor"] = page["next_cursor"]
+            view["done"] = page["next_cursor"] is None
+            if first_page:
+                table.resizeColumnsToContents()
+
+        def failed(e):
+            view["loading"] = False
+            view["done"] = True
+            QMessageBox.warning(self, "Error", f"{view['error_message']}: {str(e)}")
+
+        # "results" key: a newer list request for the dashboard table supersedes this one
+        self.tasks.submit("results", view["fetch_page"], view["cursor"], on_success=append, on_error=failed)
+
+    def load_more_on_scroll(self, value):
+        view = self.paged_view
+        if not view or view["done"]:
+            return
+        # both dashboard tables report here, only react to the one being paged
+        bar = view["table"].verticalScrollBar()
+        if bar.value() >= bar.maximum() - 5:
+            self.load_next_page()
+
+    def results_widgets(self):
+        """(QTableWidget, QTableView) pair of the current dashboard"""
+        if self.is_staff:
+            return self.staff_results_table, self.staff_results_view
+        return self.results_table, self.results_view
+
+    def reset_view(self, view):
+        """Hide a result view and drop its model (and the model's pending page load)"""
+        view.hide()
+        model = view.model()
+        if model is None:
+            return
+        model.cancel_fetch()
+        for column in range(model.columnCount()):
+            view.setItemDelegateForColumn(column, None)
+        view.setModel(None)
+        model.deleteLater()
+
+    def use_table_widget(self):
+        """Switch the dashboard to its QTableWidget and return it"""
+        table, view = self.results_widgets()
+        self.reset_view(view)
+        table.show()
+        return table
+
+    def show_model(self, columns, records=(), fetch_page=None, status_fn=None, key_fn=None,
+                   delegates=None, error_message="Failed to load"):
+        """
+        Show records in the dashboard's QTableView through a RecordTableModel.
+        The view only paints visible rows, so long lists stay cheap. With
+        fetch_page set the model loads page by page as the view scrolls,
+        otherwise `records` is shown as is. delegates maps column -> delegate.
+        """
+        table, view = self.results_widgets()
+        self.paged_view = None
+        self.reset_view(view)
+        table.hide()
+
+        model = RecordTableModel(columns, records, fetch_page=fetch_page, runner=self.tasks,
+                                 status_fn=status_fn, key_fn=key_fn, parent=view)
+        model.first_page_loaded.connect(view.resizeColumnsToContents)
+        model.load_failed.connect(
+            lambda e: QMessageBox.warning(self, "Error", f"{error_message}: {str(e)}"))
+        view.setModel(model)
+        for column, delegate in (delegates or {}).items():
+            view.setItemDelegateForColumn(column, delegate)
+        view.show()
+
+        if fetch_page is None:
+            view.resizeColumnsToContents()
+        else:
+            model.fetchMore(QModelIndex())
+        return model
+
     def display_items(self, items):
         """Display items in a table format"""
-        table = self.staff_results_table if self.is_staff else self.results_table
-        
-        table.setRowCount(len(items))
-        table.setColumnCount(4)
-        table.setHorizontalHeaderLabels(["ID", "Title", "Type", "Status"])
-        
-        for row, item in enumerate(items):
-            # Get status
-            status = item['display_status'] if 'display_status' in item.keys() else item['status']
-            
-            table.setItem(row, 0, QTableWidgetItem(str(item['item_id'])))
-            table.setItem(row, 1, QTableWidgetItem(item['title']))
-            table.setItem(row, 2, QTableWidgetItem(item['type']))
-            table.setItem(row, 3, QTableWidgetItem(status))
+        self.show_model(
+            [
+                ("ID", lambda item: str(item['item_id'])),
+                ("Title", lambda item: item['title']),
+                ("Type", lambda item: item['type']),
+                ("Status", lambda item: item['display_status'] if 'display_status' in item.keys() else item['status']),
+            ],
+            items,
+        )
 
-    def display_events(self, events):
-        table = self.staff_results_table if self.is_staff else self.results_table
-        table.setRowCount(len(events))
-        
+    def event_columns(self):
+        when = lambda e: e["date"] if (e["start_time"], e["end_time"]) == ("00:00", "24:00") \
+            else f"{e['date']} {e['start_time']}-{e['end_time']}"
+        seats = lambda e: f"{e['seats_taken']} / {e['capacity']}" if e["capacity"] else str(e["seats_taken"])
         if self.is_staff:
-            table.setColumnCount(6)
-            headers = ["ID", "Event", "Date", "Room", "Audience", "Status"]
-        else:
-            table.setColumnCount(5)
-            headers = ["Event", "Date", "Room", "Audience", "Register"]
-        
-        table.setHorizontalHeaderLabels(headers)
-        
-        for row, event in enumerate(events):
-            # Similar case, allow the usage of .get() py function
-            e = event if isinstance(event, dict) else dict(event)
-            
-            if self.is_staff:
-                # Staff view
-                table.setItem(row, 0, QTableWidgetItem(str(e["event_id"])))
-                table.setItem(row, 1, QTableWidgetItem(e["eventName"]))
-                table.setItem(row, 2, QTableWidgetItem(e["date"]))
-                table.setItem(row, 3, QTableWidgetItem(e["roomNum"]))
-                table.setItem(row, 4, QTableWidgetItem(e.get("audience", "All")))
-                
-                status = e.get('event_status', 'Upcoming')
-                status_item = QTableWidgetItem(status)
-                if status == 'No Longer Available':
-                    status_item.setBackground(QColor(150, 150, 150))
-                    status_item.setForeground(QColor(250, 250, 250))
-                else:
-                    status_item.setBackground(QColor(200, 255, 200))
-                    status_item.setForeground(QColor(0, 100, 0))
-                table.setItem(row, 5, status_item)
-            else: 
-                # Patron view
-                table.setItem(row, 0, QTableWidgetItem(e["eventName"]))
-                table.setItem(row, 1, QTableWidgetItem(e["date"]))
-                table.setItem(row, 2, QTableWidgetItem(e["roomNum"]))
-                table.setItem(row, 3, QTableWidgetItem(e.get("audience", "All")))
-                
-                # Add register button to register for events
-                btn = QPushButton("Register")
-                eid = e["event_id"]
-                btn.clicked.connect(lambda _, eid=eid: self.register_for_event(eid))
-                btn.setStyleSheet("""
-                    QPushButton {background-color: #9ac953; color: #222420;}
-                    QPushButton:hover {background-color: #aad46c;}
-                    QPushButton:pressed {background-color: #64734e;}
-                """)
-                table.setCellWidget(row, 4, btn)
-        
-        table.resizeColumnsToContents()
+            return [
+                ("ID", lambda e: str(e["event_id"])),
+                ("Event", lambda e: e["eventName"]),
+                ("Date", when),
+                ("Room", lambda e: e["roomNum"]),
+                ("Audience", lambda e: e["audience"] or "All"),
+                ("Seats", seats),
+                ("Status", lambda e: e["event_status"]),
+            ]
+        return [
+            ("Event", lambda e: e["eventName"]),
+            ("Date", when),
+            ("Room", lambda e: e["roomNum"]),
+            ("Audience", lambda e: e["audience"] or "All"),
+            ("Seats", lambda e: "Full, waitlist open" if e["capacity"] and e["seats_taken"] >= e["capacity"]
+                                else seats(e)),
+            ("Register", lambda e: ""),  # painted by register_delegate
+        ]
 
-    def display_history(self, history, headers=None):
-        """Shows Loan/Return Item history in a table format"""
-        table = self.staff_results_table if self.is_staff else self.results_table
-        table.clearContents() 
-        table.setRowCount(0)
+    def event_view_options(self):
+        """Status coloring for staff, a Register button for patrons"""
+        if self.is_staff:
+            return {"status_fn": lambda e: e["event_status"],
+                    "delegates": {6: self.event_status_delegate}}
+        return {"key_fn": lambda e: e["event_id"],
+                "delegates": {5: self.register_delegate}}
 
-        if not headers:
-            headers = ["Patron", "Title", "Creator", "Type", "Checkout Date", "Return Date", "Status"]
-        
-        table.setRowCount(len(history))
-        table.setColumnCount(len(headers))
-        table.setHorizontalHeaderLabels(headers)
-        
-        for row, record in enumerate(history):
+    def display_events(self, events):
+        self.show_model(self.event_columns(), events, **self.event_view_options())
+
+    def history_columns(self):
+        return_date = lambda record: record['returnDate'] or 'Not Returned'
+        if self.is_staff:
             # Staff view has additional columns
-            if self.is_staff:
-                return_date = record['returnDate'] if 'returnDate' in record.keys() and record['returnDate'] else 'Not Returned'
-                status = "Active" if return_date == 'Not Returned' else "Returned/Paid"
-                
-                table.setItem(row, 0, QTableWidgetItem(record['patron_name']))
-                table.setItem(row, 1, QTableWidgetItem(record['title']))
-                table.setItem(row, 2, QTableWidgetItem(record['creator']))
-                table.setItem(row, 3, QTableWidgetItem(record['type']))
-                table.setItem(row, 4, QTableWidgetItem(record['checkoutDate']))
-                table.setItem(row, 5, QTableWidgetItem(str(return_date)))
-                table.setItem(row, 6, QTableWidgetItem(status))
-            else:
-                # Regular patron view
-                return_date = record['returnDate'] if 'returnDate' in record.keys() and record['returnDate'] else 'Not Returned'
-                
-                table.setItem(row, 0, QTableWidgetItem(record['title']))
-                table.setItem(row, 1, QTableWidgetItem(record['type']))
-                table.setItem(row, 2, QTableWidgetItem(record['creator']))
-                table.setItem(row, 3, QTableWidgetItem(record['checkoutDate']))
-                table.setItem(row, 4, QTableWidgetItem(str(return_date)))
+            return [
+                ("Patron", lambda record: record['patron_name']),
+                ("Title", lambda record: record['title']),
+                ("Creator", lambda record: record['creator']),
+                ("Type", lambda record: record['type']),
+                ("Checkout", lambda record: record['checkoutDate']),
+                ("Return", return_date),
+                ("Status", lambda record: "Returned/Paid" if record['returnDate'] else "Active"),
+            ]
+        return [
+            ("Title", lambda record: record['title']),
+            ("Creator", lambda record: record['creator']),
+            ("Type", lambda record: record['type']),
+            ("Checkout", lambda record: record['checkoutDate']),
+            ("Return", return_date),
+        ]
 
-        table.resizeColumnsToContents()
+    def display_history(self, history):
+        """Shows Loan/Return Item history in a table format"""
+        self.show_model(self.history_columns(), history)
 
     def apply_theme(self):
         """Apply the current theme stylesheet"""
@@ -0,0 +1,29 @@
+class Session:
+    """
+    Logged-in user with the authorization snapshot taken at login
+    (services.get_session_authorization). Permission checks read the
+    snapshot, no database round-trip per button press.
+    """
+
+    def __init__(self, authorization):
+        self.patron_id = authorization["patron_id"]
+        self.is_staff = authorization["is_staff"]
+        self.position = authorization["position"]
+        self.role = authorization["role"]
+        self.capabilities = frozenset(authorization["capabilities"])
+        self.staff_version = authorization["staff_version"]
+
+    def can(self, capability):
+        return capability in self.capabilities
+
+    @property
+    def is_volunteer(self):
+        return self.role == "volunteer"
+
+    @property
+    def is_manager(self):
+        return self.role == "manager"
+
+    def is_stale(self, staff_version):
+        """True if Staff changed since the snapshot was taken"""
+        return staff_version != self.staff_version
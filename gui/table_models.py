@@ -0,0 +1,176 @@
+import itertools
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, pyqtSignal
+from PyQt5.QtGui import QColor, QBrush, QPalette
+from PyQt5.QtWidgets import (QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication,
+                             QTableView, QAbstractItemView, QHeaderView)
+
+# Role carrying the raw status value of a row, read by StatusDelegate
+StatusRole = Qt.UserRole + 1
+
+# Rows sampled by resizeColumnsToContents() instead of measuring every row
+SIZE_SAMPLE_ROWS = 200
+
+_model_numbers = itertools.count(1)
+
+
+class RecordTableModel(QAbstractTableModel):
+    """
+    Read-only table model over service records (dicts).
+
+    columns is a list of (header, value_fn) where value_fn(record) returns the
+    cell text. Rows are stored as tuples of cell text only (plus status/key),
+    not as dicts or QTableWidgetItems, to keep per-row memory small.
+
+    With fetch_page set, the model pages lazily: the view asks for more rows
+    through canFetchMore/fetchMore when it scrolls near the end, and the page
+    is fetched on the TaskRunner. fetch_page(cursor) returns a services page
+    dict ({"rows", "next_cursor", "total"}). Each model submits under its own
+    key (task_key plus a number), so no other task can supersede a page load
+    and leave the model waiting for it; cancel_fetch() drops a pending one.
+    """
+
+    load_failed = pyqtSignal(object)
+    first_page_loaded = pyqtSignal()
+
+    def __init__(self, columns, records=(), fetch_page=None, runner=None, task_key="results",
+                 status_fn=None, key_fn=None, parent=None):
+        super().__init__(parent)
+        self._headers = [header for header, _ in columns]
+        self._value_fns = [fn for _, fn in columns]
+        self._status_fn = status_fn
+        self._key_fn = key_fn
+        self._rows = []
+        self._statuses = []
+        self._keys = []
+
+        self._fetch_page = fetch_page
+        self._runner = runner
+        self._task_key = f"{task_key}-page-{next(_model_numbers)}"
+        self._cursor = None
+        self._done = fetch_page is None
+        self._loading = False
+
+        self._append(records)
+
+    def _append(self, records):
+        for record in records:
+            self._rows.append(tuple(fn(record) for fn in self._value_fns))
+            self._statuses.append(self._status_fn(record) if self._status_fn else None)
+            self._keys.append(self._key_fn(record) if self._key_fn else None)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._rows[index.row()][index.column()]
+        if role == StatusRole:
+            return self._statuses[index.row()]
+        return None
+
+    def key(self, row):
+        """Identifier of a row (key_fn of its record), e.g. for button columns"""
+        return self._keys[row]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._done and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._loading = True
+        self._runner.submit(self._task_key, self._fetch_page, self._cursor,
+                            on_success=self._page_loaded, on_error=self._page_failed)
+
+    def cancel_fetch(self):
+        """Drop the pending page load, if any (its result is ignored); scrolling can fetch again"""
+        if self._loading:
+            self._runner.cancel(self._task_key)
+            self._loading = False
+
+    def _page_loaded(self, page):
+        self._loading = False
+        first_page = self._cursor is None
+        rows = page["rows"]
+        if rows:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+            self._append(rows)
+            self.endInsertRows()
+        self._cursor = page["next_cursor"]
+        self._done = page["next_cursor"] is None
+        if first_page:
+            self.first_page_loaded.emit()
+
+    def _page_failed(self, error):
+        self._loading = False
+        self._done = True
+        self.load_failed.emit(error)
+
+
+class StatusDelegate(QStyledItemDelegate):
+    """Colors a cell from the row's status (StatusRole): {status: (background, foreground)}"""
+
+    def __init__(self, colors, parent=None):
+        super().__init__(parent)
+        self._colors = {status: (QBrush(bg) if bg else None, QBrush(fg) if fg else None)
+                        for status, (bg, fg) in colors.items()}
+        self._default = self._colors.pop(None, (None, None))
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        background, foreground = self._colors.get(index.data(StatusRole), self._default)
+        if background is not None:
+            option.backgroundBrush = background
+        if foreground is not None:
+            option.palette.setBrush(QPalette.Text, foreground)
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Paints a push button in every cell of a column; clicked(row) on release"""
+
+    clicked = pyqtSignal(int)
+
+    def __init__(self, text, color=None, parent=None):
+        super().__init__(parent)
+        self._text = text
+        self._color = QColor(color) if color else None
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = self._text
+        button.state = QStyle.State_Enabled
+        if self._color is not None:
+            painter.fillRect(button.rect, self._color)
+        QApplication.style().drawControl(QStyle.CE_PushButton, button, painter)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and option.rect.contains(event.pos()):
+            self.clicked.emit(index.row())
+            return True
+        return False
+
+
+def create_results_view():
+    """QTableView configured like the dashboard QTableWidgets"""
+    view = QTableView()
+    view.setAlternatingRowColors(True)
+    view.verticalHeader().setVisible(False)
+    view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    view.horizontalHeader().setResizeContentsPrecision(SIZE_SAMPLE_ROWS)
+    # uniform row heights: the view never has to measure off-screen rows
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.hide()
+    return view
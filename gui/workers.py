@@ -0,0 +1,113 @@
+import itertools
+import logging
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+
+class _TaskSignals(QObject):
+    # key, token, result, error, elapsed seconds
+    done = pyqtSignal(object, int, object, object, float)
+
+
+class _Task(QRunnable):
+    """Runs one service call on a pool thread and reports back through signals"""
+
+    def __init__(self, key, token, fn, args, kwargs, signals):
+        super().__init__()
+        self.key = key
+        self.token = token
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = signals
+
+    def run(self):
+        start = time.perf_counter()
+        result, error = None, None
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            error = e
+        self.signals.done.emit(self.key, self.token, result, error, time.perf_counter() - start)
+
+
+class TaskRunner(QObject):
+    """
+    Runs blocking service calls off the Qt main thread.
+
+    Every task has a key (e.g. "results" for the dashboard table). Submitting a
+    new task under a key supersedes the previous one: if it hasn't started it is
+    dropped from the queue, if it is already running its result is ignored.
+    Callbacks always run on the main thread, so they can touch widgets.
+    """
+
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None, max_threads=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_threads:
+            self.pool.setMaxThreadCount(max_threads)
+        self._tokens = itertools.count(1)
+        self._latest = {}    # key -> token of the task whose result we still want
+        self._pending = {}   # token -> (task, on_success, on_error, submitted_at)
+        self._signals = _TaskSignals()
+        self._signals.done.connect(self._on_done)
+
+    @property
+    def busy(self):
+        return bool(self._pending)
+
+    def submit(self, key, fn, *args, on_success=None, on_error=None, **kwargs):
+        """Queue fn(*args, **kwargs); returns a token identifying the task"""
+        self.cancel(key)
+
+        token = next(self._tokens)
+        task = _Task(key, token, fn, args, kwargs, self._signals)
+        task.setAutoDelete(False)  # we keep a reference until it reports back
+        self._latest[key] = token
+        self._pending[token] = (task, on_success, on_error, time.perf_counter())
+        if len(self._pending) == 1:
+            self.busy_changed.emit(True)
+        self.pool.start(task)
+        return token
+
+    def cancel(self, key):
+        """Forget the current task for `key`, its result will be discarded"""
+        token = self._latest.pop(key, None)
+        if token is None or token not in self._pending:
+            return
+        task = self._pending[token][0]
+        if self.pool.tryTake(task):
+            # never started, so it will never report back
+            del self._pending[token]
+            logger.debug("task %s cancelled before start", key)
+            if not self._pending:
+                self.busy_changed.emit(False)
+
+    def _on_done(self, key, token, result, error, elapsed):
+        entry = self._pending.pop(token, None)
+        if not self._pending:
+            self.busy_changed.emit(False)
+        if entry is None:
+            return
+        _, on_success, on_error, submitted_at = entry
+
+        waited = time.perf_counter() - submitted_at - elapsed
+        stale = self._latest.get(key) != token
+        logger.info("task %s: ran %.1f ms (queued %.1f ms)%s%s", key, elapsed * 1000, max(waited, 0) * 1000,
+                    " failed" if error else "", " [stale, dropped]" if stale else "")
+        if stale:
+            return
+        del self._latest[key]
+
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                logger.error("task %s failed: %s", key, error)
+        elif on_success:
+            on_success(result)
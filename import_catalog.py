@@ -0,0 +1,54 @@
+"""
+Bulk catalog import from the command line.
+
+    python import_catalog.py acquisitions.csv
+    python import_catalog.py records.mrk --defer-indexes --db /path/to/library.db
+"""
+import argparse
+import sys
+
+from database import instrumentation
+from database.catalog_import import CHUNK_SIZE, TRANSACTION_ROWS, READERS, import_catalog
+from database.connection import close_all_pools
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import catalog records (CSV, JSONL or MARC-lite) into Items")
+    parser.add_argument("path", help="file to import")
+    parser.add_argument("--format", choices=sorted(READERS), help="default: from the file extension")
+    parser.add_argument("--db", help="database file (default: the application database)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--transaction-rows", type=int, default=TRANSACTION_ROWS)
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="rebuild indexes and the search index after loading (faster for large files)")
+    parser.add_argument("--strict", action="store_true", help="stop at the first invalid record")
+    args = parser.parse_args()
+    # in-process metrics die with the command, and bulk statements would all be "slow"
+    instrumentation.ENABLED = False
+
+    def progress(report):
+        rate = report["imported"] / report["elapsed"] if report["elapsed"] else 0
+        print(f"\r{report['imported']} imported, {report['skipped']} skipped ({rate:,.0f}/s)",
+              end="", file=sys.stderr, flush=True)
+
+    try:
+        report = import_catalog(args.path, format=args.format, chunk_size=args.chunk_size,
+                                transaction_rows=args.transaction_rows, defer_indexes=args.defer_indexes,
+                                strict=args.strict, progress=progress, db_name=args.db)
+    except (OSError, ValueError) as e:
+        print(f"\nImport failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        close_all_pools()
+
+    print(file=sys.stderr)
+    for line, message in report["errors"]:
+        print(f"line {line}: {message}", file=sys.stderr)
+    if report["skipped"] > len(report["errors"]):
+        print(f"... {report['skipped'] - len(report['errors'])} more invalid records", file=sys.stderr)
+    ids = f" (item ids {report['first_item_id']}-{report['last_item_id']})" if report["imported"] else ""
+    print(f"Imported {report['imported']} of {report['read']} records in {report['elapsed']:.1f} s{ids}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
+import logging
+import os
 import sys
 from PyQt5.QtWidgets import QApplication
 from gui.main_window import LibraryApp
+from database.connection import close_all_pools
 
 def main():
+    # e.g. LIBRARY_LOG_LEVEL=INFO to see per-task timings from gui.workers
+    logging.basicConfig(level=os.environ.get("LIBRARY_LOG_LEVEL", "WARNING"))
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(close_all_pools)
     window = LibraryApp()
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,38 @@
+"""
+Recompute the circulation analytics rollups from BorrowingHistory.
+
+    python rebuild_analytics.py --db /path/to/library.db
+
+The triggers keep the rollups current; run this after restoring a backup or
+editing loans with manual SQL. It holds the write lock until it finishes.
+"""
+import argparse
+import sqlite3
+import sys
+
+from database import instrumentation
+from database.analytics import rebuild_analytics
+from database.connection import close_all_pools
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the circulation analytics rollup tables")
+    parser.add_argument("--db", help="database file (default: the application database)")
+    args = parser.parse_args()
+    # in-process metrics die with the command
+    instrumentation.ENABLED = False
+
+    try:
+        report = rebuild_analytics(db_name=args.db)
+    except sqlite3.Error as e:
+        print(f"Rebuild failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        close_all_pools()
+
+    rows = ", ".join(f"{table} {count}" for table, count in report["rows"].items())
+    print(f"Rebuilt in {report['elapsed']:.1f} s: {rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import pytest
+
+from database import instrumentation
+from database.cache import clear_caches
+from database.connection import close_all_pools, get_db_connection
+
+
+@pytest.fixture(autouse=True)
+def _isolated():
+    """No metrics between tests, and no cached rows or pooled connections left over"""
+    enabled = instrumentation.ENABLED
+    instrumentation.ENABLED = False
+    clear_caches()
+    yield
+    close_all_pools()
+    clear_caches()
+    instrumentation.ENABLED = enabled
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Path of a new database at the latest schema version"""
+    path = str(tmp_path / "library.db")
+    get_db_connection(path).close()
+    return path
+
+
+@pytest.fixture
+def conn(db):
+    connection = get_db_connection(db)
+    yield connection
+    connection.close()
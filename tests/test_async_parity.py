@@ -0,0 +1,198 @@
+"""
+Every async_services wrapper returns what the sync service returns, and
+raises what it raises. Each case runs on two copies of the same seeded
+database: the direct call on one, the wrapper on the other.
+"""
+import asyncio
+import shutil
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from database import async_services, services
+from database.cache import clear_caches
+from database.connection import close_all_pools
+
+FUTURE = (date.today() + timedelta(days=30)).isoformat()
+
+# timings and run timestamps differ between any two calls
+VOLATILE_KEYS = {"elapsed", "run_at"}
+
+
+def _seed(db):
+    patron = lambda n: services.add_patron("Parity", f"P{n}", f"parity.{n}@example.org", db_name=db)["id"]
+    s = {"manager": patron(0), "borrower": patron(1), "waiting": patron(2), "free": patron(3)}
+    services.add_staff(s["manager"], "Manager", 50000, db_name=db)
+    s["item_out"] = services.add_item("River Song", "DVD", "Creator", 20.0, db_name=db)
+    s["item_free"] = services.add_item("Golden Light", "Physical Book", "Author", 25.0, db_name=db)
+    services.borrow_item(s["borrower"], s["item_out"], db_name=db)
+    s["hold"] = services.place_hold(s["waiting"], s["item_out"], db_name=db)["hold_id"]
+    s["event"] = services.create_event(s["manager"], "Talk", FUTURE, "101", "All", capacity=1,
+                                       start_time="10:00", end_time="12:00", db_name=db)
+    services.register_for_event(s["borrower"], s["event"], db_name=db)
+    s["registration"] = services.get_registrations_for_patron(s["borrower"], db_name=db)[0]["registration_id"]
+    s["request"] = services.submit_acquisition_request(s["free"], "DVD", "Creator", "Wanted", db_name=db)
+    return s
+
+
+# name -> s -> (args, kwargs); db_name is added by the test
+CASES = {
+    "add_item": lambda s: (("New", "DVD", "Creator", 10.0), {}),
+    "add_patron": lambda s: (("New", "Patron", "new@example.org"), {}),
+    "add_room": lambda s: (("202", 30), {}),
+    "add_staff": lambda s: ((s["free"], "Shelver", 30000), {}),
+    "add_staff_record": lambda s: ((s["manager"], "Note", "parity"), {}),
+    "add_volunteer": lambda s: ((s["free"],), {}),
+    "approve_acquisition_request": lambda s: ((s["request"], s["manager"]), {}),
+    "borrow_item": lambda s: ((s["free"], s["item_free"]), {}),
+    "borrow_items": lambda s: (([(s["free"], s["item_free"]), (s["free"], 999_999)],), {}),
+    "cancel_event_registration": lambda s: ((s["registration"],), {}),
+    "cancel_hold": lambda s: ((s["hold"], s["waiting"]), {}),
+    "check_overdue_items": lambda s: ((), {}),
+    "compute_patron_balances": lambda s: ((), {}),
+    "create_event": lambda s: ((s["manager"], "Clash", FUTURE, "101", "All"), {"start_time": "11:00",
+                                                                             "end_time": "13:00"}),
+    "expire_holds": lambda s: ((), {}),
+    "find_patron_with_staff": lambda s: (("parity.0@example.org",), {}),
+    "find_room_conflicts": lambda s: (("101", FUTURE, "09:00", "11:00"), {}),
+    "get_all_borrowing_history": lambda s: ((True,), {}),
+    "get_all_borrowing_history_page": lambda s: ((False, s["borrower"]), {"with_total": True}),
+    "get_all_staff_members": lambda s: ((), {}),
+    "get_available_items": lambda s: ((), {}),
+    "get_borrowing_history": lambda s: ((s["borrower"],), {}),
+    "get_borrowing_history_page": lambda s: ((), {"page_size": 1}),
+    "get_checked_out_items_for_patron": lambda s: ((s["borrower"],), {}),
+    "get_event": lambda s: ((s["event"],), {}),
+    "get_event_registrations": lambda s: ((s["event"],), {}),
+    "get_free_rooms": lambda s: ((FUTURE, "09:00", "11:00"), {}),
+    "get_item": lambda s: ((s["item_out"],), {}),
+    "get_items_by_type_for_help": lambda s: (("DVD",), {}),
+    "get_items_with_display_status": lambda s: ((True,), {}),
+    "get_items_with_display_status_page": lambda s: ((False,), {"with_total": True}),
+    "get_overdue_items": lambda s: ((), {"today": (date.today() + timedelta(days=90)).isoformat()}),
+    "get_patron": lambda s: ((s["borrower"],), {}),
+    "get_patron_balance": lambda s: ((s["borrower"],), {}),
+    "get_patron_fines": lambda s: ((s["borrower"],), {}),
+    "get_patron_holds": lambda s: ((s["waiting"],), {}),
+    "get_registrations_for_patron": lambda s: ((s["borrower"],), {}),
+    "get_session_authorization": lambda s: ((s["manager"],), {}),
+    "get_staff_version": lambda s: ((), {}),
+    "get_upcoming_events": lambda s: ((True,), {}),
+    "get_upcoming_events_page": lambda s: ((), {}),
+    "is_manager": lambda s: ((s["manager"],), {}),
+    "is_volunteer": lambda s: ((s["free"],), {}),
+    "loan_period_days": lambda s: (("DVD",), {}),
+    "place_hold": lambda s: ((s["free"], s["item_out"]), {}),
+    "process_lost_item_payment": lambda s: ((s["borrower"],), {}),
+    "register_for_event": lambda s: ((s["free"], s["event"]), {}),
+    "remove_volunteer": lambda s: ((s["free"],), {}),
+    "return_item": lambda s: ((s["borrower"], s["item_out"]), {}),
+    "return_items": lambda s: (([(s["borrower"], s["item_out"]), (s["free"], s["item_free"])],), {}),
+    "run_overdue_sweep": lambda s: ((), {"today": (date.today() + timedelta(days=90)).isoformat()}),
+    "search_available_items_by_title": lambda s: (("golden",), {}),
+    "search_catalog": lambda s: (("river",), {"status": None}),
+    "show_acquisition_requests": lambda s: ((), {}),
+    "show_acquisition_requests_page": lambda s: ((), {}),
+    "submit_acquisition_request": lambda s: ((s["free"], "CD", "Band", "Album"), {}),
+    "update_acquisition_request_status": lambda s: ((s["request"], "denied"), {}),
+}
+
+# the same wrappers have to fail the same way
+ERROR_CASES = {
+    "borrow_item": lambda s: ((s["free"], 999_999), {}),
+    "create_event": lambda s: ((s["manager"], "Bad", FUTURE, "101", "All"), {"start_time": "12:00",
+                                                                           "end_time": "10:00"}),
+    "register_for_event": lambda s: ((s["borrower"], s["event"]), {}),
+    "cancel_hold": lambda s: ((999_999,), {}),
+    "add_staff": lambda s: ((999_999, "Shelver", 1), {}),
+}
+
+WRAPPED = [name for name in async_services.__all__ if name not in ("get_executor", "shutdown", "run")]
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def _outcome(call):
+    try:
+        return "result", _normalize(call())
+    except Exception as e:
+        return "error", (type(e), str(e))
+
+
+@pytest.fixture(scope="module")
+def template(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("parity") / "template.db")
+    seeded = _seed(path)
+    close_all_pools()
+    clear_caches()
+    return path, seeded
+
+
+@pytest.fixture
+def twins(template, tmp_path):
+    """Two identical copies of the seeded database"""
+    source, seeded = template
+    paths = []
+    for name in ("sync.db", "async.db"):
+        paths.append(str(tmp_path / name))
+        shutil.copy(source, paths[-1])
+    return paths, seeded
+
+
+def _call_kwargs(name, kwargs, db):
+    # loan_period_days is the only public service without a database
+    return kwargs if name == "loan_period_days" else dict(kwargs, db_name=db)
+
+
+def test_every_wrapper_has_a_case():
+    assert sorted(WRAPPED) == sorted(CASES)
+    assert set(ERROR_CASES) <= set(CASES)
+
+
+@pytest.mark.parametrize("cases,name", [(CASES, name) for name in sorted(CASES)]
+                         + [(ERROR_CASES, name) for name in sorted(ERROR_CASES)])
+def test_async_wrapper_matches_service(twins, cases, name):
+    (sync_db, async_db), seeded = twins
+    args, kwargs = cases[name](seeded)
+
+    expected = _outcome(lambda: getattr(services, name)(*args, **_call_kwargs(name, kwargs, sync_db)))
+    clear_caches()
+    actual = _outcome(lambda: asyncio.run(getattr(async_services, name)(*args, **_call_kwargs(name, kwargs, async_db))))
+
+    assert actual == expected
+    if cases is ERROR_CASES:
+        assert expected[0] == "error"
+
+
+def test_wrappers_through_task_runner(twins):
+    """The GUI's TaskRunner hands back the same results and errors as a direct call"""
+    QtCore = pytest.importorskip("PyQt5.QtCore")
+    from gui.workers import TaskRunner
+
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    (sync_db, runner_db), seeded = twins
+    runner = TaskRunner()
+    # both copies see the same calls in the same order, so they stay identical
+    for cases in (CASES, ERROR_CASES):
+        for name in sorted(cases):
+            args, kwargs = cases[name](seeded)
+            expected = _outcome(lambda: getattr(services, name)(*args, **_call_kwargs(name, kwargs, sync_db)))
+            clear_caches()
+
+            outcome = []
+            runner.submit(name, getattr(services, name), *args,
+                          on_success=lambda result: outcome.append(("result", _normalize(result))),
+                          on_error=lambda e: outcome.append(("error", (type(e), str(e)))),
+                          **_call_kwargs(name, kwargs, runner_db))
+            deadline = time.monotonic() + 10
+            while not outcome and time.monotonic() < deadline:
+                app.processEvents()
+                time.sleep(0.001)
+            assert outcome == [expected], name
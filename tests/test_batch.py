@@ -0,0 +1,30 @@
+from database import services
+
+
+def _item(db, title="Batch Item"):
+    return services.add_item(title, "DVD", "Creator", 20.0, db_name=db)
+
+
+def _patron(db, n):
+    return services.add_patron("Batch", "Patron", f"batch.{n}@example.org", db_name=db)["id"]
+
+
+def test_borrow_items_reports_unknown_patron_per_pair(db):
+    patron = _patron(db, 1)
+    first, second = _item(db, "First"), _item(db, "Second")
+    unknown = patron + 1_000_000
+
+    results = services.borrow_items([(unknown, first), (patron, second)], db_name=db)
+
+    assert results[0] == {"patron_id": unknown, "item_id": first, "status": "error", "message": "Patron not found"}
+    assert results[1]["status"] == "borrowed"
+    assert services.get_item(first, db_name=db)["status"] == "available"
+    assert services.get_item(second, db_name=db)["status"] == "checked_out"
+
+
+def test_borrow_items_then_return_items(db):
+    pairs = [(_patron(db, n), _item(db, f"Item {n}")) for n in range(5)]
+
+    assert [r["status"] for r in services.borrow_items(pairs, db_name=db)] == ["borrowed"] * 5
+    assert [r["status"] for r in services.return_items(pairs, db_name=db)] == ["returned"] * 5
+    assert all(services.get_item(item, db_name=db)["status"] == "available" for _, item in pairs)
@@ -0,0 +1,65 @@
+"""A read that races an invalidation must not leave its stale value cached."""
+import threading
+
+from database.cache import LRUCache, cached
+
+
+def test_invalidate_during_load_skips_the_put():
+    store = {"value": "old"}
+
+    @cached("test_race", ttl=60)
+    def lookup(key):
+        value = store["value"]
+        if value == "old":
+            # the write lands after the read but before the result is cached
+            store["value"] = "new"
+            lookup.invalidate(key)
+        return value
+
+    assert lookup(1) == "old"
+    assert lookup.cache.get((("key", 1),))[0] is False
+    assert lookup.cache.stats["stale_loads"] == 1
+    assert lookup(1) == "new"
+    assert lookup.cache.get((("key", 1),)) == (True, "new")
+
+
+def test_clear_during_load_skips_the_put():
+    cache = LRUCache("test_clear")
+    assert cache.load("k", lambda: cache.clear() or "old") == "old"
+    assert cache.get("k") == (False, None)
+
+
+def test_invalidating_another_key_keeps_the_put():
+    cache = LRUCache("test_other")
+    assert cache.load("k", lambda: cache.invalidate("other") or "v") == "v"
+    assert cache.get("k") == (True, "v")
+
+
+def test_concurrent_load_and_invalidate():
+    cache = LRUCache("test_threads")
+    reading, written = threading.Event(), threading.Event()
+
+    def slow_read():
+        reading.set()
+        written.wait(5)
+        return "old"
+
+    reader = threading.Thread(target=cache.load, args=("k", slow_read))
+    reader.start()
+    reading.wait(5)
+    cache.invalidate("k")
+    written.set()
+    reader.join(5)
+    assert cache.get("k") == (False, None)
+    assert not cache._loads
+
+
+def test_failed_load_is_forgotten():
+    cache = LRUCache("test_error")
+    try:
+        cache.load("k", lambda: 1 / 0)
+    except ZeroDivisionError:
+        pass
+    assert not cache._loads
+    assert cache.load("k", lambda: "v") == "v"
+    assert cache.get("k") == (True, "v")
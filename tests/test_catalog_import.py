@@ -0,0 +1,118 @@
+"""import_catalog for each input format: counts, invalid records, deferred indexes and the item cache."""
+import json
+import sqlite3
+
+import pytest
+
+from database import services
+from database.catalog_import import import_catalog
+
+# every file holds the same three valid records and two invalid ones
+CSV = """title,author,item_type,price
+Quillfeather Almanac,Ada Marsh,Physical Book,24.50
+Moonlit Harbor,Ben Ortiz,dvd,12
+,No Title,CD,5
+Bad Cost,Cara Lind,Vinyl,free
+Thornbury Sessions,Dee Park,CD,9.99
+"""
+
+JSONL = "\n".join([
+    json.dumps({"title": "Quillfeather Almanac", "creator": "Ada Marsh", "type": "Physical Book", "cost": 24.5}),
+    json.dumps({"title": "Moonlit Harbor", "creator": "Ben Ortiz", "type": "DVD", "cost": 12}),
+    "{not json",
+    json.dumps({"title": "Odd Type", "creator": "Cara Lind", "type": "Scroll", "cost": 5}),
+    "",
+    json.dumps({"title": "Thornbury Sessions", "creator": "Dee Park", "type": "CD", "cost": "9.99"}),
+]) + "\n"
+
+MRK = """=LDR  00000nam a2200000 a 4500
+=100  1\\$aMarsh, Ada.
+=245  10$aQuillfeather almanac :$bQuillfeather Almanac /
+=365  \\\\$b24.50
+
+=LDR  00000ngm a2200000 a 4500
+=100  1\\$aOrtiz, Ben.
+=245  10$aMoonlit Harbor.
+=020  \\\\$cUSD 12.00
+
+=LDR  00000nam a2200000 a 4500
+=100  1\\$aNo Price.
+=245  10$aPriceless.
+
+=LDR  00000nam a2200000 a 4500
+=245  10$aNobody Wrote This.
+=365  \\\\$b3.00
+
+=LDR  00000njm a2200000 a 4500
+=100  1\\$aPark, Dee.
+=245  10$aThornbury Sessions.
+=365  \\\\$b9.99
+"""
+
+FILES = {"csv": ("catalog.csv", CSV), "jsonl": ("catalog.jsonl", JSONL), "mrk": ("catalog.mrk", MRK)}
+# line of each invalid record in its file
+INVALID_LINES = {"csv": [4, 5], "jsonl": [3, 4], "mrk": [11, 15]}
+
+
+def _write(tmp_path, format):
+    name, content = FILES[format]
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def _schema(db):
+    conn = sqlite3.connect(db)
+    try:
+        return sorted(conn.execute(
+            "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = 'Items' AND type IN ('index', 'trigger')"
+        ).fetchall())
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize("format", sorted(FILES))
+def test_counts_and_invalid_records(db, tmp_path, format):
+    report = import_catalog(_write(tmp_path, format), chunk_size=2, db_name=db)
+    assert (report["read"], report["imported"], report["skipped"]) == (5, 3, 2)
+    assert [line for line, _ in report["errors"]] == INVALID_LINES[format]
+    assert report["last_item_id"] - report["first_item_id"] == 2
+
+    items = [services.get_item(item_id, db_name=db)
+             for item_id in range(report["first_item_id"], report["last_item_id"] + 1)]
+    assert [(item["type"], item["replacement_cost"], item["status"]) for item in items] == [
+        ("Physical Book", 24.5, "available"), ("DVD", 12.0, "available"), ("CD", 9.99, "available")]
+    assert items[1]["creator"].startswith(("Ben Ortiz", "Ortiz, Ben"))
+
+
+@pytest.mark.parametrize("format", sorted(FILES))
+def test_strict_stops_at_first_invalid_record(db, tmp_path, format):
+    with pytest.raises(ValueError, match=f"line {INVALID_LINES[format][0]}"):
+        import_catalog(_write(tmp_path, format), strict=True, db_name=db)
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT COUNT(*) FROM Items WHERE title LIKE 'Quillfeather%'").fetchone() == (0,)
+    conn.close()
+
+
+@pytest.mark.parametrize("format", sorted(FILES))
+def test_deferred_indexes_and_search_are_rebuilt(db, tmp_path, format):
+    before = _schema(db)
+    assert any(name == "items_fts_insert" for _, name, _ in before)
+    report = import_catalog(_write(tmp_path, format), defer_indexes=True, db_name=db)
+    assert report["imported"] == 3
+    assert _schema(db) == before
+    assert [item["item_id"] for item in services.search_catalog("thornbury", db_name=db)] == [report["last_item_id"]]
+    # the insert trigger is back: items added later are searchable too
+    added = services.add_item("Wexford Lanterns", "DVD", "Eve Quinn", 8.0, db_name=db)
+    assert [item["item_id"] for item in services.search_catalog("wexford", db_name=db)] == [added]
+
+
+@pytest.mark.parametrize("format", sorted(FILES))
+def test_item_cache_is_cleared(db, tmp_path, format):
+    conn = sqlite3.connect(db)
+    next_id = conn.execute("SELECT COALESCE(MAX(item_id), 0) + 1 FROM Items").fetchone()[0]
+    conn.close()
+    assert services.get_item(next_id, db_name=db) is None  # the miss is cached
+    report = import_catalog(_write(tmp_path, format), db_name=db)
+    assert report["first_item_id"] == next_id
+    assert services.get_item(next_id, db_name=db)["title"].lower().startswith("quillfeather almanac")
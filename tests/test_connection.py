@@ -0,0 +1,49 @@
+"""Pooled connections: one migration per database, and ":memory:" pooled as one shared database."""
+import threading
+import time
+
+from database import connection
+from database.connection import get_db_connection, get_pool
+
+
+def test_concurrent_first_opens_migrate_once(tmp_path, monkeypatch):
+    calls = []
+    migrate = connection.migrate
+
+    def slow_migrate(conn):
+        calls.append(threading.get_ident())
+        time.sleep(0.05)  # wide enough for every thread to reach the check
+        return migrate(conn)
+
+    monkeypatch.setattr(connection, "migrate", slow_migrate)
+    path = str(tmp_path / "race.db")
+    opened, start = [], threading.Barrier(8)
+
+    def open_one():
+        start.wait()
+        opened.append(get_db_connection(path))
+
+    threads = [threading.Thread(target=open_one) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert len(opened) == 8
+    assert all(conn.execute("SELECT COUNT(*) FROM Items").fetchone() for conn in opened)
+    for conn in opened:
+        conn.close()
+
+
+def test_memory_connections_share_one_database():
+    first, second = get_db_connection(":memory:"), get_db_connection(":memory:")
+    try:
+        # both checked out at once, so these are two different connections
+        first.execute("INSERT INTO Patron (first_name, last_name, email) VALUES ('Mem', 'Ory', 'shared@memory.test')")
+        first.commit()
+        row = second.execute("SELECT last_name FROM Patron WHERE email = 'shared@memory.test'").fetchone()
+        assert row["last_name"] == "Ory"
+    finally:
+        first.close()
+        second.close()
+    assert get_pool(":memory:").path == connection.MEMORY_URI
@@ -0,0 +1,84 @@
+"""Event capacity: the seats_taken counter, the waitlist and promotion off it."""
+from datetime import date, timedelta
+
+import pytest
+
+from database import services
+
+EVENT_DATE = (date.today() + timedelta(days=30)).isoformat()
+
+
+@pytest.fixture
+def event(db):
+    """An upcoming event with two seats"""
+    organizer = services.add_patron("Event", "Organizer", "organizer@example.org", db_name=db)["id"]
+    services.add_staff(organizer, "Manager", 50000, db_name=db)
+    return services.create_event(organizer, "Author Talk", EVENT_DATE, "101", "All", capacity=2, db_name=db)
+
+
+def _patrons(db, count):
+    return [services.add_patron("Event", f"Guest{n}", f"guest.{n}@example.org", db_name=db)["id"]
+            for n in range(count)]
+
+
+def _registration(db, patron_id):
+    return services.get_registrations_for_patron(patron_id, db_name=db)[0]
+
+
+def _seats_taken(db, event_id):
+    return services.get_event(event_id, db_name=db)["seats_taken"]
+
+
+def _registered(db, event_id):
+    rows = services.get_event_registrations(event_id=event_id, db_name=db)
+    return sorted(r["patron_id"] for r in rows if r["status"] == "registered")
+
+
+def test_full_event_waitlists_without_taking_a_seat(db, event):
+    first, second, third, fourth = _patrons(db, 4)
+    assert services.register_for_event(first, event, db_name=db) == "registered"
+    assert services.register_for_event(second, event, db_name=db) == "registered"
+    assert _seats_taken(db, event) == 2
+
+    assert services.register_for_event(third, event, db_name=db) == "waitlisted"
+    assert services.register_for_event(fourth, event, db_name=db) == "waitlisted"
+    assert _seats_taken(db, event) == 2
+    assert [_registration(db, p)["waitlist_position"] for p in (first, third, fourth)] == [None, 1, 2]
+    with pytest.raises(ValueError, match="already on the waitlist"):
+        services.register_for_event(third, event, db_name=db)
+
+
+def test_cancelled_seat_goes_to_the_head_of_the_waitlist(db, event):
+    first, second, third, fourth = _patrons(db, 4)
+    for patron in (first, second, third, fourth):
+        services.register_for_event(patron, event, db_name=db)
+
+    services.cancel_event_registration(_registration(db, first)["registration_id"], db_name=db)
+    assert _registration(db, third)["status"] == "registered"
+    assert _registration(db, fourth)["waitlist_position"] == 1
+    assert _registered(db, event) == sorted([second, third])
+    assert _seats_taken(db, event) == 2
+
+    # empty waitlist: the seat is given back
+    services.cancel_event_registration(_registration(db, fourth)["registration_id"], db_name=db)
+    services.cancel_event_registration(_registration(db, second)["registration_id"], db_name=db)
+    assert _registered(db, event) == [third]
+    assert _seats_taken(db, event) == 1
+    assert services.register_for_event(fourth, event, db_name=db) == "registered"
+    assert _seats_taken(db, event) == len(_registered(db, event)) == 2
+
+
+def test_cancelling_a_waitlisted_registration_keeps_the_seats(db, event):
+    first, second, third, fourth = _patrons(db, 4)
+    for patron in (first, second, third, fourth):
+        services.register_for_event(patron, event, db_name=db)
+
+    services.cancel_event_registration(_registration(db, third)["registration_id"], db_name=db)
+    assert services.get_registrations_for_patron(third, db_name=db) == []
+    assert _registered(db, event) == sorted([first, second])
+    assert _seats_taken(db, event) == 2
+    assert _registration(db, fourth)["waitlist_position"] == 1
+
+    with pytest.raises(ValueError, match="Registration not found"):
+        services.cancel_event_registration(_registration(db, first)["registration_id"] + 100, db_name=db)
+    assert _seats_taken(db, event) == 2
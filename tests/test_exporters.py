@@ -0,0 +1,46 @@
+"""The borrowing history export streams from the checkout indexes and merges the loan tables in order."""
+import sqlite3
+
+import pytest
+
+from database import exporters, services
+from database.migrations import explain_query_plan
+
+
+@pytest.mark.parametrize("dates", [(None, None), ("2025-01-02", None), ("2025-01-02", "2025-01-04")])
+def test_borrowing_history_reads_checkout_indexes(conn, dates):
+    queries = exporters.dataset_queries("borrowing_history", *dates)
+    assert len(queries) == 2
+    for sql, params in queries:
+        plan = explain_query_plan(conn, sql, params)
+        assert "_checkout" in plan[0], plan
+        assert not any("TEMP B-TREE" in line for line in plan), plan
+
+
+def test_borrowing_history_export_is_merged_in_order(db, tmp_path):
+    items = [services.add_item(f"Title {n}", "DVD", "Creator", 10.0, db_name=db) for n in range(8)]
+    for n, item in enumerate(items):
+        patron = services.add_patron("Ex", f"Porter{n}", f"ex.{n}@example.org", db_name=db)["id"]
+        services.borrow_item(patron, item, db_name=db)
+        if n % 3:
+            services.return_item(patron, item, db_name=db)
+    conn = sqlite3.connect(db)
+    with conn:
+        for n, item in enumerate(items):
+            for table in ("OpenLoans", "LoanArchive"):
+                conn.execute(f"UPDATE {table} SET checkoutDate = ? WHERE item_id = ?",
+                             (f"2025-01-{1 + n % 5:02d}", item))
+    expected = conn.execute(
+        """SELECT bh.id, bh.item_id, bh.checkoutDate, bh.returnDate FROM BorrowingHistory bh
+           JOIN Items i ON i.item_id = bh.item_id JOIN Patron p ON p.id = bh.id
+           WHERE bh.checkoutDate >= '2025-01-02' ORDER BY bh.checkoutDate, bh.id, bh.item_id"""
+    ).fetchall()
+    conn.close()
+
+    records = list(exporters.iter_records("borrowing_history", start_date="2025-01-02", batch_size=3, db_name=db))
+    assert [(r["patron_id"], r["item_id"], r["checkoutDate"], r["returnDate"]) for r in records] == expected
+    assert {r["returnDate"] is None for r in records} == {True, False}
+
+    report = exporters.export("borrowing_history", str(tmp_path / "history.jsonl"), start_date="2025-01-02",
+                              batch_size=3, db_name=db)
+    assert report["rows"] == len(expected)
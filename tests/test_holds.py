@@ -0,0 +1,164 @@
+"""The holds queue: who gets an item when it comes back, and when the shelf passes it on."""
+import sqlite3
+from datetime import date, timedelta
+
+import pytest
+
+from database import services
+
+
+def _patrons(db, count):
+    return [services.add_patron("Hold", f"Queue{n}", f"queue.{n}@example.org", db_name=db)["id"]
+            for n in range(count)]
+
+
+def _item(db):
+    return services.add_item("Popular Title", "Physical Book", "Author", 25.0, db_name=db)
+
+
+def _status(db, item_id):
+    return services.get_item(item_id, db_name=db)["status"]
+
+
+def _legacy_hold(db, patron_id, item_id):
+    """A waiting hold written without place_hold's checks (e.g. before they existed)"""
+    conn = sqlite3.connect(db)
+    with conn:
+        conn.execute("INSERT INTO Holds (item_id, patron_id, placed_date) VALUES (?, ?, '2025-01-01')",
+                     (item_id, patron_id))
+    conn.close()
+
+
+def test_past_borrower_cannot_place_a_hold(db):
+    past, current = _patrons(db, 2)
+    item = _item(db)
+    services.borrow_item(past, item, db_name=db)
+    services.return_item(past, item, db_name=db)
+    services.borrow_item(current, item, db_name=db)
+    with pytest.raises(ValueError, match="already borrowed this item before"):
+        services.place_hold(past, item, db_name=db)
+    assert services.get_patron_holds(past, db_name=db) == []
+
+
+def test_return_skips_holds_of_past_borrowers(db):
+    past, current, next_in_line = _patrons(db, 3)
+    item = _item(db)
+    services.borrow_item(past, item, db_name=db)
+    services.return_item(past, item, db_name=db)
+    services.borrow_item(current, item, db_name=db)
+    _legacy_hold(db, past, item)
+    services.place_hold(next_in_line, item, db_name=db)
+
+    assert services.return_item(current, item, db_name=db)["on_hold_for"] == next_in_line
+    assert services.get_patron_holds(past, db_name=db) == []
+    services.borrow_item(next_in_line, item, db_name=db)
+    assert _status(db, item) == "checked_out"
+
+
+def test_item_with_only_ineligible_holds_goes_back_on_the_shelf(db):
+    past, current = _patrons(db, 2)
+    item = _item(db)
+    services.borrow_item(past, item, db_name=db)
+    services.return_item(past, item, db_name=db)
+    services.borrow_item(current, item, db_name=db)
+    _legacy_hold(db, past, item)
+
+    assert "on_hold_for" not in services.return_item(current, item, db_name=db)
+    assert _status(db, item) == "available"
+
+
+@pytest.fixture
+def queue(db):
+    """An item out on loan with three patrons queued for it, in order"""
+    borrower, *waiting = _patrons(db, 4)
+    item = _item(db)
+    services.borrow_item(borrower, item, db_name=db)
+    holds = [services.place_hold(patron, item, db_name=db) for patron in waiting]
+    return borrower, item, list(zip(waiting, holds))
+
+
+def _position(db, patron_id):
+    holds = services.get_patron_holds(patron_id, db_name=db)
+    return holds[0]["position"] if holds else None
+
+
+def test_queue_positions(db, queue):
+    _, item, waiting = queue
+    assert [hold["position"] for _, hold in waiting] == [1, 2, 3]
+    assert [_position(db, patron) for patron, _ in waiting] == [1, 2, 3]
+    assert all(hold["item_id"] == item for _, hold in waiting)
+
+
+def test_one_active_hold_per_patron_and_item(db, queue):
+    borrower, item, waiting = queue
+    with pytest.raises(ValueError, match="already have a hold"):
+        services.place_hold(waiting[0][0], item, db_name=db)
+    with pytest.raises(ValueError, match="currently borrowing"):
+        services.place_hold(borrower, item, db_name=db)
+    with pytest.raises(ValueError, match="available"):
+        services.place_hold(borrower, _item(db), db_name=db)
+
+    # a cancelled hold no longer counts, the patron can queue again (at the back)
+    services.cancel_hold(waiting[0][1]["hold_id"], waiting[0][0], db_name=db)
+    assert services.place_hold(waiting[0][0], item, db_name=db)["position"] == 3
+
+
+def test_cancel_hold(db, queue):
+    _, item, waiting = queue
+    (first, _), (second, second_hold), (third, _) = waiting
+    with pytest.raises(ValueError, match="Hold not found"):
+        services.cancel_hold(second_hold["hold_id"], first, db_name=db)  # not theirs
+
+    assert services.cancel_hold(second_hold["hold_id"], second, db_name=db) is True
+    assert _position(db, second) is None
+    assert [_position(db, first), _position(db, third)] == [1, 2]
+    with pytest.raises(ValueError, match="Hold not found"):
+        services.cancel_hold(second_hold["hold_id"], second, db_name=db)
+
+
+def test_return_shelves_for_the_head_of_the_queue(db, queue):
+    borrower, item, waiting = queue
+    (first, _), (second, _), _ = waiting
+    result = services.return_item(borrower, item, db_name=db)
+    assert result["on_hold_for"] == first
+    assert _status(db, item) == "on_hold"
+
+    ready = services.get_patron_holds(first, db_name=db)[0]
+    assert (ready["status"], ready["position"]) == ("ready", None)
+    assert ready["expires"] == (date.today() + timedelta(days=services.HOLD_SHELF_DAYS)).isoformat()
+    assert _position(db, second) == 1
+
+    with pytest.raises(ValueError, match="on hold for another patron"):
+        services.borrow_item(second, item, db_name=db)
+    services.borrow_item(first, item, db_name=db)
+    assert _status(db, item) == "checked_out"
+    assert services.get_patron_holds(first, db_name=db) == []  # fulfilled
+
+
+def test_cancelling_a_ready_hold_passes_the_item_on(db, queue):
+    borrower, item, waiting = queue
+    (first, first_hold), (second, _), _ = waiting
+    services.return_item(borrower, item, db_name=db)
+    services.cancel_hold(first_hold["hold_id"], first, db_name=db)
+    assert services.get_patron_holds(second, db_name=db)[0]["status"] == "ready"
+    assert _status(db, item) == "on_hold"
+
+
+def test_expire_holds_passes_the_item_to_the_next_hold(db, queue):
+    borrower, item, waiting = queue
+    (first, _), (second, second_hold), (third, _) = waiting
+    services.return_item(borrower, item, db_name=db)
+    expires = services.get_patron_holds(first, db_name=db)[0]["expires"]
+
+    assert services.expire_holds(today=expires, db_name=db) == {"expired": [], "on_hold_for": {}}
+    services.cancel_hold(second_hold["hold_id"], second, db_name=db)
+    after = (date.fromisoformat(expires) + timedelta(days=1)).isoformat()
+    assert services.expire_holds(today=after, db_name=db) == {"expired": [item], "on_hold_for": {item: third}}
+    assert services.get_patron_holds(first, db_name=db) == []
+    assert services.get_patron_holds(third, db_name=db)[0]["status"] == "ready"
+
+    # nobody left in line: the expired hold puts the item back on the shelf
+    later = (date.fromisoformat(after) + timedelta(days=services.HOLD_SHELF_DAYS + 1)).isoformat()
+    assert services.expire_holds(today=later, db_name=db) == {"expired": [item], "on_hold_for": {}}
+    assert _status(db, item) == "available"
+    services.borrow_item(second, item, db_name=db)
@@ -0,0 +1,146 @@
+"""Compare-and-set checkouts and returns, and retrying a write on a busy database."""
+import sqlite3
+import threading
+
+import pytest
+
+from database import services
+from database.connection import PRAGMA_PROFILES, configure_pool
+
+
+def _patrons(db, count):
+    return [services.add_patron("Loan", f"Race{n}", f"race.{n}@example.org", db_name=db)["id"] for n in range(count)]
+
+
+def _open_loans(db, item_id):
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute("SELECT id FROM OpenLoans WHERE item_id = ?", (item_id,)).fetchall()
+    finally:
+        conn.close()
+
+
+def test_second_borrow_of_an_item_fails(db):
+    first, second = _patrons(db, 2)
+    item = services.add_item("Only Copy", "DVD", "Creator", 10.0, db_name=db)
+    services.borrow_item(first, item, db_name=db)
+    with pytest.raises(ValueError, match="not available"):
+        services.borrow_item(second, item, db_name=db)
+    assert _open_loans(db, item) == [(first,)]
+    assert services.get_item(item, db_name=db)["status"] == "checked_out"
+
+
+def test_concurrent_borrows_lend_the_item_once(db):
+    patrons = _patrons(db, 8)
+    item = services.add_item("Only Copy", "DVD", "Creator", 10.0, db_name=db)
+    start, outcomes = threading.Barrier(len(patrons)), []
+
+    def borrow(patron):
+        start.wait()
+        try:
+            services.borrow_item(patron, item, db_name=db)
+            outcomes.append(("borrowed", patron))
+        except ValueError as e:
+            outcomes.append(("refused", str(e)))
+
+    threads = [threading.Thread(target=borrow, args=(patron,)) for patron in patrons]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    winners = [patron for outcome, patron in outcomes if outcome == "borrowed"]
+    assert len(winners) == 1 and len(outcomes) == len(patrons)
+    assert _open_loans(db, item) == [(winners[0],)]
+
+
+def test_returning_an_item_not_on_loan_fails(db):
+    borrower, other = _patrons(db, 2)
+    item = services.add_item("Shelf Copy", "DVD", "Creator", 10.0, db_name=db)
+    with pytest.raises(ValueError, match="No active loan found"):
+        services.return_item(borrower, item, db_name=db)
+
+    services.borrow_item(borrower, item, db_name=db)
+    with pytest.raises(ValueError, match="No active loan found"):
+        services.return_item(other, item, db_name=db)
+    assert services.return_item(borrower, item, db_name=db)["status"] == "returned"
+    with pytest.raises(ValueError, match="No active loan found"):
+        services.return_item(borrower, item, db_name=db)
+    assert _open_loans(db, item) == []
+    assert services.get_item(item, db_name=db)["status"] == "available"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Retry pauses, recorded instead of slept"""
+    recorded = []
+    monkeypatch.setattr(services.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_retry_busy_retries_then_succeeds(sleeps):
+    calls = []
+
+    @services._retry_busy
+    def write():
+        calls.append(1)
+        if len(calls) < 3:
+            raise sqlite3.OperationalError("database is locked")
+        return "done"
+
+    assert write() == "done"
+    assert len(calls) == 3
+    assert sleeps == [services.BUSY_RETRY_DELAY, services.BUSY_RETRY_DELAY * 2]
+
+
+def test_retry_busy_gives_up(sleeps):
+    calls = []
+
+    @services._retry_busy
+    def write():
+        calls.append(1)
+        raise sqlite3.OperationalError("database is locked")
+
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        write()
+    assert len(calls) == services.BUSY_RETRIES + 1
+
+
+def test_retry_busy_ignores_other_errors(sleeps):
+    calls = []
+
+    @services._retry_busy
+    def write():
+        calls.append(1)
+        raise sqlite3.OperationalError("no such table: Nowhere")
+
+    with pytest.raises(sqlite3.OperationalError, match="no such table"):
+        write()
+    assert len(calls) == 1 and sleeps == []
+
+
+def test_borrow_waits_out_a_held_write_lock(db):
+    patron, = _patrons(db, 1)
+    item = services.add_item("Locked Copy", "DVD", "Creator", 10.0, db_name=db)
+    # fail fast on the lock so the retries, not busy_timeout, do the waiting
+    configure_pool(db, profile=dict(PRAGMA_PROFILES["wal"], busy_timeout=10))
+
+    blocker = sqlite3.connect(db, check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+    release = threading.Timer(0.1, blocker.rollback)
+    release.start()
+    try:
+        assert services.borrow_item(patron, item, db_name=db)
+    finally:
+        release.join()
+        blocker.close()
+    assert _open_loans(db, item) == [(patron,)]
+
+    blocker = sqlite3.connect(db)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            services.return_item(patron, item, db_name=db)
+    finally:
+        blocker.rollback()
+        blocker.close()
+    assert _open_loans(db, item) == [(patron,)]
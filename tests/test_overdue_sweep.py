@@ -0,0 +1,62 @@
+"""run_overdue_sweep: watermark, min_interval skip, and the report of overdue -> lost transitions."""
+import sqlite3
+
+import pytest
+
+from database import services
+
+
+@pytest.fixture
+def loans(db):
+    """Three open loans whose lost dates are 2025-01-10, 2025-01-20 and far in the future"""
+    lost_dates = ["2025-01-10", "2025-01-20", "2099-01-01"]
+    items = []
+    for n, lost_date in enumerate(lost_dates):
+        patron = services.add_patron("Over", f"Due{n}", f"over.{n}@example.org", db_name=db)["id"]
+        item = services.add_item(f"Late {n}", "Physical Book", "Author", 20.0 + n, db_name=db)
+        services.borrow_item(patron, item, db_name=db)
+        items.append((patron, item))
+    conn = sqlite3.connect(db)
+    with conn:
+        conn.executemany("UPDATE OpenLoans SET due_date = date(?, '-14 days'), lost_date = ? WHERE item_id = ?",
+                         [(lost_date, lost_date, item) for lost_date, (_, item) in zip(lost_dates, items)])
+    conn.close()
+    return items
+
+
+def _status(db, item_id):
+    return services.get_item(item_id, db_name=db)["status"]
+
+
+def test_sweep_reports_transitions_and_skips_inside_interval(db, loans):
+    (first_patron, first), (_, second), (_, third) = loans
+
+    report = services.run_overdue_sweep(today="2025-01-15", db_name=db)
+    assert report["ran"] and report["full"]
+    assert (report["cutoff"], report["since"], report["marked_lost"]) == ("2025-01-15", None, [first])
+    assert _status(db, first) == "lost"
+    assert services.get_patron_balance(first_patron, db_name=db)["lost_fines"] == 20.0
+
+    skipped = services.run_overdue_sweep(today="2025-01-25", min_interval=3600, db_name=db)
+    assert skipped["ran"] is False
+    assert skipped["marked_lost"] == [first]
+    assert _status(db, second) == "checked_out"
+
+    # incremental: only lost dates after the last cutoff
+    report = services.run_overdue_sweep(today="2025-01-25", db_name=db)
+    assert report["ran"] and not report["full"]
+    assert (report["since"], report["marked_lost"]) == ("2025-01-15", [second])
+    assert _status(db, second) == "lost"
+    assert _status(db, third) == "checked_out"
+
+    # a full rescan finds nothing new, and an older `today` doesn't move the watermark back
+    assert services.run_overdue_sweep(today="2025-01-25", full=True, db_name=db)["marked_lost"] == []
+    services.run_overdue_sweep(today="2025-01-01", db_name=db)
+    assert services.run_overdue_sweep(today="2025-01-26", db_name=db)["since"] == "2025-01-25"
+
+
+def test_sweep_outside_interval_runs(db, loans):
+    services.run_overdue_sweep(today="2025-01-15", db_name=db)
+    report = services.run_overdue_sweep(today="2025-01-25", min_interval=0, db_name=db)
+    assert report["ran"]
+    assert report["marked_lost"] == [loans[1][1]]
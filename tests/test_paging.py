@@ -0,0 +1,89 @@
+"""Walking the keyset pages yields every row once, in order, with the base conditions applied."""
+import sqlite3
+
+from database import services
+
+
+def _walk(fetch, **kwargs):
+    rows, cursor, total = [], None, None
+    while True:
+        page = fetch(page_size=2, cursor=cursor, with_total=True, **kwargs)
+        rows += page["rows"]
+        total = page["total"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return rows, total
+
+
+def _loans(db):
+    """Two patrons with open and returned loans spread over a few days"""
+    patrons = [services.add_patron("Page", f"Walker{n}", f"page.{n}@example.org", db_name=db)["id"]
+               for n in range(2)]
+    items = [services.add_item(f"Title {n}", "DVD", "Creator", 10.0, db_name=db) for n in range(6)]
+    for n, item in enumerate(items):
+        patron = patrons[n % 2]
+        services.borrow_item(patron, item, db_name=db)
+        if n < 4:
+            services.return_item(patron, item, db_name=db)
+    conn = sqlite3.connect(db)
+    with conn:
+        for n, item in enumerate(items):
+            day = f"2025-01-{10 - n % 3:02d}"
+            conn.execute("UPDATE LoanArchive SET checkoutDate = ? WHERE item_id = ?", (day, item))
+            conn.execute("UPDATE OpenLoans SET checkoutDate = ? WHERE item_id = ?", (day, item))
+    conn.close()
+    return patrons
+
+
+def _order(row):
+    return row["checkoutDate"], row["id"], row["item_id"]
+
+
+def test_loan_pages_merge_both_halves(db):
+    patrons = _loans(db)
+    rows, total = _walk(services.get_all_borrowing_history_page, is_staff=True, db_name=db)
+    assert total == len(rows) == 6
+    assert rows == sorted(rows, key=_order, reverse=True)
+    assert sum(row["returnDate"] is None for row in rows) == 2
+
+    own, total = _walk(services.get_all_borrowing_history_page, is_staff=False, patron_id=patrons[1],
+                       db_name=db)
+    assert total == len(own) == 3
+    assert own == [row for row in rows if row["id"] == patrons[1]]
+
+
+def test_patron_history_pages_keep_the_patron_condition(db):
+    patrons = _loans(db)
+    rows, total = _walk(services.get_borrowing_history_page, patron_id=patrons[0], db_name=db)
+    assert total == len(rows) == 3
+    assert sorted(row["title"] for row in rows) == ["Title 0", "Title 2", "Title 4"]
+
+
+def test_item_pages_filter_for_patrons(db):
+    items = [services.add_item(f"Title {n}", "DVD", "Creator", 10.0, db_name=db) for n in range(5)]
+    conn = sqlite3.connect(db)
+    with conn:
+        conn.execute("UPDATE Items SET status = 'lost' WHERE item_id = ?", (items[2],))
+    conn.close()
+    rows, total = _walk(services.get_items_with_display_status_page, is_staff=False, db_name=db)
+    assert total == len(rows) == 4
+    assert [row["item_id"] for row in rows] == [item for item in items if item != items[2]]
+
+
+def test_event_pages_follow_the_schedule(db):
+    manager = services.add_patron("Event", "Planner", "planner@example.org", db_name=db)["id"]
+    services.add_staff(manager, "Manager", 50000, db_name=db)
+    # created out of order, two rooms on the same day
+    for day, start, room in [("2099-05-02", "14:00", "101"), ("2099-05-01", "18:00", "101"),
+                             ("2099-05-02", "09:00", "101"), ("2099-05-01", "09:00", "102"),
+                             ("2099-05-01", "09:00", "101")]:
+        services.create_event(manager, f"{day} {start}", day, room, "All", start_time=start,
+                              end_time=f"{int(start[:2]) + 1:02d}:00", db_name=db)
+
+    for include_past in (False, True):
+        events = services.get_upcoming_events(include_past, db_name=db)
+        schedule = sorted(events, key=lambda e: (e["date"], e["start_time"], e["event_id"]), reverse=include_past)
+        assert [e["event_id"] for e in events] == [e["event_id"] for e in schedule]
+        rows, total = _walk(services.get_upcoming_events_page, include_past=include_past, db_name=db)
+        assert total == len(events)
+        assert [e["event_id"] for e in rows] == [e["event_id"] for e in events]
@@ -0,0 +1,88 @@
+"""PatronBalance (the precomputed fines) against the per-patron fine query it replaced."""
+import sqlite3
+
+import pytest
+
+from database import services
+
+TODAY = "2025-03-01"
+
+# patron -> (due date, lost date, replacement cost); None = returned on time before TODAY
+LOANS = {
+    "lost": ("2025-01-01", "2025-01-15", 30.0),
+    "lost_too": ("2025-01-20", "2025-02-03", 12.5),
+    "overdue": ("2025-02-19", "2025-03-05", 18.0),
+    "on_time": ("2025-03-10", "2025-03-24", 22.0),
+    "returned": None,
+}
+
+
+def _old_patron_fines(db, patron_id):
+    """get_patron_fines before PatronBalance: lost items anywhere in the patron's history"""
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute(
+            """SELECT COALESCE(SUM(i.replacement_cost), 0) FROM BorrowingHistory bh
+               JOIN Items i ON bh.item_id = i.item_id
+               WHERE bh.id = ? AND i.status = 'lost'""",
+            (patron_id,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def patrons(db):
+    ids = {}
+    for n, (name, loan) in enumerate(LOANS.items()):
+        patron = ids[name] = services.add_patron("Fine", name, f"{name}@example.org", db_name=db)["id"]
+        item = services.add_item(f"Book {n}", "Physical Book", "Author", loan[2] if loan else 10.0, db_name=db)
+        services.borrow_item(patron, item, db_name=db)
+        if loan is None:
+            services.return_item(patron, item, db_name=db)
+            continue
+        conn = sqlite3.connect(db)
+        with conn:
+            conn.execute("UPDATE OpenLoans SET due_date = ?, lost_date = ? WHERE item_id = ?", (*loan[:2], item))
+        conn.close()
+    services.run_overdue_sweep(today=TODAY, full=True, db_name=db)
+    return ids
+
+
+def test_balances_match_the_old_fine_query(db, patrons):
+    report = services.compute_patron_balances(today=TODAY, db_name=db)
+    assert report["ran"]
+    assert report["patrons"] == 3  # the two lost loans and the overdue one
+    assert report["lost_fines"] == 42.5
+
+    for name, patron in patrons.items():
+        balance = services.get_patron_balance(patron, db_name=db)
+        assert balance["lost_fines"] == pytest.approx(_old_patron_fines(db, patron)), name
+        assert services.get_patron_fines(patron, db_name=db) == balance["lost_fines"]
+
+    expected = {  # (lost_items, overdue_items, max_days_overdue)
+        "lost": (1, 1, 59), "lost_too": (1, 1, 40), "overdue": (0, 1, 10),
+        "on_time": (0, 0, 0), "returned": (0, 0, 0),
+    }
+    for name, (lost, overdue, days) in expected.items():
+        balance = services.get_patron_balance(patrons[name], db_name=db)
+        assert (balance["lost_items"], balance["overdue_items"], balance["max_days_overdue"]) == (lost, overdue, days), name
+
+
+def test_writes_refresh_their_patrons(db, patrons):
+    # the sweep refreshed the patrons whose items it marked lost
+    assert services.get_patron_balance(patrons["lost"], db_name=db)["lost_fines"] == 30.0
+
+    assert services.process_lost_item_payment(patrons["lost"], db_name=db) == 1
+    assert services.get_patron_balance(patrons["lost"], db_name=db)["lost_fines"] == 0
+    assert _old_patron_fines(db, patrons["lost"]) == 0
+    assert services.get_patron_balance(patrons["lost_too"], db_name=db)["lost_fines"] == 12.5
+
+
+def test_full_recompute_skipped_inside_interval(db, patrons):
+    services.compute_patron_balances(today=TODAY, db_name=db)
+    skipped = services.compute_patron_balances(today="2025-03-05", min_interval=3600, db_name=db)
+    assert skipped["ran"] is False and skipped["today"] == TODAY
+    assert services.get_patron_balance(patrons["overdue"], db_name=db)["max_days_overdue"] == 10
+    services.compute_patron_balances(today="2025-03-05", db_name=db)
+    assert services.get_patron_balance(patrons["overdue"], db_name=db)["max_days_overdue"] == 14
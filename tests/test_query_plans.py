@@ -0,0 +1,25 @@
+"""The hot predicates in services.py are answered from indexes, not table scans"""
+import pytest
+
+from database.migrations import explain_query_plan
+
+HOT_QUERIES = {
+    "items by status": ("SELECT item_id FROM Items WHERE status = ?", ("available",)),
+    "items by type and status": ("SELECT item_id FROM Items WHERE type = ? AND status = ?", ("DVD", "available")),
+    "open loans by checkout date": ("SELECT * FROM OpenLoans WHERE checkoutDate >= ? ORDER BY checkoutDate",
+                                    ("2024-01-01",)),
+    "archived loans by checkout date": ("SELECT * FROM LoanArchive WHERE checkoutDate >= ? ORDER BY checkoutDate",
+                                        ("2024-01-01",)),
+    "patron by email": ("SELECT id FROM Patron WHERE email = ?", ("a@example.com",)),
+    "upcoming events in schedule order": (
+        "SELECT * FROM Events WHERE date >= ? ORDER BY date, start_time, event_id", ("2025-01-01",)),
+}
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(conn, name):
+    sql, params = HOT_QUERIES[name]
+    plan = explain_query_plan(conn, sql, params)
+    assert any(line.startswith("SEARCH") and "INDEX" in line for line in plan), plan
+    assert not any(line.startswith("SCAN") for line in plan), plan
+    assert not any("TEMP B-TREE" in line for line in plan), plan
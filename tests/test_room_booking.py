@@ -0,0 +1,50 @@
+"""Events booked before v14 with unpadded dates still clash with new bookings."""
+import sqlite3
+
+import pytest
+
+from database import services
+from database.migrations import migrate
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """A v12 database holding a hand-entered event dated '2025-4-12', then migrated"""
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    migrate(conn, target=12)
+    conn.execute("INSERT INTO Patron (id, first_name, last_name, email) VALUES (1, 'Old', 'Organizer', 'o@example.org')")
+    conn.execute("INSERT INTO Staff (id, position, salary) VALUES (1, 'Manager', 50000)")
+    conn.execute("INSERT INTO Events (event_id, organizer, eventName, date, roomNum, audience) "
+                 "VALUES (1, 1, 'Book Fair', '2025-4-12', '3121', 'All')")
+    conn.commit()
+    migrate(conn)
+    conn.close()
+    return path
+
+
+def test_backfilled_event_is_padded_and_clashes(legacy_db):
+    conn = sqlite3.connect(legacy_db)
+    assert conn.execute("SELECT date FROM Events WHERE event_id = 1").fetchone() == ("2025-04-12",)
+    assert conn.execute("SELECT COUNT(*) FROM EventSlots WHERE event_id = 1").fetchone() == (1,)
+    conn.close()
+
+    conflicts = services.find_room_conflicts("3121", "2025-04-12", "10:00", "11:00", db_name=legacy_db)
+    assert [c["event_id"] for c in conflicts] == [1]
+    with pytest.raises(ValueError, match="already booked for Book Fair"):
+        services.create_event(1, "Clash", "2025-04-12", "3121", "All", start_time="10:00", end_time="11:00",
+                              db_name=legacy_db)
+    assert services.create_event(1, "Next Day", "2025-04-13", "3121", "All", db_name=legacy_db)
+
+
+def test_unpadded_dates_are_rejected(db):
+    manager = services.add_patron("New", "Organizer", "n@example.org", db_name=db)["id"]
+    services.add_staff(manager, "Manager", 50000, db_name=db)
+    with pytest.raises(ValueError, match="YYYY-MM-DD"):
+        services.create_event(manager, "Bad", "2025-4-12", "101", "All", db_name=db)
+    conn = sqlite3.connect(db)
+    for bad in ("2025-4-12", "2025-02-30", "someday"):
+        with pytest.raises(sqlite3.IntegrityError, match="YYYY-MM-DD"):
+            conn.execute("INSERT INTO Events (organizer, eventName, date, roomNum, audience) "
+                         "VALUES (?, 'Bad', ?, '101', 'All')", (manager, bad))
+    conn.close()
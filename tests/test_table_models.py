@@ -0,0 +1,48 @@
+"""RecordTableModel page loads use a key of their own and can be cancelled."""
+import pytest
+
+pytest.importorskip("PyQt5.QtCore")
+from gui.table_models import RecordTableModel  # noqa: E402
+
+
+class FakeRunner:
+    """Records submits and cancels instead of running anything"""
+
+    def __init__(self):
+        self.submitted, self.cancelled = [], []
+
+    def submit(self, key, fn, *args, on_success=None, on_error=None, **kwargs):
+        self.submitted.append((key, on_success, on_error))
+
+    def cancel(self, key):
+        self.cancelled.append(key)
+
+
+def _model(runner):
+    return RecordTableModel([("ID", lambda r: str(r["id"]))], fetch_page=lambda cursor: None, runner=runner)
+
+
+def test_models_submit_under_their_own_keys():
+    runner = FakeRunner()
+    first, second = _model(runner), _model(runner)
+    first.fetchMore()
+    second.fetchMore()
+    keys = [key for key, _, _ in runner.submitted]
+    assert len(set(keys)) == 2
+    assert "results" not in keys
+
+
+def test_cancelled_fetch_can_be_retried():
+    runner = FakeRunner()
+    model = _model(runner)
+    model.fetchMore()
+    assert not model.canFetchMore()
+    model.cancel_fetch()
+    assert runner.cancelled == [runner.submitted[0][0]]
+    assert model.canFetchMore()
+
+    model.fetchMore()
+    _, on_success, _ = runner.submitted[-1]
+    on_success({"rows": [{"id": 1}, {"id": 2}], "next_cursor": None, "total": None})
+    assert model.rowCount() == 2
+    assert not model.canFetchMore()